@@ -1,13 +1,38 @@
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, status, Query
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, status, Query, Header
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional
+from starlette.concurrency import run_in_threadpool
+from typing import Any, Awaitable, Callable, Literal, Optional, Union
+from dataclasses import asdict
+from datetime import datetime
+from app.core.config import settings
+from app.core.auth_cache import auth_cache
 from app.core.security import get_current_user
+from app.core.database import pool_stats
+from app.core.metrics import track_stage
 from app.models.user import User
-from app.services.resume_service import extract_text_from_pdf
-from app.services.openai_service import analyze_resume
-from app.services.pdf_service import generate_pdf_from_text
-import io
+from app.services.resume_service import (
+    extract_text_from_pdf,
+    extract_resume_text,
+    spool_upload,
+    list_zip_pdfs,
+    read_zip_pdf,
+    ZIP_MAGIC
+)
+from app.services.openai_service import analyze_resume, score_resume, stream_resume_analysis, STREAMED_FIELDS
+from app.services.pdf_service import render_pdf, pdf_cache_key
+from app.services.cache_service import analysis_cache, make_analysis_cache_key, pdf_cache
+from app.services.job_service import job_queue, JobRecord
+from app.services.model_health import model_health
+from app.services.rewrite_service import rewrite_service
+from app.services.rate_limit_service import admission_controller
+from app.services.quick_score import quick_score
+from app.services.match_service import match_service
+from app.services import history_service
+import asyncio
+import json
+import os
+import zipfile
 
 router = APIRouter()
 
@@ -17,6 +42,23 @@ class AnalyzeResponse(BaseModel):
     structure_feedback: str
     keyword_analysis: str
     improvements: list[str]
+    improved_content: Optional[str] = None  # None until fetched from /analyze/rewrite/{analysis_id}
+    analysis_id: Optional[str] = None
+    history_id: Optional[int] = None  # Id of the stored copy under /analyze/history
+
+
+# Request-specific fields kept out of the shared analysis cache
+_UNCACHED_FIELDS = {"analysis_id", "history_id"}
+
+
+class QuickAnalyzeResponse(AnalyzeResponse):
+    breakdown: dict[str, int]  # Points earned per heuristic component
+    red_flags: list[str]  # ATS parsing problems
+    unreadable: bool  # Too little text or structure for a full analysis to be useful
+
+
+class RewriteResponse(BaseModel):
+    analysis_id: str
     improved_content: str
 
 
@@ -24,21 +66,164 @@ class ExportRequest(BaseModel):
     content: str
 
 
+class BulkExportItem(ExportRequest):
+    filename: str
+
+
+class BulkExportRequest(BaseModel):
+    items: list[BulkExportItem]
+
+
+class BatchItemResult(BaseModel):
+    filename: str
+    status: str  # "ok", "error", or "rejected" by the quick-score prefilter
+    result: Optional[Union[QuickAnalyzeResponse, AnalyzeResponse]] = None  # The quick score when rejected
+    error: Optional[str] = None
+
+
+class BatchResponse(BaseModel):
+    succeeded: int
+    failed: int
+    results: list[BatchItemResult]
+
+
+class MatchRequest(BaseModel):
+    job_description: str
+    limit: int = 50  # Capped at MATCH_MAX_RESULTS
+    method: Literal["bm25", "tfidf"] = "bm25"  # tfidf ranks by cosine similarity
+
+
+class CandidateMatchResult(BaseModel):
+    document_id: int
+    filename: Optional[str] = None
+    score: float
+    keyword_coverage: float  # Share of the job description keywords found in the resume
+    matched_keywords: list[str]
+    missing_keywords: list[str]
+
+
+class MatchResponse(BaseModel):
+    keywords: list[str]  # Most distinctive job description terms, used for the per-candidate lists
+    total_documents: int  # Resumes ranked
+    results: list[CandidateMatchResult]
+
+
+class MatchDocumentResult(BaseModel):
+    filename: str
+    status: str  # "indexed", "duplicate" or "error"
+    document_id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class MatchDocumentsResponse(BaseModel):
+    indexed: int
+    results: list[MatchDocumentResult]
+
+
+class AnalysisHistoryPage(BaseModel):
+    items: list[dict[str, Any]]  # Only the projected fields of each analysis
+    next_cursor: Optional[str] = None  # Pass as `cursor` for the next page; None on the last page
+
+
+class AnalysisRecord(BaseModel):
+    id: int
+    created_at: datetime
+    content_hash: str
+    filename: Optional[str] = None
+    target_role: Optional[str] = None
+    score: int
+    structure_feedback: str
+    keyword_analysis: str
+    improvements: list[str]
+    improved_content: Optional[str] = None
+
+
+class JobResponse(BaseModel):
+    id: str
+    status: str  # "queued", "running", "succeeded" or "failed"
+    filename: str
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[AnalyzeResponse] = None
+    error: Optional[str] = None
+
+
+async def _record_history(response: AnalyzeResponse, user_id: Optional[int], filename: Optional[str], target_role: Optional[str]) -> AnalyzeResponse:
+    if user_id is not None:
+        response.history_id = await history_service.record_analysis(
+            user_id, response.analysis_id, filename, target_role, response.model_dump(exclude=_UNCACHED_FIELDS)
+        )
+    return response
+
+
+async def _analyze_text(
+    resume_text: str,
+    target_role: Optional[str],
+    include_rewrite: bool = False,
+    user_id: Optional[int] = None,
+    filename: Optional[str] = None,
+    admit_global: bool = False
+) -> AnalyzeResponse:
+    """
+    Analyze extracted resume text, serving repeat resumes from the cache.
+    Without `include_rewrite` only the fast scoring call is made and the
+    improved_content rewrite is left to /analyze/rewrite/{analysis_id}.
+    With `user_id` the result is also stored in that user's history and the
+    text added to their job-description matching index. With `admit_global`
+    a cache miss takes a global admission token before its model call.
+    """
+    if user_id is not None:
+        await match_service.index_analyzed_resume(user_id, filename, resume_text)
+    analysis_id = make_analysis_cache_key(resume_text, target_role, settings.OPENAI_MODEL)
+    if settings.ANALYSIS_CACHE_ENABLED:
+        cached = await analysis_cache.get(analysis_id)
+        if cached is not None and (cached.get("improved_content") or not include_rewrite):
+            if not cached.get("improved_content"):
+                await rewrite_service.register(analysis_id, resume_text, target_role, cached, prefetch=False)
+            return await _record_history(AnalyzeResponse(**cached, analysis_id=analysis_id), user_id, filename, target_role)
+    
+    # Analyze with OpenAI
+    if admit_global:
+        await admission_controller.admit_global()
+    if include_rewrite:
+        analysis = await analyze_resume(resume_text, target_role)
+    else:
+        analysis = await score_resume(resume_text, target_role)
+    response = AnalyzeResponse(**analysis, analysis_id=analysis_id)
+    
+    if not include_rewrite:
+        scoring = response.model_dump(exclude={"analysis_id", "improved_content"})
+        await rewrite_service.register(analysis_id, resume_text, target_role, scoring, prefetch=settings.REWRITE_PREFETCH)
+    if settings.ANALYSIS_CACHE_ENABLED:
+        await analysis_cache.set(analysis_id, response.model_dump(exclude=_UNCACHED_FIELDS), settings.OPENAI_MODEL)
+    
+    return await _record_history(response, user_id, filename, target_role)
+
+
+async def get_admitted_user(current_user: User = Depends(get_current_user)) -> User:
+    """Authenticate, then take an analysis token from the user's and the global bucket (429 if none comes in time)."""
+    await admission_controller.admit(current_user.id)
+    return current_user
+
+
 @router.post("/upload", response_model=AnalyzeResponse)
 async def upload_and_analyze(
     file: UploadFile = File(...),
     target_role: Optional[str] = Query(None, description="Optional target job role for tailored analysis"),
-    current_user: User = Depends(get_current_user)
+    include_rewrite: bool = Query(False, description="Generate improved_content in the same call instead of lazily"),
+    current_user: User = Depends(get_admitted_user)
 ):
-    """Upload resume PDF and get AI-powered analysis."""
+    """
+    Upload resume PDF and get AI-powered analysis.
+    By default improved_content is left out and fetched from /analyze/rewrite/{analysis_id}.
+    """
     try:
         # Extract text from PDF
         resume_text = await extract_text_from_pdf(file)
         
-        # Analyze with OpenAI
-        analysis = await analyze_resume(resume_text, target_role)
-        
-        return AnalyzeResponse(**analysis)
+        # Analyze with OpenAI, or serve a repeat upload from the cache
+        return await _analyze_text(resume_text, target_role, include_rewrite, current_user.id, file.filename)
     
     except HTTPException:
         raise
@@ -49,26 +234,637 @@ async def upload_and_analyze(
         )
 
 
+def _quick_score(resume_text: str, target_role: Optional[str]) -> QuickAnalyzeResponse:
+    with track_stage("quick_score"):
+        return QuickAnalyzeResponse(**asdict(quick_score(resume_text, target_role)))
+
+
+@router.post("/quick", response_model=QuickAnalyzeResponse)
+async def quick_analyze(
+    file: UploadFile = File(...),
+    target_role: Optional[str] = Query(None, description="Optional target job role whose terms are looked for"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Score a resume PDF instantly with local heuristics instead of the LLM:
+    structure, section completeness, bullet density, quantified achievements,
+    length and ATS red flags. Not rate limited and not stored in history.
+    """
+    resume_text = await extract_text_from_pdf(file)
+    return _quick_score(resume_text, target_role)
+
+
+def _sse(event: str, data) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/upload/stream")
+async def upload_and_analyze_stream(
+    file: UploadFile = File(...),
+    target_role: Optional[str] = Query(None, description="Optional target job role for tailored analysis"),
+    current_user: User = Depends(get_admitted_user)
+):
+    """
+    Upload resume PDF and stream the analysis as Server-Sent Events.
+    Emits a `field` event as each analysis field completes, `delta` events with
+    improved_content text as it is generated, then `done` with the full result.
+    """
+    # Extract before streaming starts so upload errors are still plain HTTP errors
+    resume_text = await extract_text_from_pdf(file)
+    
+    analysis_id = make_analysis_cache_key(resume_text, target_role, settings.OPENAI_MODEL)
+    user_id = current_user.id
+    await match_service.index_analyzed_resume(user_id, file.filename, resume_text)
+    
+    async def events():
+        yield _sse("status", {"stage": "analyzing"})
+        
+        cached = await analysis_cache.get(analysis_id) if settings.ANALYSIS_CACHE_ENABLED else None
+        if cached is not None and cached.get("improved_content"):
+            for name, value in cached.items():
+                yield _sse("field", {"name": name, "value": value})
+            response = await _record_history(AnalyzeResponse(**cached, analysis_id=analysis_id), user_id, file.filename, target_role)
+            yield _sse("done", {**cached, "history_id": response.history_id})
+            return
+        
+        fields = {}
+        streamed = False
+        try:
+            try:
+                async for kind, (name, value) in stream_resume_analysis(resume_text, target_role):
+                    streamed = True
+                    if kind == "delta":
+                        yield _sse("delta", {"name": name, "text": value})
+                    else:
+                        fields[name] = value
+                        if name not in STREAMED_FIELDS:
+                            yield _sse("field", {"name": name, "value": value})
+            except Exception:
+                if streamed:
+                    raise
+                # Nothing was sent yet, so fall back to the regular model chain
+                fields = await analyze_resume(resume_text, target_role)
+                for name, value in fields.items():
+                    yield _sse("field", {"name": name, "value": value})
+            response = AnalyzeResponse(**fields, analysis_id=analysis_id)
+        except Exception as e:
+            yield _sse("error", {"detail": f"Error analyzing resume: {str(e)}"})
+            return
+        
+        if settings.ANALYSIS_CACHE_ENABLED:
+            await analysis_cache.set(analysis_id, response.model_dump(exclude=_UNCACHED_FIELDS), settings.OPENAI_MODEL)
+        response = await _record_history(response, user_id, file.filename, target_role)
+        yield _sse("done", response.model_dump(exclude={"analysis_id"}))
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def _analyze_batch_item(
+    filename: str,
+    load: Callable[[], Awaitable[Union[bytes, str]]],
+    target_role: Optional[str],
+    limiter: asyncio.Semaphore,
+    user_id: int,
+    prefilter: bool = False
+) -> BatchItemResult:
+    """
+    Load, extract and analyze one resume of a batch, capturing any error in the result.
+    With `prefilter`, resumes the quick score finds unreadable or below
+    QUICK_SCORE_PREFILTER_MIN_SCORE are rejected without an OpenAI call.
+    """
+    async with limiter:
+        try:
+            source = await load()
+            try:
+                resume_text = await extract_resume_text(source, filename)
+            finally:
+                if isinstance(source, str):
+                    os.unlink(source)
+            if prefilter:
+                quick = _quick_score(resume_text, target_role)
+                if quick.unreadable or quick.score < settings.QUICK_SCORE_PREFILTER_MIN_SCORE:
+                    return BatchItemResult(
+                        filename=filename,
+                        status="rejected",
+                        result=quick,
+                        error="Resume failed the quick-score prefilter: " + "; ".join(quick.red_flags or quick.improvements[:3])
+                    )
+            # The batch was admitted per user up front; the global budget is charged per model call
+            result = await _analyze_text(resume_text, target_role, user_id=user_id, filename=filename, admit_global=True)
+            return BatchItemResult(filename=filename, status="ok", result=result)
+        except HTTPException as e:
+            return BatchItemResult(filename=filename, status="error", error=str(e.detail))
+        except Exception as e:
+            return BatchItemResult(filename=filename, status="error", error=f"Error analyzing resume: {str(e)}")
+
+
+async def _load_upload(file: UploadFile) -> str:
+    if not (file.filename or "").lower().endswith('.pdf'):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only PDF files are supported"
+        )
+    return await spool_upload(file)
+
+
+BatchSource = tuple[str, Callable[[], Awaitable[Union[bytes, str]]]]
+
+
+async def _batch_sources(files: list[UploadFile]) -> tuple[list[BatchSource], Callable[[], None]]:
+    """
+    Resolve uploaded PDFs, or a single ZIP archive of PDFs, into (filename, loader)
+    pairs and a cleanup callback for the spooled archive. Enforces BATCH_MAX_FILES.
+    """
+    archive = None
+    archive_path = None
+    if len(files) == 1 and (files[0].filename or "").lower().endswith('.zip'):
+        archive_path = await spool_upload(
+            files[0], max_size=settings.BATCH_MAX_ARCHIVE_SIZE, magic=ZIP_MAGIC, kind="ZIP"
+        )
+        try:
+            archive = zipfile.ZipFile(archive_path)
+            entries = list_zip_pdfs(archive)
+        except zipfile.BadZipFile:
+            os.unlink(archive_path)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Could not read ZIP archive"
+            )
+        items = [
+            (info.filename, lambda info=info: run_in_threadpool(read_zip_pdf, archive, info))
+            for info in entries
+        ]
+    else:
+        items = [(file.filename, lambda file=file: _load_upload(file)) for file in files]
+    
+    def cleanup():
+        if archive is not None:
+            archive.close()
+        if archive_path is not None:
+            os.unlink(archive_path)
+    
+    if len(items) > settings.BATCH_MAX_FILES:
+        cleanup()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch exceeds maximum of {settings.BATCH_MAX_FILES} resumes"
+        )
+    return items, cleanup
+
+
+@router.post("/batch", response_model=BatchResponse)
+async def analyze_batch(
+    files: list[UploadFile] = File(..., description="Resume PDFs, or a single ZIP archive of PDFs"),
+    target_role: Optional[str] = Query(None, description="Optional target job role for tailored analysis"),
+    stream: bool = Query(False, description="Stream results as NDJSON as each resume completes"),
+    prefilter: bool = Query(False, description="Skip resumes the quick score finds unreadable or too weak for a full analysis"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Analyze many resumes in one request.
+    Resumes are processed concurrently up to BATCH_CONCURRENCY; a failing file
+    is reported in its own result and does not fail the batch. The batch is
+    admitted as a whole before any resume starts (429 if it can't be).
+    """
+    items, cleanup = await _batch_sources(files)
+    try:
+        await admission_controller.admit_batch(current_user.id, len(items))
+    except HTTPException:
+        cleanup()
+        raise
+    limiter = asyncio.Semaphore(settings.BATCH_CONCURRENCY)
+    tasks = [
+        asyncio.ensure_future(_analyze_batch_item(filename, load, target_role, limiter, current_user.id, prefilter))
+        for filename, load in items
+    ]
+    
+    if stream:
+        async def results():
+            try:
+                for completed in asyncio.as_completed(tasks):
+                    item = await completed
+                    yield item.model_dump_json() + "\n"
+            finally:
+                for task in tasks:
+                    task.cancel()
+                cleanup()
+        
+        return StreamingResponse(results(), media_type="application/x-ndjson")
+    
+    try:
+        results = await asyncio.gather(*tasks)
+    finally:
+        cleanup()
+    succeeded = sum(1 for item in results if item.status == "ok")
+    return BatchResponse(succeeded=succeeded, failed=len(results) - succeeded, results=results)
+
+
+async def _index_match_document(
+    filename: str,
+    load: Callable[[], Awaitable[Union[bytes, str]]],
+    limiter: asyncio.Semaphore,
+    user_id: int
+) -> MatchDocumentResult:
+    """Load and extract one resume and add it to the user's matching index, capturing any error."""
+    async with limiter:
+        try:
+            source = await load()
+            try:
+                resume_text = await extract_resume_text(source, filename)
+            finally:
+                if isinstance(source, str):
+                    os.unlink(source)
+            document_id = await match_service.add_document(user_id, filename, resume_text)
+            if document_id is None:
+                return MatchDocumentResult(filename=filename, status="duplicate")
+            return MatchDocumentResult(filename=filename, status="indexed", document_id=document_id)
+        except HTTPException as e:
+            return MatchDocumentResult(filename=filename, status="error", error=str(e.detail))
+        except Exception as e:
+            return MatchDocumentResult(filename=filename, status="error", error=f"Error indexing resume: {str(e)}")
+
+
+@router.post("/match/documents", response_model=MatchDocumentsResponse)
+async def add_match_documents(
+    files: list[UploadFile] = File(..., description="Resume PDFs, or a single ZIP archive of PDFs"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Add resumes to the job-description matching index without analyzing them.
+    Analyzed uploads are indexed automatically; a resume is indexed once per user.
+    """
+    items, cleanup = await _batch_sources(files)
+    limiter = asyncio.Semaphore(settings.BATCH_CONCURRENCY)
+    try:
+        results = await asyncio.gather(*(
+            _index_match_document(filename, load, limiter, current_user.id) for filename, load in items
+        ))
+    finally:
+        cleanup()
+    indexed = sum(1 for item in results if item.status == "indexed")
+    return MatchDocumentsResponse(indexed=indexed, results=results)
+
+
+@router.post("/match", response_model=MatchResponse)
+async def match_job_description(
+    request: MatchRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Rank the user's indexed resumes against a job description locally, without
+    an LLM call. Returns the posting's keywords and, per candidate, a BM25 (or
+    tf-idf cosine) score with the keywords it matches and misses.
+    """
+    limit = max(1, min(request.limit, settings.MATCH_MAX_RESULTS))
+    keywords, results, total = await match_service.rank(current_user.id, request.job_description, limit, request.method)
+    if not keywords:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Job description has no searchable terms"
+        )
+    return MatchResponse(
+        keywords=keywords,
+        total_documents=total,
+        results=[CandidateMatchResult(**asdict(result)) for result in results]
+    )
+
+
+@router.get("/match/stats")
+async def get_match_stats(current_user: User = Depends(get_current_user)):
+    """Get loaded matching indexes, their size and ranking latency."""
+    return match_service.stats()
+
+
+async def _run_analysis_job(job: JobRecord) -> dict:
+    """Job handler: extract and analyze the uploaded resume stored with the job."""
+    resume_text = await extract_resume_text(job.content, job.filename)
+    response = await _analyze_text(
+        resume_text, job.target_role, include_rewrite=True, user_id=job.user_id, filename=job.filename
+    )
+    return response.model_dump()
+
+
+@router.on_event("startup")
+async def start_job_workers():
+    job_queue.start(_run_analysis_job, settings.JOB_WORKERS)
+
+
+@router.on_event("shutdown")
+async def stop_job_workers():
+    await job_queue.stop()
+
+
+def _job_response(job: JobRecord) -> JobResponse:
+    return JobResponse(
+        id=job.id,
+        status=job.status,
+        filename=job.filename,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        result=job.result,
+        error=job.error
+    )
+
+
+@router.post("/jobs", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_analysis_job(
+    file: UploadFile = File(...),
+    target_role: Optional[str] = Query(None, description="Optional target job role for tailored analysis"),
+    callback_url: Optional[str] = Query(None, description="Optional URL to POST the finished job to"),
+    current_user: User = Depends(get_admitted_user)
+):
+    """Queue a resume for background analysis and return the job id right away."""
+    if callback_url is not None:
+        if not settings.JOB_WEBHOOKS_ENABLED:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Webhook callbacks are disabled"
+            )
+        if not callback_url.startswith(("http://", "https://")):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="callback_url must be an http(s) URL"
+            )
+    
+    # Validate size and signature up front so bad uploads fail fast
+    path = await _load_upload(file)
+    try:
+        with open(path, 'rb') as pdf_file:
+            content = pdf_file.read()
+    finally:
+        os.unlink(path)
+    
+    job = await job_queue.enqueue(current_user.id, file.filename, content, target_role, callback_url)
+    return _job_response(job)
+
+
+@router.get("/jobs/stats")
+async def get_job_stats(current_user: User = Depends(get_current_user)):
+    """Get job queue depth, wait time and run time."""
+    return await job_queue.stats()
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_analysis_job(job_id: str, current_user: User = Depends(get_current_user)):
+    """Get the status and, once finished, the result of an analysis job."""
+    job = await job_queue.get(job_id, current_user.id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return _job_response(job)
+
+
+@router.get("/rewrite/{analysis_id}", response_model=RewriteResponse)
+async def get_improved_content(analysis_id: str, current_user: User = Depends(get_current_user)):
+    """
+    Get the improved_content rewrite for an earlier analysis, generating it on
+    first request. Generating it is admitted like an analysis (429 if rate limited).
+    """
+    try:
+        improved_content = await rewrite_service.get(analysis_id, current_user.id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error generating improved resume: {str(e)}"
+        )
+    if improved_content is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Analysis not found. Please upload the resume again."
+        )
+    return RewriteResponse(analysis_id=analysis_id, improved_content=improved_content)
+
+
+@router.get("/history", response_model=AnalysisHistoryPage)
+async def list_analysis_history(
+    limit: int = Query(settings.HISTORY_PAGE_SIZE, ge=1, le=settings.HISTORY_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. score,improvements"),
+    current_user: User = Depends(get_current_user)
+):
+    """List past analyses, newest first, one keyset-paginated page at a time."""
+    items, next_cursor = await history_service.list_analyses(
+        current_user.id, limit, cursor, history_service.parse_fields(fields)
+    )
+    return AnalysisHistoryPage(items=items, next_cursor=next_cursor)
+
+
+@router.get("/history/{history_id}", response_model=AnalysisRecord)
+async def get_analysis_history_entry(history_id: int, current_user: User = Depends(get_current_user)):
+    """Get a stored analysis without calling the model again."""
+    analysis = await history_service.get_analysis(current_user.id, history_id)
+    if analysis is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Analysis not found"
+        )
+    return analysis
+
+
+@router.get("/models/health")
+async def get_model_health(current_user: User = Depends(get_current_user)):
+    """Get circuit breaker state and latency histograms per model."""
+    return model_health.snapshot()
+
+
+@router.get("/cache/stats")
+async def get_cache_stats(current_user: User = Depends(get_current_user)):
+    """Get analysis cache hit/miss counters."""
+    return analysis_cache.stats()
+
+
+@router.get("/cache/pdf/stats")
+async def get_pdf_cache_stats(current_user: User = Depends(get_current_user)):
+    """Get rendered PDF cache hit rate and bytes held."""
+    return pdf_cache.stats()
+
+
+@router.get("/cache/auth/stats")
+async def get_auth_cache_stats(current_user: User = Depends(get_current_user)):
+    """Get verified-token cache hit rate and size."""
+    return auth_cache.stats()
+
+
+@router.get("/db/pool/stats")
+async def get_db_pool_stats(current_user: User = Depends(get_current_user)):
+    """Get database connection pool utilization and checkout wait times."""
+    return pool_stats()
+
+
+@router.get("/admission/stats")
+async def get_admission_stats(current_user: User = Depends(get_current_user)):
+    """Get rate limit queue length, admitted and rejected analysis requests."""
+    return admission_controller.stats()
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against `etag`, as RFC 9110 specifies."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
 @router.post("/improve")
 async def export_improved_resume(
     request: ExportRequest,
+    engine: Optional[Literal["platypus", "canvas"]] = Query(None, description="PDF render engine; defaults to PDF_RENDER_ENGINE"),
+    if_none_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_user)
 ):
-    """Generate and download improved resume as PDF."""
+    """
+    Generate and download improved resume as PDF.
+    The ETag is derived from the content, so a matching If-None-Match gets 304 without rendering.
+    """
     try:
-        # Generate PDF
-        pdf_buffer = generate_pdf_from_text(request.content)
+        cache_key = pdf_cache_key(request.content, engine)
+        etag = f'"{cache_key}"'
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if _etag_matches(if_none_match, etag):
+            pdf_cache.not_modified += 1
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        
+        pdf_bytes = pdf_cache.get(cache_key) if settings.PDF_CACHE_ENABLED else None
+        if pdf_bytes is None:
+            # Render in the worker pool; Response sends the bytes as-is with their Content-Length
+            pdf_bytes = await render_pdf(request.content, engine)
+            if settings.PDF_CACHE_ENABLED:
+                pdf_cache.set(cache_key, pdf_bytes)
         
-        return StreamingResponse(
-            io.BytesIO(pdf_buffer.read()),
+        return Response(
+            content=pdf_bytes,
             media_type="application/pdf",
             headers={
+                **headers,
                 "Content-Disposition": "attachment; filename=improved_resume.pdf"
             }
         )
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error generating PDF: {str(e)}"
         )
+
+
+class _ZipStream:
+    """Write-only sink for zipfile that hands out the bytes written so far."""
+    
+    def __init__(self):
+        self._chunks: list[bytes] = []
+    
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _export_entry_names(items: list[BulkExportItem]) -> list[str]:
+    """Safe, unique .pdf names for the archive entries."""
+    names = []
+    seen = set()
+    for index, item in enumerate(items):
+        stem = os.path.basename(item.filename.replace("\\", "/")).strip()
+        if stem.lower().endswith(".pdf"):
+            stem = stem[:-4]
+        stem = stem or f"resume_{index + 1}"
+        name = f"{stem}.pdf"
+        copy = 1
+        while name.lower() in seen:
+            copy += 1
+            name = f"{stem} ({copy}).pdf"
+        seen.add(name.lower())
+        names.append(name)
+    return names
+
+
+async def _stream_export_zip(items: list[BulkExportItem], names: list[str], engine: Optional[str]):
+    """
+    Render resumes in the PDF worker pool and stream them as a ZIP archive in
+    completion order. At most PDF_RENDER_WORKERS PDFs are rendered or held at
+    a time, so memory does not grow with the batch. Failed resumes are listed
+    in errors.json at the end of the archive.
+    """
+    sink = _ZipStream()
+    # Rendered PDFs are already compressed, so entries are stored as-is
+    archive = zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED)
+    
+    async def render(index: int) -> tuple[int, Optional[bytes], Optional[str]]:
+        try:
+            return index, await render_pdf(items[index].content, engine), None
+        except Exception as e:
+            return index, None, str(getattr(e, "detail", None) or e)
+    
+    pending = set()
+    next_index = 0
+    errors = []
+    try:
+        while next_index < len(items) or pending:
+            while next_index < len(items) and len(pending) < settings.PDF_RENDER_WORKERS:
+                pending.add(asyncio.ensure_future(render(next_index)))
+                next_index += 1
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                index, pdf_bytes, error = task.result()
+                if error is not None:
+                    errors.append({"filename": names[index], "error": error})
+                    continue
+                archive.writestr(names[index], pdf_bytes)
+                yield sink.drain()
+        if errors:
+            archive.writestr("errors.json", json.dumps(errors, indent=2))
+        archive.close()
+        yield sink.drain()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+@router.post("/improve/batch")
+async def export_improved_resumes(
+    request: BulkExportRequest,
+    engine: Optional[Literal["platypus", "canvas"]] = Query(None, description="PDF render engine; defaults to PDF_RENDER_ENGINE"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Render many improved resumes and download them as one ZIP archive.
+    Entries are rendered in parallel and streamed as they finish.
+    """
+    if not request.items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No resumes to export"
+        )
+    if len(request.items) > settings.EXPORT_BATCH_MAX_FILES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Export exceeds maximum of {settings.EXPORT_BATCH_MAX_FILES} resumes"
+        )
+    
+    return StreamingResponse(
+        _stream_export_zip(request.items, _export_entry_names(request.items), engine),
+        media_type="application/zip",
+        headers={"Content-Disposition": "attachment; filename=improved_resumes.zip"}
+    )
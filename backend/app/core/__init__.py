@@ -1,5 +1,5 @@
 from app.core.config import settings
-from app.core.database import get_db, init_db
+from app.core.database import get_db, get_async_db, init_db
 from app.core.security import (
     verify_password,
     get_password_hash,
@@ -10,6 +10,7 @@ from app.core.security import (
 __all__ = [
     "settings",
     "get_db",
+    "get_async_db",
     "init_db",
     "verify_password",
     "get_password_hash",
@@ -5,14 +5,56 @@ from typing import Optional
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
+    DATABASE_ASYNC_URL: Optional[str] = None  # Defaults to DATABASE_URL with the asyncpg (or aiosqlite) driver
+    DATABASE_POOL_SIZE: int = 5  # Per engine and uvicorn worker; the sync engine serves background jobs
+    DATABASE_MAX_OVERFLOW: int = 10  # Extra connections opened above the pool size under load
+    DATABASE_POOL_TIMEOUT: float = 30.0  # Seconds to wait for a free connection
+    DATABASE_POOL_RECYCLE: int = 1800  # Reconnect connections older than this many seconds (-1 disables)
+    DATABASE_POOL_PRE_PING: bool = True  # Check connections before use to survive database restarts
     
     # Security
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440  # 24 hours
+    BCRYPT_ROUNDS: int = 12  # Cost factor; stored hashes with another cost are re-hashed on login
+    PASSWORD_HASH_WORKERS: int = 2  # Threads for bcrypt hashing and verification
+    PASSWORD_HASH_MAX_QUEUE: int = 64  # Hash operations waiting beyond this are rejected with 503
+    AUTH_CACHE_ENABLED: bool = True
+    AUTH_CACHE_TTL_SECONDS: int = 60  # How long a verified token skips JWT decoding and the user query
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
     
     # OpenAI
     OPENAI_API_KEY: str
+    OPENAI_MODEL: str = "gpt-4o"
+    OPENAI_FALLBACK_MODELS: list[str] = ["gpt-4-turbo", "gpt-4"]  # Tried in order after OPENAI_MODEL
+    OPENAI_NO_JSON_MODE_MODELS: list[str] = ["gpt-4"]  # Models prompted for JSON instead of using JSON mode
+    OPENAI_HEDGE_AFTER_SECONDS: Optional[float] = None  # Start the next model if a call is slower than this
+    OPENAI_BASE_URL: Optional[str] = None  # Override for proxies or a local fake server
+    OPENAI_MAX_CONCURRENCY: int = 32  # Global cap on in-flight OpenAI calls per worker
+    OPENAI_MAX_CONNECTIONS: int = 64  # HTTP connection pool size for the shared client
+    OPENAI_TIMEOUT: float = 60.0  # Per-call timeout in seconds
+    OPENAI_MAX_RETRIES: int = 0  # Model fallback handles retries
+    
+    # Admission control for analysis requests (token buckets)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"  # "memory" for a single node, "postgres" to share buckets across replicas
+    RATE_LIMIT_USER_RATE: float = 0.2  # Analyses per second each user earns (12 per minute)
+    RATE_LIMIT_USER_BURST: int = 10  # Analyses a user can start at once after being idle
+    RATE_LIMIT_GLOBAL_RATE: float = 5.0  # Analyses per second across all users; keep below the OpenAI rate limit
+    RATE_LIMIT_GLOBAL_BURST: int = 50
+    RATE_LIMIT_BATCH_RATE: float = 1.0  # Batch resumes per second each user earns
+    RATE_LIMIT_BATCH_BURST: int = 200  # Resumes a user can submit in batches at once; keep at least BATCH_MAX_FILES
+    RATE_LIMIT_MAX_WAIT: float = 10.0  # Seconds a request may wait for a token before it gets a 429
+    RATE_LIMIT_MAX_QUEUE: int = 100  # Requests waiting beyond this get a 429 right away
+    
+    # Per-model circuit breakers
+    BREAKER_FAILURE_RATE: float = 0.5  # Failure rate that opens the circuit
+    BREAKER_MIN_CALLS: int = 5  # Calls in the window before the rate is trusted
+    BREAKER_WINDOW_SECONDS: float = 60.0
+    BREAKER_OPEN_SECONDS: float = 30.0  # Time before a half-open trial call
+    
+    # Observability
+    METRICS_ENABLED: bool = True  # Serve Prometheus metrics on /metrics
     
     # CORS
     CORS_ORIGINS: list[str] = ["http://localhost:3000", "http://frontend:3000"]
@@ -20,6 +62,65 @@ class Settings(BaseSettings):
     # File upload
     MAX_UPLOAD_SIZE: int = 5242880  # 5MB
     
+    # PDF text extraction
+    PDF_EXTRACT_WORKERS: int = 2  # Size of the extraction process pool
+    PDF_EXTRACT_TIMEOUT: float = 15.0  # Per-document deadline in seconds
+    PDF_MAX_PAGES: int = 30  # Pages beyond this are ignored
+    PDF_MAX_CHARS: int = 60000  # Extraction stops once this much text is collected
+    PDF_PARALLEL_PAGE_THRESHOLD: int = 8  # Longer documents are split across workers
+    PDF_RENDER_WORKERS: int = 2  # Size of the export rendering process pool
+    PDF_RENDER_MAX_QUEUE: int = 16  # Exports waiting for a worker beyond this are rejected with 503
+    PDF_RENDER_TIMEOUT: float = 30.0  # Per-export deadline in seconds
+    PDF_RENDER_ENGINE: str = "platypus"  # "platypus" or "canvas" (direct drawing, faster)
+    
+    # Resume text preprocessing before the LLM call
+    RESUME_PREPROCESSING_ENABLED: bool = True
+    RESUME_TOKEN_BUDGET: int = 3000  # Resume text in scoring prompts is trimmed to about this many tokens
+    
+    # Lazy improved_content rewrite
+    REWRITE_PREFETCH: bool = False  # Start the rewrite right after scoring; a second model call per upload, outside admission control
+    REWRITE_MAX_PENDING: int = 1000  # Finished rewrites kept in memory per process
+    REWRITE_CONTEXT_TTL_SECONDS: int = 604800  # Stored rewrite contexts older than this are dropped (7 days)
+    
+    # Batch analysis
+    BATCH_MAX_FILES: int = 200
+    QUICK_SCORE_PREFILTER_MIN_SCORE: int = 25  # With prefilter=true, resumes quick-scoring below this skip OpenAI
+    BATCH_CONCURRENCY: int = 8  # Resumes analyzed in parallel per batch request
+    BATCH_MAX_ARCHIVE_SIZE: int = 209715200  # 200MB
+    EXPORT_BATCH_MAX_FILES: int = 200  # Resumes per bulk PDF export
+    
+    # Background analysis jobs
+    JOB_BACKEND: str = "memory"  # "memory" for a single node, "postgres" to share work across replicas
+    JOB_WORKERS: int = 4  # Job worker tasks per app process
+    JOB_POLL_INTERVAL: float = 1.0  # Seconds between claims when the Postgres queue is empty
+    JOB_STALE_SECONDS: int = 600  # Running Postgres jobs older than this are reclaimed
+    JOB_RESULT_TTL_SECONDS: int = 86400  # Finished in-memory jobs and their results are dropped after this
+    JOB_MAX_FINISHED: int = 1000  # Finished in-memory jobs kept at most; the oldest are dropped first
+    JOB_WEBHOOKS_ENABLED: bool = False
+    JOB_WEBHOOK_TIMEOUT: float = 10.0
+    
+    # Analysis result cache
+    ANALYSIS_CACHE_ENABLED: bool = True
+    ANALYSIS_CACHE_MAX_ENTRIES: int = 1024  # In-process LRU tier
+    ANALYSIS_CACHE_TTL_SECONDS: int = 604800  # 7 days
+    ANALYSIS_CACHE_PERSISTENT: bool = True  # Also store results in Postgres
+    ANALYSIS_CACHE_PERSISTENT_MAX_ENTRIES: int = 100000
+    
+    # Job description matching
+    MATCH_ENABLED: bool = True  # Index the text of analyzed uploads for /analyze/match
+    MATCH_MAX_INDEXES: int = 64  # Per-user indexes kept in memory; others are rebuilt from the database when used
+    MATCH_MAX_KEYWORDS: int = 30  # Job description terms reported as matched or missing per candidate
+    MATCH_MAX_RESULTS: int = 500  # Candidates returned per ranking
+    
+    # Per-user analysis history
+    HISTORY_ENABLED: bool = True  # Store every analysis so past results can be viewed without a new LLM call
+    HISTORY_PAGE_SIZE: int = 20
+    HISTORY_MAX_PAGE_SIZE: int = 100
+    
+    # Rendered PDF cache
+    PDF_CACHE_ENABLED: bool = True
+    PDF_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # Least recently used PDFs are evicted beyond this
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
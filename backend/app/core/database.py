@@ -1,12 +1,119 @@
-from sqlalchemy import create_engine
+import threading
+import time
+
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from app.core.config import settings
+from app.core.metrics import LatencyHistogram
+
+# Async drivers used when DATABASE_ASYNC_URL is not set
+_ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+# Checkout waits are much shorter than model calls, so they get their own buckets
+CHECKOUT_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+
+class PoolMetrics:
+    """Checkout wait time and utilization of one connection pool."""
+
+    def __init__(self):
+        self.wait = LatencyHistogram(CHECKOUT_WAIT_BUCKETS)
+        self.max_wait = 0.0
+        self.timeouts = 0  # Checkouts that gave up after DATABASE_POOL_TIMEOUT
+        self.peak_checked_out = 0
+        self._lock = threading.Lock()
+
+    def observe_checkout(self, seconds: float, checked_out: int):
+        with self._lock:
+            self.wait.observe(seconds)
+            self.max_wait = max(self.max_wait, seconds)
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+    def observe_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self, pool: QueuePool) -> dict:
+        capacity = pool.size() + settings.DATABASE_MAX_OVERFLOW
+        checked_out = pool.checkedout()
+        return {
+            "pool_size": pool.size(),
+            "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+            "checked_out": checked_out,
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "utilization": checked_out / capacity if capacity else 0.0,
+            "peak_checked_out": self.peak_checked_out,
+            "peak_utilization": self.peak_checked_out / capacity if capacity else 0.0,
+            "checkout_wait": self.wait.snapshot(),
+            "mean_checkout_wait": self.wait.total / self.wait.count if self.wait.count else 0.0,
+            "max_checkout_wait": self.max_wait,
+            "checkout_timeouts": self.timeouts,
+        }
+
+
+class _MeteredPoolMixin:
+    """Times every checkout, including waits for a free connection and new connects."""
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.observe_timeout()
+            raise
+        self.metrics.observe_checkout(time.perf_counter() - started, self.checkedout())
+        return connection
+
+
+# Metrics live on the class so they survive the pool being recreated on dispose()
+class _MeteredQueuePool(_MeteredPoolMixin, QueuePool):
+    metrics = PoolMetrics()
+
 
-engine = create_engine(settings.DATABASE_URL)
+class _MeteredAsyncPool(_MeteredPoolMixin, AsyncAdaptedQueuePool):
+    metrics = PoolMetrics()
+
+
+def _async_database_url() -> URL:
+    if settings.DATABASE_ASYNC_URL:
+        return make_url(settings.DATABASE_ASYNC_URL)
+    url = make_url(settings.DATABASE_URL)
+    driver = _ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver known for {url.get_backend_name()}; set DATABASE_ASYNC_URL")
+    return url.set(drivername=driver)
+
+
+def _pool_options(url: URL, poolclass: type) -> dict:
+    """Pool settings from Settings; in-memory SQLite keeps SQLAlchemy's single-connection pool."""
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+        "pool_recycle": settings.DATABASE_POOL_RECYCLE,
+        "pool_pre_ping": settings.DATABASE_POOL_PRE_PING,
+    }
+
+
+_sync_url = make_url(settings.DATABASE_URL)
+engine = create_engine(_sync_url, **_pool_options(_sync_url, _MeteredQueuePool))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+_async_url = _async_database_url()
+async_engine = create_async_engine(_async_url, **_pool_options(_async_url, _MeteredAsyncPool))
+# Objects stay usable after commit, so routes can return them without another round trip
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 
@@ -19,6 +126,27 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """Dependency for getting an async database session; queries do not block the event loop."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def init_db():
     """Initialize database tables."""
     Base.metadata.create_all(bind=engine)
+
+
+async def close_db():
+    """Close pooled connections of both engines."""
+    await async_engine.dispose()
+    engine.dispose()
+
+
+def pool_stats() -> dict:
+    """Checkout wait time and utilization of the async and sync connection pools."""
+    stats = {}
+    for name, pool in (("async", async_engine.pool), ("sync", engine.pool)):
+        if isinstance(pool, _MeteredPoolMixin):
+            stats[name] = pool.metrics.snapshot(pool)
+    return stats
@@ -0,0 +1,203 @@
+import bisect
+import threading
+import time
+from typing import Optional
+
+# Upper bounds in seconds for pipeline stage latencies; the last bucket is open-ended
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+PAGE_BUCKETS = (1, 2, 3, 5, 10, 20, 30, 50)
+BYTE_BUCKETS = (10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 2_500_000, 5_000_000, 10_000_000)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram."""
+
+    def __init__(self, buckets: tuple[float, ...] = STAGE_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def snapshot(self) -> dict:
+        labels = [str(bound) for bound in self.buckets] + ["+Inf"]
+        return {
+            "buckets": dict(zip(labels, self.counts)),
+            "count": self.count,
+            "sum": self.total,
+        }
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonic counter with one series per combination of label values."""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def collect(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labelvalues, value in self._values.items():
+                lines.append(f"{self.name}{_labels(self.labelnames, labelvalues)} {value}")
+        return lines
+
+
+class Gauge:
+    """Current value with one series per combination of label values."""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def set(self, value: float, *labelvalues: str):
+        with self._lock:
+            self._values[labelvalues] = value
+
+    def collect(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        with self._lock:
+            for labelvalues, value in self._values.items():
+                lines.append(f"{self.name}{_labels(self.labelnames, labelvalues)} {value}")
+        return lines
+
+
+class Histogram:
+    """Fixed-bucket histogram with one LatencyHistogram per combination of label values."""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = STAGE_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._series: dict[tuple[str, ...], LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str):
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = LatencyHistogram(self.buckets)
+            series.observe(value)
+
+    def collect(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+        with self._lock:
+            for labelvalues, series in self._series.items():
+                # Prometheus buckets are cumulative
+                cumulative = 0
+                for bound, count in zip(bounds, series.counts):
+                    cumulative += count
+                    labels = _labels(self.labelnames, labelvalues, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _labels(self.labelnames, labelvalues)
+                lines.append(f"{self.name}_sum{labels} {series.total}")
+                lines.append(f"{self.name}_count{labels} {series.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Process-wide metric families, rendered in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics: list = []
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        metric = Gauge(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = STAGE_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self._metrics for line in metric.collect()) + "\n"
+
+
+metrics_registry = MetricsRegistry()
+
+STAGE_SECONDS = metrics_registry.histogram(
+    "resume_stage_duration_seconds", "Time spent in each analysis pipeline stage.", ("stage",)
+)
+STAGE_ERRORS = metrics_registry.counter(
+    "resume_stage_errors_total", "Errors raised in each pipeline stage, by exception type.", ("stage", "type")
+)
+OPENAI_SECONDS = metrics_registry.histogram(
+    "resume_openai_request_duration_seconds", "Duration of single OpenAI calls per model.", ("model",)
+)
+OPENAI_TOKENS = metrics_registry.counter(
+    "resume_openai_tokens_total", "Tokens reported in OpenAI response usage.", ("model", "kind")
+)
+OPENAI_FALLBACKS = metrics_registry.counter(
+    "resume_openai_fallbacks_total", "Answers served by a model other than OPENAI_MODEL.", ("model",)
+)
+PDF_PAGES = metrics_registry.histogram(
+    "resume_pdf_pages", "Pages per uploaded or exported PDF.", ("kind",), buckets=PAGE_BUCKETS
+)
+PDF_BYTES = metrics_registry.histogram(
+    "resume_pdf_bytes", "Size of uploaded or exported PDFs.", ("kind",), buckets=BYTE_BUCKETS
+)
+ADMISSION_WAITING = metrics_registry.gauge(
+    "resume_admission_waiting", "Analysis requests waiting for a rate limit token."
+)
+ADMISSION_WAIT_SECONDS = metrics_registry.histogram(
+    "resume_admission_wait_seconds", "Time admitted analysis requests waited for a rate limit token."
+)
+ADMISSION_REJECTIONS = metrics_registry.counter(
+    "resume_admission_rejections_total", "Analysis requests answered with 429, by limiting bucket.", ("reason",)
+)
+
+
+class track_stage:
+    """
+    Context manager that times one pipeline stage into STAGE_SECONDS and
+    counts any exception leaving it in STAGE_ERRORS, without swallowing it.
+    """
+    __slots__ = ("stage", "started")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.started = 0.0
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> Optional[bool]:
+        STAGE_SECONDS.observe(time.perf_counter() - self.started, self.stage)
+        if exc_type is not None:
+            STAGE_ERRORS.inc(self.stage, exc_type.__name__)
+        return None
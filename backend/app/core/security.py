@@ -1,21 +1,35 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status, Request
+from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import event, select
 import logging
 
 from app.core.config import settings
 from app.models.user import User
-from app.core.database import get_db
+from app.core.database import AsyncSessionLocal
+from app.core.auth_cache import auth_cache
 
 logger = logging.getLogger(__name__)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Pinning the desired rounds to BCRYPT_ROUNDS makes needs_update() flag hashes of any other cost
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_desired_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_desired_rounds=settings.BCRYPT_ROUNDS,
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
+# bcrypt releases the GIL, so a small thread pool keeps hashing off the event loop
+_hash_executor: Optional[ThreadPoolExecutor] = None
+_hash_pending = 0
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against a hashed password."""
@@ -27,6 +41,53 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def _get_hash_executor() -> ThreadPoolExecutor:
+    """Get the shared password hashing pool, creating it on first use."""
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+        )
+    return _hash_executor
+
+
+def shutdown_hash_pool():
+    """Shut down the password hashing pool."""
+    global _hash_executor
+    executor, _hash_executor = _hash_executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def _run_hash(fn, *args):
+    """Run a bcrypt operation in the hashing pool; 503 when PASSWORD_HASH_MAX_QUEUE are already waiting."""
+    global _hash_pending
+    if _hash_pending >= settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_MAX_QUEUE:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-in attempts in progress. Please try again shortly.",
+            headers={"Retry-After": "1"}
+        )
+    _hash_pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_hash_executor(), fn, *args)
+    finally:
+        _hash_pending -= 1
+
+
+async def hash_password(password: str) -> str:
+    """Hash a password in the hashing pool."""
+    return await _run_hash(pwd_context.hash, password)
+
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """
+    Verify a password in the hashing pool. Also returns a new hash when the
+    stored one was made with a different BCRYPT_ROUNDS, else None.
+    """
+    return await _run_hash(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -39,34 +100,52 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-def get_current_user(request: Request, token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
-    """Get current authenticated user from JWT token."""
+async def _load_user(user_id: int) -> Optional[dict]:
+    """Fetch the fields of the user a token refers to, or None if the user no longer exists."""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(User.id, User.email, User.created_at).where(User.id == user_id))
+        row = result.first()
+        return dict(row._mapping) if row is not None else None
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
+    """
+    Get current authenticated user from JWT token.
+    Verified tokens are cached with their user for AUTH_CACHE_TTL_SECONDS, so
+    repeat requests skip JWT decoding and the database. The returned User is
+    a detached projection (id, email, created_at).
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    # Log Authorization header for debugging
-    auth_header = request.headers.get("Authorization", "NOT FOUND")
-    logger.info(f"Authorization header received: {auth_header[:50] if auth_header != 'NOT FOUND' else 'NOT FOUND'}")
-    logger.info(f"Token extracted: {token[:30] if token else 'None'}...")
-    
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id_str = payload.get("sub")
-        if user_id_str is None:
-            logger.error("Token payload missing 'sub' field")
+    user_fields = auth_cache.get(token) if settings.AUTH_CACHE_ENABLED else None
+    if user_fields is None:
+        try:
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+            user_id_str = payload.get("sub")
+            if user_id_str is None:
+                raise credentials_exception
+            # Convert string back to integer
+            user_id = int(user_id_str)
+        except (JWTError, ValueError) as e:
+            logger.debug(f"Rejected access token: {str(e)}")
+            raise credentials_exception
+        
+        user_fields = await _load_user(user_id)
+        if user_fields is None:
+            logger.debug(f"Access token refers to missing user {user_id}")
             raise credentials_exception
-        # Convert string back to integer
-        user_id = int(user_id_str)
-    except (JWTError, ValueError) as e:
-        logger.error(f"JWT decode error: {str(e)}")
-        raise credentials_exception
+        if settings.AUTH_CACHE_ENABLED:
+            auth_cache.set(token, user_fields, payload.get("exp"))
     
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
-        logger.error(f"User with id {user_id} not found")
-        raise credentials_exception
-    logger.info(f"User authenticated: {user.email}")
-    return user
+    return User(**user_fields)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target: User):
+    """Drop cached tokens of a user changed through the ORM in this process; other replicas wait out the TTL."""
+    auth_cache.invalidate_user(target.id)
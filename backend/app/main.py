@@ -1,8 +1,14 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, status
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.core.database import init_db
+from app.core.database import init_db, close_db
+from app.core.metrics import metrics_registry
 from app.api import auth, analyze
+from app.services.openai_service import init_openai_client, close_openai_client
+from app.services.resume_service import shutdown_extraction_pool, UploadSizeLimitMiddleware
+from app.services.pdf_service import shutdown_render_pool
+from app.core.security import shutdown_hash_pool
 import logging
 
 # Configure logging
@@ -24,6 +30,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Bound upload request bodies before they are parsed; batches (PDFs or one ZIP) share the archive limit
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    default_limit=settings.MAX_UPLOAD_SIZE,
+    path_limits={
+        "/analyze/batch": settings.BATCH_MAX_ARCHIVE_SIZE,
+        "/analyze/match/documents": settings.BATCH_MAX_ARCHIVE_SIZE,
+    },
+)
+
 # Include routers
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(analyze.router, prefix="/analyze", tags=["analyze"])
@@ -31,11 +47,30 @@ app.include_router(analyze.router, prefix="/analyze", tags=["analyze"])
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database on startup."""
+    """Initialize database and shared OpenAI client on startup."""
     init_db()
+    init_openai_client()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release database and OpenAI connection pools, extraction, rendering and hashing workers on shutdown."""
+    await close_db()
+    await close_openai_client()
+    shutdown_extraction_pool()
+    shutdown_render_pool()
+    shutdown_hash_pool()
 
 
 @app.get("/")
 async def root():
     """Root endpoint."""
     return {"message": "Resume Analyzer API"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics: per-stage latency, OpenAI tokens and fallbacks, PDF sizes and errors."""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    return Response(metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,3 +1,9 @@
 from app.models.user import User
+from app.models.analysis_cache import AnalysisCacheEntry
+from app.models.analysis_job import AnalysisJob
+from app.models.analysis import Analysis
+from app.models.rate_limit_bucket import RateLimitBucket
+from app.models.match_document import MatchDocument
+from app.models.rewrite_context import RewriteContext
 
-__all__ = ["User"]
+__all__ = ["User", "AnalysisCacheEntry", "AnalysisJob", "Analysis", "RateLimitBucket", "MatchDocument", "RewriteContext"]
@@ -0,0 +1,29 @@
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Text, Index
+from app.core.database import Base
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class Analysis(Base):
+    __tablename__ = "analyses"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    content_hash = Column(String(64), nullable=False, index=True)  # Analysis cache key of the resume text
+    filename = Column(String, nullable=True)
+    target_role = Column(String, nullable=True)
+    score = Column(Integer, nullable=False)
+    structure_feedback = Column(Text, nullable=False)
+    keyword_analysis = Column(Text, nullable=False)
+    improvements = Column(JSON, nullable=False)
+    improved_content = Column(Text, nullable=True)  # Filled in once the lazy rewrite finishes
+    # Set in Python so keyset cursors round-trip exactly on every backend
+    created_at = Column(DateTime(timezone=True), nullable=False, default=_now)
+
+    __table_args__ = (
+        # id breaks ties between analyses created in the same instant
+        Index("ix_analyses_user_id_created_at", "user_id", "created_at", "id"),
+    )
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, LargeBinary, Text, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class AnalysisJob(Base):
+    __tablename__ = "analysis_jobs"
+
+    id = Column(String(32), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    status = Column(String(16), nullable=False, default="queued")
+    filename = Column(String, nullable=False)
+    target_role = Column(String, nullable=True)
+    callback_url = Column(String, nullable=True)
+    content = Column(LargeBinary, nullable=True)  # Uploaded PDF, cleared once the job finishes
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_analysis_jobs_status_created_at", "status", "created_at"),
+    )
@@ -0,0 +1,25 @@
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index, UniqueConstraint
+from app.core.database import Base
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class MatchDocument(Base):
+    """Extracted resume text in a user's job-description matching index."""
+    __tablename__ = "match_documents"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    content_hash = Column(String(64), nullable=False)  # SHA-256 of the text; a resume is indexed once per user
+    filename = Column(String, nullable=True)
+    text = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=_now)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "content_hash", name="uq_match_documents_user_id_content_hash"),
+        # Indexes catch up on a user's documents in id order
+        Index("ix_match_documents_user_id_id", "user_id", "id"),
+    )
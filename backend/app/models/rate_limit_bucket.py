@@ -0,0 +1,10 @@
+from sqlalchemy import Column, String, Float
+from app.core.database import Base
+
+
+class RateLimitBucket(Base):
+    __tablename__ = "rate_limit_buckets"
+
+    key = Column(String(64), primary_key=True)  # "global" or "user:<id>"
+    tokens = Column(Float, nullable=False)  # Tokens left as of updated_at
+    updated_at = Column(Float, nullable=False)  # Unix time of the last refill
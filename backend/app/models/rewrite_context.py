@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, DateTime, JSON, Text
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class RewriteContext(Base):
+    """What a lazy improved_content rewrite needs, so any replica can generate it."""
+    __tablename__ = "rewrite_contexts"
+
+    analysis_id = Column(String(64), primary_key=True)  # Analysis cache key of the scored resume
+    resume_text = Column(Text, nullable=False)
+    target_role = Column(String, nullable=True)
+    scoring = Column(JSON, nullable=False)  # Scoring result the rewrite applies
+    improved_content = Column(Text, nullable=True)  # Set once the rewrite has been generated
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
@@ -0,0 +1,248 @@
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.analysis_cache import AnalysisCacheEntry
+
+logger = logging.getLogger(__name__)
+
+_whitespace_pattern = re.compile(r'\s+')
+PERSISTENT_PRUNE_EVERY = 100  # Persistent cache writes per process between sweeps of expired and excess rows
+
+
+def make_analysis_cache_key(resume_text: str, target_role: Optional[str], model: str) -> str:
+    """
+    Build a content-addressed cache key from the normalized resume text,
+    target role and model name.
+    """
+    normalized_text = _whitespace_pattern.sub(' ', resume_text).strip()
+    normalized_role = _whitespace_pattern.sub(' ', target_role or '').strip().lower()
+    digest = hashlib.sha256()
+    for part in (model, normalized_role, normalized_text):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def make_pdf_cache_key(content: str, render_settings: tuple) -> str:
+    """Build a content-addressed key for a rendered PDF from the exact text and render settings."""
+    digest = hashlib.sha256()
+    digest.update(repr(render_settings).encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(content.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """
+    Two-tier cache for analysis results: a bounded in-process LRU in front of
+    an optional Postgres table. Entries expire after `ttl_seconds` in both tiers;
+    the table is swept down to `persistent_max_entries` every
+    PERSISTENT_PRUNE_EVERY writes, so it can briefly exceed the cap.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int, persistent: bool, persistent_max_entries: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.persistent = persistent
+        self.persistent_max_entries = persistent_max_entries
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._persistent_writes = 0
+
+    async def get(self, key: str) -> Optional[dict]:
+        """Return the cached analysis for `key`, or None on a miss."""
+        payload = self._get_memory(key)
+        if payload is not None:
+            self.memory_hits += 1
+            return payload
+
+        if self.persistent:
+            try:
+                payload = await run_in_threadpool(self._get_persistent, key)
+            except Exception as e:
+                logger.warning(f"Persistent analysis cache read failed: {str(e)}")
+                payload = None
+            if payload is not None:
+                self.persistent_hits += 1
+                self._set_memory(key, payload)
+                return payload
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, payload: dict, model: str):
+        """Store an analysis result in both tiers."""
+        self._set_memory(key, payload)
+        if self.persistent:
+            try:
+                await run_in_threadpool(self._set_persistent, key, payload, model)
+            except Exception as e:
+                logger.warning(f"Persistent analysis cache write failed: {str(e)}")
+
+    def clear(self):
+        """Drop all in-process entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and current size."""
+        hits = self.memory_hits + self.persistent_hits
+        lookups = hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "memory_hits": self.memory_hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+    def _get_memory(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, payload = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.evictions += 1
+                return None
+            self._entries.move_to_end(key)
+            return payload
+
+    def _set_memory(self, key: str, payload: dict):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _get_persistent(self, key: str) -> Optional[dict]:
+        db = SessionLocal()
+        try:
+            entry = db.get(AnalysisCacheEntry, key)
+            if entry is None:
+                return None
+            created_at = entry.created_at
+            if created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=timezone.utc)
+            if datetime.now(timezone.utc) - created_at > timedelta(seconds=self.ttl_seconds):
+                db.delete(entry)
+                db.commit()
+                return None
+            return entry.payload
+        finally:
+            db.close()
+
+    def _set_persistent(self, key: str, payload: dict, model: str):
+        db = SessionLocal()
+        try:
+            db.merge(AnalysisCacheEntry(
+                key=key,
+                model=model,
+                payload=payload,
+                created_at=datetime.now(timezone.utc)
+            ))
+            db.commit()
+
+            with self._lock:
+                self._persistent_writes += 1
+                if self._persistent_writes % PERSISTENT_PRUNE_EVERY:
+                    return
+            # Drop expired rows, then the oldest rows beyond the size cap
+            cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.ttl_seconds)
+            db.query(AnalysisCacheEntry).filter(AnalysisCacheEntry.created_at < cutoff).delete()
+            overflow = db.query(AnalysisCacheEntry).count() - self.persistent_max_entries
+            if overflow > 0:
+                oldest = (
+                    db.query(AnalysisCacheEntry.key)
+                    .order_by(AnalysisCacheEntry.created_at)
+                    .limit(overflow)
+                    .subquery()
+                )
+                db.query(AnalysisCacheEntry).filter(
+                    AnalysisCacheEntry.key.in_(oldest.select())
+                ).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+
+class PDFCache:
+    """In-process LRU of rendered PDFs, bounded by the total size of the stored bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0  # Requests answered with 304 from the client's ETag alone
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            pdf_bytes = self._entries.get(key)
+            if pdf_bytes is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return pdf_bytes
+
+    def set(self, key: str, pdf_bytes: bytes):
+        if len(pdf_bytes) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= len(previous)
+            self._entries[key] = pdf_bytes
+            self.bytes += len(pdf_bytes)
+            while self.bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= len(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+analysis_cache = AnalysisCache(
+    max_entries=settings.ANALYSIS_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.ANALYSIS_CACHE_TTL_SECONDS,
+    persistent=settings.ANALYSIS_CACHE_PERSISTENT,
+    persistent_max_entries=settings.ANALYSIS_CACHE_PERSISTENT_MAX_ENTRIES,
+)
+
+pdf_cache = PDFCache(max_bytes=settings.PDF_CACHE_MAX_BYTES)
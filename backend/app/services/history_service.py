@@ -0,0 +1,139 @@
+import base64
+import json
+import logging
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException, status
+from sqlalchemy import select, tuple_, update
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.analysis import Analysis
+
+logger = logging.getLogger(__name__)
+
+# Fields a history listing can project; id and created_at are always returned since they form the cursor
+HISTORY_FIELDS = (
+    "id", "created_at", "content_hash", "filename", "target_role", "score",
+    "structure_feedback", "keyword_analysis", "improvements", "improved_content",
+)
+DEFAULT_LIST_FIELDS = ("id", "created_at", "filename", "target_role", "score")
+
+
+def encode_cursor(created_at: datetime, analysis_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), analysis_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, analysis_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(analysis_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def parse_fields(fields: Optional[str]) -> tuple[str, ...]:
+    """Resolve a comma-separated projection into columns to select, rejecting unknown names."""
+    if not fields:
+        return DEFAULT_LIST_FIELDS
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in HISTORY_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+    return tuple(name for name in HISTORY_FIELDS if name in ("id", "created_at") or name in requested)
+
+
+async def record_analysis(
+    user_id: int,
+    content_hash: str,
+    filename: Optional[str],
+    target_role: Optional[str],
+    result: dict
+) -> Optional[int]:
+    """
+    Store an analysis in the user's history and return its id. Failures are
+    logged and return None so they never fail the analysis itself.
+    """
+    if not settings.HISTORY_ENABLED:
+        return None
+    try:
+        async with AsyncSessionLocal() as db:
+            analysis = Analysis(
+                user_id=user_id,
+                content_hash=content_hash,
+                filename=filename,
+                target_role=target_role,
+                score=result["score"],
+                structure_feedback=result["structure_feedback"],
+                keyword_analysis=result["keyword_analysis"],
+                improvements=result["improvements"],
+                improved_content=result.get("improved_content"),
+            )
+            db.add(analysis)
+            await db.commit()
+            return analysis.id
+    except Exception as e:
+        logger.warning(f"Could not store analysis history: {str(e)}")
+        return None
+
+
+async def set_improved_content(content_hash: str, improved_content: str):
+    """Fill in improved_content on stored analyses of `content_hash` once a lazy rewrite finishes."""
+    if not settings.HISTORY_ENABLED:
+        return
+    try:
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(Analysis)
+                .where(Analysis.content_hash == content_hash, Analysis.improved_content.is_(None))
+                .values(improved_content=improved_content)
+            )
+            await db.commit()
+    except Exception as e:
+        logger.warning(f"Could not store improved content in history: {str(e)}")
+
+
+async def list_analyses(
+    user_id: int,
+    limit: int,
+    cursor: Optional[str] = None,
+    fields: tuple[str, ...] = DEFAULT_LIST_FIELDS
+) -> tuple[list[dict], Optional[str]]:
+    """
+    Return one page of the user's analyses, newest first, and the cursor of
+    the next page. Keyset pagination on (created_at, id) walks the
+    (user_id, created_at, id) index, so every page costs the same however deep it is.
+    """
+    query = select(*(getattr(Analysis, name) for name in fields)).where(Analysis.user_id == user_id)
+    if cursor is not None:
+        created_at, analysis_id = decode_cursor(cursor)
+        query = query.where(tuple_(Analysis.created_at, Analysis.id) < tuple_(created_at, analysis_id))
+    # Fetch one extra row to learn whether another page follows
+    query = query.order_by(Analysis.created_at.desc(), Analysis.id.desc()).limit(limit + 1)
+
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(query)).all()
+
+    items = [dict(row._mapping) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(last["created_at"], last["id"])
+    return items, next_cursor
+
+
+async def get_analysis(user_id: int, analysis_id: int) -> Optional[dict]:
+    """Return one stored analysis with every field, or None if it is not the user's."""
+    query = select(*(getattr(Analysis, name) for name in HISTORY_FIELDS)).where(
+        Analysis.id == analysis_id, Analysis.user_id == user_id
+    )
+    async with AsyncSessionLocal() as db:
+        row = (await db.execute(query)).first()
+    return dict(row._mapping) if row is not None else None
@@ -0,0 +1,358 @@
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+import httpx
+from sqlalchemy import or_, and_
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.analysis_job import AnalysisJob
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[["JobRecord"], Awaitable[dict]]
+
+
+@dataclass
+class JobRecord:
+    id: str
+    user_id: int
+    status: str
+    filename: str
+    target_role: Optional[str] = None
+    callback_url: Optional[str] = None
+    content: Optional[bytes] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class InMemoryJobBackend:
+    """
+    Job store for a single app process. Finished jobs are kept for
+    JOB_RESULT_TTL_SECONDS, and only the JOB_MAX_FINISHED most recent ones.
+    """
+
+    def __init__(self):
+        self._jobs: dict[str, JobRecord] = {}
+        self._finished: OrderedDict[str, datetime] = OrderedDict()  # Job id -> finished_at, oldest first
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+
+    async def enqueue(self, job: JobRecord):
+        self._jobs[job.id] = job
+        self._queue.put_nowait(job.id)
+
+    async def claim(self) -> Optional[JobRecord]:
+        try:
+            job_id = await asyncio.wait_for(self._queue.get(), timeout=settings.JOB_POLL_INTERVAL)
+        except asyncio.TimeoutError:
+            return None
+        job = self._jobs[job_id]
+        job.status = "running"
+        job.started_at = _now()
+        return job
+
+    async def finish(self, job: JobRecord):
+        stored = self._jobs[job.id]
+        stored.status, stored.result, stored.error = job.status, job.result, job.error
+        stored.finished_at = job.finished_at
+        stored.content = None
+        self._finished[job.id] = job.finished_at or _now()
+        self._expire()
+
+    def _expire(self):
+        cutoff = _now() - timedelta(seconds=settings.JOB_RESULT_TTL_SECONDS)
+        while self._finished:
+            job_id, finished_at = next(iter(self._finished.items()))
+            if len(self._finished) <= settings.JOB_MAX_FINISHED and finished_at >= cutoff:
+                break
+            self._finished.popitem(last=False)
+            self._jobs.pop(job_id, None)
+
+    async def get(self, job_id: str, user_id: int) -> Optional[JobRecord]:
+        self._expire()
+        job = self._jobs.get(job_id)
+        if job is None or job.user_id != user_id:
+            return None
+        return job
+
+    async def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+
+class PostgresJobBackend:
+    """
+    Job store shared by several app replicas. Workers claim jobs with
+    SELECT ... FOR UPDATE SKIP LOCKED so each job runs exactly once.
+    """
+
+    async def enqueue(self, job: JobRecord):
+        await run_in_threadpool(self._enqueue, job)
+
+    async def claim(self) -> Optional[JobRecord]:
+        job = await run_in_threadpool(self._claim)
+        if job is None:
+            await asyncio.sleep(settings.JOB_POLL_INTERVAL)
+        return job
+
+    async def finish(self, job: JobRecord):
+        await run_in_threadpool(self._finish, job)
+
+    async def get(self, job_id: str, user_id: int) -> Optional[JobRecord]:
+        return await run_in_threadpool(self._get, job_id, user_id)
+
+    async def queue_depth(self) -> int:
+        return await run_in_threadpool(self._queue_depth)
+
+    @staticmethod
+    def _to_record(row: AnalysisJob, with_content: bool = False) -> JobRecord:
+        return JobRecord(
+            id=row.id,
+            user_id=row.user_id,
+            status=row.status,
+            filename=row.filename,
+            target_role=row.target_role,
+            callback_url=row.callback_url,
+            content=row.content if with_content else None,
+            result=row.result,
+            error=row.error,
+            created_at=_as_utc(row.created_at),
+            started_at=_as_utc(row.started_at),
+            finished_at=_as_utc(row.finished_at),
+        )
+
+    def _enqueue(self, job: JobRecord):
+        db = SessionLocal()
+        try:
+            db.add(AnalysisJob(
+                id=job.id,
+                user_id=job.user_id,
+                status=job.status,
+                filename=job.filename,
+                target_role=job.target_role,
+                callback_url=job.callback_url,
+                content=job.content,
+                created_at=job.created_at
+            ))
+            db.commit()
+        finally:
+            db.close()
+
+    def _claim(self) -> Optional[JobRecord]:
+        db = SessionLocal()
+        try:
+            stale_before = _now() - timedelta(seconds=settings.JOB_STALE_SECONDS)
+            row = (
+                db.query(AnalysisJob)
+                .filter(or_(
+                    AnalysisJob.status == "queued",
+                    # Jobs left running by a replica that died are picked up again
+                    and_(AnalysisJob.status == "running", AnalysisJob.started_at < stale_before)
+                ))
+                .order_by(AnalysisJob.created_at)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+                .first()
+            )
+            if row is None:
+                db.rollback()
+                return None
+            # Guard on the observed state as well, in case the driver ignored the row lock
+            started_at = _now()
+            claimed = (
+                db.query(AnalysisJob)
+                .filter(
+                    AnalysisJob.id == row.id,
+                    AnalysisJob.status == row.status,
+                    AnalysisJob.started_at.is_(None) if row.started_at is None
+                    else AnalysisJob.started_at == row.started_at
+                )
+                .update({AnalysisJob.status: "running", AnalysisJob.started_at: started_at},
+                        synchronize_session=False)
+            )
+            db.commit()
+            if not claimed:
+                return None
+            job = self._to_record(row, with_content=True)
+            job.status, job.started_at = "running", started_at
+            return job
+        finally:
+            db.close()
+
+    def _finish(self, job: JobRecord):
+        db = SessionLocal()
+        try:
+            db.query(AnalysisJob).filter(AnalysisJob.id == job.id).update({
+                AnalysisJob.status: job.status,
+                AnalysisJob.result: job.result,
+                AnalysisJob.error: job.error,
+                AnalysisJob.finished_at: job.finished_at,
+                AnalysisJob.content: None,
+            })
+            db.commit()
+        finally:
+            db.close()
+
+    def _get(self, job_id: str, user_id: int) -> Optional[JobRecord]:
+        db = SessionLocal()
+        try:
+            row = (
+                db.query(AnalysisJob)
+                .filter(AnalysisJob.id == job_id, AnalysisJob.user_id == user_id)
+                .first()
+            )
+            return self._to_record(row) if row is not None else None
+        finally:
+            db.close()
+
+    def _queue_depth(self) -> int:
+        db = SessionLocal()
+        try:
+            return db.query(AnalysisJob).filter(AnalysisJob.status == "queued").count()
+        finally:
+            db.close()
+
+
+class JobQueue:
+    """Background analysis jobs: enqueue, worker tasks, and queue timing stats."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._handler: Optional[JobHandler] = None
+        self._workers: list[asyncio.Task] = []
+        self.running = 0
+        self.succeeded = 0
+        self.failed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._run_total = 0.0
+        self._run_max = 0.0
+
+    async def enqueue(
+        self,
+        user_id: int,
+        filename: str,
+        content: bytes,
+        target_role: Optional[str] = None,
+        callback_url: Optional[str] = None
+    ) -> JobRecord:
+        job = JobRecord(
+            id=uuid.uuid4().hex,
+            user_id=user_id,
+            status="queued",
+            filename=filename,
+            target_role=target_role,
+            callback_url=callback_url,
+            content=content,
+            created_at=_now()
+        )
+        await self.backend.enqueue(job)
+        return job
+
+    async def get(self, job_id: str, user_id: int) -> Optional[JobRecord]:
+        return await self.backend.get(job_id, user_id)
+
+    def start(self, handler: JobHandler, workers: int):
+        """Start `workers` tasks that run `handler` for each claimed job."""
+        self._handler = handler
+        self._workers = [asyncio.create_task(self._work()) for _ in range(workers)]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def stats(self) -> dict:
+        finished = self.succeeded + self.failed
+        return {
+            "backend": type(self.backend).__name__,
+            "workers": len(self._workers),
+            "queue_depth": await self.backend.queue_depth(),
+            "running": self.running,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "avg_wait_seconds": self._wait_total / finished if finished else 0.0,
+            "max_wait_seconds": self._wait_max,
+            "avg_run_seconds": self._run_total / finished if finished else 0.0,
+            "max_run_seconds": self._run_max,
+        }
+
+    async def _work(self):
+        while True:
+            try:
+                job = await self.backend.claim()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Failed to claim analysis job: {str(e)}")
+                await asyncio.sleep(settings.JOB_POLL_INTERVAL)
+                continue
+            if job is not None:
+                await self._run(job)
+
+    async def _run(self, job: JobRecord):
+        self.running += 1
+        try:
+            job.result = await self._handler(job)
+            job.status = "succeeded"
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(getattr(e, "detail", None) or e)
+        finally:
+            self.running -= 1
+        job.finished_at = _now()
+
+        wait = (job.started_at - job.created_at).total_seconds()
+        run = (job.finished_at - job.started_at).total_seconds()
+        self._wait_total += wait
+        self._wait_max = max(self._wait_max, wait)
+        self._run_total += run
+        self._run_max = max(self._run_max, run)
+        if job.status == "succeeded":
+            self.succeeded += 1
+        else:
+            self.failed += 1
+
+        try:
+            await self.backend.finish(job)
+        except Exception as e:
+            logger.error(f"Failed to store result of analysis job {job.id}: {str(e)}")
+            return
+        if job.callback_url and settings.JOB_WEBHOOKS_ENABLED:
+            await _send_webhook(job)
+
+
+async def _send_webhook(job: JobRecord):
+    """POST the finished job to its callback URL; failures are logged, not retried."""
+    payload = {"id": job.id, "status": job.status, "result": job.result, "error": job.error}
+    try:
+        async with httpx.AsyncClient(timeout=settings.JOB_WEBHOOK_TIMEOUT) as client:
+            await client.post(job.callback_url, json=payload)
+    except Exception as e:
+        logger.warning(f"Webhook for analysis job {job.id} failed: {str(e)}")
+
+
+def _create_backend():
+    if settings.JOB_BACKEND == "postgres":
+        return PostgresJobBackend()
+    return InMemoryJobBackend()
+
+
+job_queue = JobQueue(_create_backend())
@@ -0,0 +1,171 @@
+import json
+from typing import Iterable, Optional
+
+
+class JSONObjectStreamParser:
+    """
+    Incremental parser for a single top-level JSON object arriving in chunks.
+
+    `feed()` returns events as soon as they can be produced:
+    - ("field", (key, value)) when a top-level value is complete
+    - ("delta", (key, text)) for newly decoded text of a top-level string
+      value whose key is listed in `stream_keys`, before the string closes
+    """
+
+    def __init__(self, stream_keys: Iterable[str] = ()):
+        self.stream_keys = set(stream_keys)
+        self.done = False
+        self._state = "start"
+        self._key: list[str] = []
+        self._current_key: Optional[str] = None
+        self._value: list[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = 0
+        # Raw (still escaped) characters of a streamed string and how much was emitted
+        self._raw: list[str] = []
+        self._safe_len = 0
+        self._emitted = 0
+
+    def feed(self, chunk: str) -> list[tuple[str, tuple]]:
+        events = []
+        for char in chunk:
+            if self.done:
+                break
+            state = self._state
+            if state == "start":
+                if char == "{":
+                    self._state = "key"
+                elif not char.isspace():
+                    raise ValueError(f"Expected '{{' at start of JSON, got {char!r}")
+            elif state == "key":
+                if char == '"':
+                    self._state = "in_key"
+                    self._key = []
+                elif char == "}":
+                    self.done = True
+                elif not char.isspace() and char != ",":
+                    raise ValueError(f"Expected object key, got {char!r}")
+            elif state == "in_key":
+                self._feed_key_char(char)
+            elif state == "colon":
+                if char == ":":
+                    self._state = "value"
+                elif not char.isspace():
+                    raise ValueError(f"Expected ':', got {char!r}")
+            elif state == "value":
+                if not char.isspace():
+                    self._start_value(char)
+            elif state == "in_value":
+                events.extend(self._feed_value_char(char))
+            elif state == "after_value":
+                if char == ",":
+                    self._state = "key"
+                elif char == "}":
+                    self.done = True
+                elif not char.isspace():
+                    raise ValueError(f"Expected ',' or '}}', got {char!r}")
+
+        if self._state == "in_value" and self._streaming:
+            delta = self._decode_pending()
+            if delta:
+                events.append(("delta", (self._current_key, delta)))
+        return events
+
+    @property
+    def _streaming(self) -> bool:
+        return self._depth == 0 and self._in_string and self._current_key in self.stream_keys
+
+    def _feed_key_char(self, char: str):
+        if self._escape:
+            self._escape = 0
+            self._key.append(char)
+        elif char == "\\":
+            self._escape = 1
+            self._key.append(char)
+        elif char == '"':
+            self._current_key = json.loads('"' + "".join(self._key) + '"')
+            self._state = "colon"
+        else:
+            self._key.append(char)
+
+    def _start_value(self, char: str):
+        self._state = "in_value"
+        self._value = [char]
+        self._depth = 0
+        self._in_string = char == '"'
+        self._escape = 0
+        self._raw = []
+        self._safe_len = 0
+        self._emitted = 0
+        if char in "{[":
+            self._depth = 1
+
+    def _feed_value_char(self, char: str) -> list[tuple[str, tuple]]:
+        if self._in_string:
+            top_level_string = self._depth == 0
+            if self._escape:
+                # \uXXXX needs four more characters after the 'u'
+                if self._escape == 1 and char == "u":
+                    self._escape = 5
+                self._escape -= 1
+            elif char == "\\":
+                self._escape = 1
+            elif char == '"':
+                self._in_string = False
+                self._value.append(char)
+                if not top_level_string:
+                    return []
+                events = []
+                if self._current_key in self.stream_keys:
+                    delta = self._decode_pending()
+                    if delta:
+                        events.append(("delta", (self._current_key, delta)))
+                events.append(self._finish_value())
+                return events
+            self._value.append(char)
+            if top_level_string:
+                self._raw.append(char)
+                if not self._escape:
+                    self._safe_len = len(self._raw)
+            return []
+
+        if self._depth == 0:
+            # Scalar value: number, true, false or null
+            if char in ",}" or char.isspace():
+                event = self._finish_value()
+                if char == ",":
+                    self._state = "key"
+                elif char == "}":
+                    self.done = True
+                return [event]
+            self._value.append(char)
+            return []
+
+        self._value.append(char)
+        if char == '"':
+            self._in_string = True
+        elif char in "{[":
+            self._depth += 1
+        elif char in "}]":
+            self._depth -= 1
+            if self._depth == 0:
+                return [self._finish_value()]
+        return []
+
+    def _finish_value(self) -> tuple[str, tuple]:
+        self._state = "after_value"
+        return ("field", (self._current_key, json.loads("".join(self._value))))
+
+    def _decode_pending(self) -> str:
+        """Decode raw string characters received since the last delta, stopping short of partial escapes."""
+        if self._safe_len <= self._emitted:
+            return ""
+        safe_len = self._safe_len
+        text = json.loads('"' + "".join(self._raw[self._emitted:safe_len]) + '"')
+        # Hold back a trailing high surrogate until its pair arrives
+        if text and "\ud800" <= text[-1] <= "\udbff":
+            text = text[:-1]
+            safe_len -= 6
+        self._emitted = safe_len
+        return text
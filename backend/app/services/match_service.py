@@ -0,0 +1,303 @@
+import asyncio
+import hashlib
+import logging
+import re
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+import numpy as np
+from scipy import sparse
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import LatencyHistogram
+from app.models.match_document import MatchDocument
+
+logger = logging.getLogger(__name__)
+
+MATCH_METHODS = ("bm25", "tfidf")
+BM25_K1 = 1.2  # Term frequency saturation
+BM25_B = 0.75  # Document length normalization
+CATCH_UP_BATCH = 1000  # Documents loaded per query when an index catches up with the database
+# Ids below an index's highest id that are checked again on every catch-up: concurrent inserts can
+# commit out of id order, so a lower id may become visible after a higher one was already indexed
+CATCH_UP_RESCAN_IDS = 10000
+# Upper bounds in seconds for ranking latency buckets; the last bucket is open-ended
+RANK_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# Terms like "c++", "c#", "node.js" and "ci/cd" parts survive; trailing dots are dropped
+_token_pattern = re.compile(r'[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9+#]+)*')
+STOPWORDS = frozenset({
+    'a', 'about', 'across', 'after', 'all', 'also', 'an', 'and', 'any', 'are', 'as', 'at', 'be', 'been',
+    'both', 'but', 'by', 'can', 'do', 'each', 'for', 'from', 'has', 'have', 'how', 'if', 'in', 'including',
+    'into', 'is', 'it', 'its', 'more', 'most', 'must', 'new', 'not', 'of', 'on', 'or', 'other', 'our',
+    'out', 'over', 'per', 'plus', 'such', 'than', 'that', 'the', 'their', 'them', 'these', 'they', 'this',
+    'through', 'to', 'under', 'up', 'us', 'using', 'was', 'we', 'well', 'were', 'what', 'when', 'where',
+    'which', 'while', 'who', 'will', 'with', 'within', 'work', 'would', 'you', 'your',
+    # Job posting filler that every resume and posting shares
+    'ability', 'able', 'candidate', 'experience', 'experienced', 'hiring', 'ideal', 'join', 'looking',
+    'preferred', 'required', 'requirements', 'responsibilities', 'role', 'strong', 'team', 'year', 'years',
+})
+# Generic verbs and posting filler: still scored when ranking, never reported as keywords
+KEYWORD_FILLER = frozenset({
+    'apply', 'benefits', 'bonus', 'build', 'building', 'company', 'create', 'customers', 'day', 'deliver',
+    'develop', 'developing', 'drive', 'environment', 'excellent', 'excited', 'familiarity', 'fast', 'good',
+    'great', 'help', 'impact', 'improve', 'job', 'knowledge', 'like', 'make', 'millions', 'need', 'nice',
+    'opportunity', 'own', 'passionate', 'position', 'reduce', 'remote', 'run', 'salary', 'senior', 'ship',
+    'skills', 'support', 'understanding', 'users', 'want', 'world',
+})
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase terms of `text` without stopwords, bare numbers or single characters."""
+    return [
+        term for term in (token.rstrip('.') for token in _token_pattern.findall(text.lower()))
+        if len(term) > 1 and term not in STOPWORDS and not term.isdigit()
+    ]
+
+
+def job_keywords(job_description: str, limit: int) -> list[str]:
+    """
+    The job description's most salient terms: most often mentioned first, ties
+    in order of first mention. Filler is left out, and how rare a term is among
+    the indexed resumes plays no part, so core skills every candidate lists stay in.
+    """
+    counts = Counter(term for term in tokenize(job_description) if term not in KEYWORD_FILLER)
+    # Counter keeps first-mention order, and sorted() is stable
+    return sorted(counts, key=lambda term: -counts[term])[:limit]
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+@dataclass
+class CandidateMatch:
+    document_id: int
+    filename: Optional[str]
+    score: float
+    keyword_coverage: float  # Share of the job description keywords found in the resume
+    matched_keywords: list[str] = field(default_factory=list)
+    missing_keywords: list[str] = field(default_factory=list)
+
+
+class MatchIndex:
+    """
+    Sparse term-frequency index over one user's resumes. Adding a document
+    tokenizes it and appends a row; the weighted matrices used for ranking
+    are rebuilt (vectorized, O(non-zeros)) on the first ranking after any
+    additions, since document frequencies and average length change.
+    """
+
+    def __init__(self):
+        self.vocabulary: dict[str, int] = {}
+        self.document_ids: list[int] = []
+        self._document_id_set: set[int] = set()
+        self.filenames: list[Optional[str]] = []
+        self.last_id = 0
+        self._indptr = [0]
+        self._columns: list[np.ndarray] = []
+        self._counts: list[np.ndarray] = []
+        self._lengths: list[int] = []
+        self._counts_matrix: Optional[sparse.csr_matrix] = None
+        self._bm25: Optional[sparse.csr_matrix] = None
+        self._tfidf: Optional[sparse.csr_matrix] = None
+        self._idf: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.document_ids)
+
+    def __contains__(self, document_id: int) -> bool:
+        return document_id in self._document_id_set
+
+    def add(self, document_id: int, filename: Optional[str], text: str):
+        counts = Counter(tokenize(text))
+        # Unseen terms get the next column; setdefault evaluates len() before inserting
+        self._columns.append(np.fromiter(
+            (self.vocabulary.setdefault(term, len(self.vocabulary)) for term in counts), dtype=np.int32, count=len(counts)
+        ))
+        self._counts.append(np.fromiter(counts.values(), dtype=np.float64, count=len(counts)))
+        self._indptr.append(self._indptr[-1] + len(counts))
+        self._lengths.append(sum(counts.values()))
+        self.document_ids.append(document_id)
+        self._document_id_set.add(document_id)
+        self.filenames.append(filename)
+        self.last_id = max(self.last_id, document_id)
+        self._counts_matrix = None
+
+    def _build(self):
+        documents, terms = len(self.document_ids), len(self.vocabulary)
+        columns = np.concatenate(self._columns) if self._columns else np.zeros(0, dtype=np.int32)
+        counts = np.concatenate(self._counts) if self._counts else np.zeros(0)
+        # Keep one consolidated array so the next build concatenates only the new rows onto it
+        self._columns, self._counts = [columns], [counts]
+        indptr = np.asarray(self._indptr, dtype=np.int64)
+        rows = np.repeat(np.arange(documents), np.diff(indptr))
+        lengths = np.asarray(self._lengths, dtype=np.float64)
+
+        document_frequency = np.bincount(columns, minlength=terms)
+        self._idf = np.log1p((documents - document_frequency + 0.5) / (document_frequency + 0.5))
+        self._counts_matrix = sparse.csr_matrix((counts, columns, indptr), shape=(documents, terms))
+
+        # BM25 term weights without idf, which is applied per query term
+        average_length = lengths.mean() if documents else 0.0
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / average_length) if average_length else np.ones(documents)
+        saturated = counts * (BM25_K1 + 1) / (counts + norm[rows])
+        self._bm25 = sparse.csr_matrix((saturated, columns, indptr), shape=(documents, terms))
+
+        # L2-normalized tf-idf rows for cosine similarity
+        weights = counts * self._idf[columns]
+        row_norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=documents))
+        row_norms[row_norms == 0] = 1.0
+        self._tfidf = sparse.csr_matrix((weights / row_norms[rows], columns, indptr), shape=(documents, terms))
+
+    def rank(self, job_description: str, limit: int, method: str = "bm25", max_keywords: int = 30) -> tuple[list[str], list[CandidateMatch]]:
+        """
+        Rank indexed resumes against a job description. Returns the job
+        description's keywords (see job_keywords) and the best `limit`
+        candidates with matched and missing keywords.
+        """
+        if self._counts_matrix is None:
+            self._build()
+        query_counts = Counter(tokenize(job_description))
+        keywords = job_keywords(job_description, max_keywords)
+        if not len(self) or not query_counts:
+            return keywords, []
+
+        known = [term for term in query_counts if term in self.vocabulary]
+        columns = np.fromiter((self.vocabulary[term] for term in known), dtype=np.int64, count=len(known))
+        query = np.zeros(len(self.vocabulary))
+        if method == "tfidf":
+            query[columns] = np.fromiter((query_counts[term] for term in known), dtype=np.float64, count=len(known)) * self._idf[columns]
+            query_norm = np.linalg.norm(query)
+            scores = self._tfidf @ (query / query_norm) if query_norm else np.zeros(len(self))
+        else:
+            query[columns] = self._idf[columns]
+            scores = self._bm25 @ query
+
+        if limit < len(scores):
+            top = np.argpartition(-scores, limit - 1)[:limit]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.lexsort((top, -scores[top]))]
+
+        keyword_columns = [self.vocabulary.get(term) for term in keywords]
+        present = np.zeros((len(top), len(keywords)), dtype=bool)
+        indexed = [position for position, column in enumerate(keyword_columns) if column is not None]
+        if indexed:
+            submatrix = self._counts_matrix[top][:, [keyword_columns[position] for position in indexed]]
+            present[:, indexed] = submatrix.toarray() > 0
+
+        results = []
+        for row, found in zip(top, present):
+            matched = [term for term, hit in zip(keywords, found) if hit]
+            results.append(CandidateMatch(
+                document_id=self.document_ids[row],
+                filename=self.filenames[row],
+                score=round(float(scores[row]), 4),
+                keyword_coverage=round(len(matched) / len(keywords), 4) if keywords else 0.0,
+                matched_keywords=matched,
+                missing_keywords=[term for term, hit in zip(keywords, found) if not hit],
+            ))
+        return keywords, results
+
+    def stats(self) -> dict:
+        return {"documents": len(self), "vocabulary": len(self.vocabulary), "non_zeros": self._indptr[-1]}
+
+
+class MatchService:
+    """
+    Per-user matching indexes over extracted resume text. Documents are stored
+    in match_documents; an in-memory index catches up on rows added (by any
+    replica) that it has not indexed yet before each ranking. The least recently used
+    indexes beyond MATCH_MAX_INDEXES are dropped and rebuilt when next used.
+    """
+
+    def __init__(self):
+        self._indexes: OrderedDict[int, MatchIndex] = OrderedDict()
+        self._locks: dict[int, asyncio.Lock] = {}
+        self.rankings = 0
+        self.rank_latency = LatencyHistogram(RANK_BUCKETS)
+
+    async def add_document(self, user_id: int, filename: Optional[str], text: str) -> Optional[int]:
+        """Store resume text in the user's matching index; returns its id, or None if it was already indexed."""
+        async with AsyncSessionLocal() as db:
+            insert = postgresql_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+            result = await db.execute(
+                insert(MatchDocument)
+                .values(user_id=user_id, content_hash=content_hash(text), filename=filename, text=text)
+                .on_conflict_do_nothing(index_elements=["user_id", "content_hash"])
+                .returning(MatchDocument.id)
+            )
+            document_id = result.scalar()
+            await db.commit()
+        return document_id
+
+    async def index_analyzed_resume(self, user_id: int, filename: Optional[str], text: str):
+        """Add an analyzed upload to the user's index; failures are logged and never fail the analysis."""
+        if not settings.MATCH_ENABLED:
+            return
+        try:
+            await self.add_document(user_id, filename, text)
+        except Exception as e:
+            logger.warning(f"Could not index resume for matching: {str(e)}")
+
+    async def _catch_up(self, user_id: int, index: MatchIndex):
+        """
+        Add the user's documents the index is missing. Ids are listed from
+        CATCH_UP_RESCAN_IDS below the highest indexed id (an index-only scan),
+        so rows that committed late are picked up too; text is loaded only for
+        ids not yet indexed.
+        """
+        async with AsyncSessionLocal() as db:
+            ids = (await db.execute(
+                select(MatchDocument.id)
+                .where(MatchDocument.user_id == user_id, MatchDocument.id > index.last_id - CATCH_UP_RESCAN_IDS)
+                .order_by(MatchDocument.id)
+            )).scalars().all()
+        missing = [document_id for document_id in ids if document_id not in index]
+        for start in range(0, len(missing), CATCH_UP_BATCH):
+            async with AsyncSessionLocal() as db:
+                rows = (await db.execute(
+                    select(MatchDocument.id, MatchDocument.filename, MatchDocument.text)
+                    .where(MatchDocument.id.in_(missing[start:start + CATCH_UP_BATCH]))
+                    .order_by(MatchDocument.id)
+                )).all()
+            await run_in_threadpool(lambda: [index.add(row.id, row.filename, row.text) for row in rows])
+
+    async def rank(self, user_id: int, job_description: str, limit: int, method: str = "bm25") -> tuple[list[str], list[CandidateMatch], int]:
+        """Rank the user's indexed resumes; returns keywords, the best `limit` candidates and the number ranked."""
+        lock = self._locks.setdefault(user_id, asyncio.Lock())
+        async with lock:
+            index = self._indexes.get(user_id)
+            if index is None:
+                index = self._indexes[user_id] = MatchIndex()
+            self._indexes.move_to_end(user_id)
+            while len(self._indexes) > settings.MATCH_MAX_INDEXES:
+                evicted, _ = self._indexes.popitem(last=False)
+                self._locks.pop(evicted, None)
+            await self._catch_up(user_id, index)
+
+            started = time.perf_counter()
+            keywords, results = await run_in_threadpool(
+                index.rank, job_description, limit, method, settings.MATCH_MAX_KEYWORDS
+            )
+            self.rank_latency.observe(time.perf_counter() - started)
+            self.rankings += 1
+        return keywords, results, len(index)
+
+    def stats(self) -> dict:
+        return {
+            "indexes": len(self._indexes),
+            "documents": sum(len(index) for index in self._indexes.values()),
+            "vocabulary": sum(len(index.vocabulary) for index in self._indexes.values()),
+            "rankings": self.rankings,
+            "rank_seconds": self.rank_latency.snapshot(),
+        }
+
+
+match_service = MatchService()
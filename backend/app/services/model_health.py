@@ -0,0 +1,135 @@
+import time
+from collections import deque
+from typing import Optional
+from app.core.config import settings
+from app.core.metrics import LatencyHistogram
+
+# Upper bounds in seconds for per-model latency buckets; the last bucket is open-ended
+LATENCY_BUCKETS = (0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker.
+
+    Closed: calls flow and outcomes are tracked over a sliding time window.
+    Open: calls are refused until `open_seconds` have passed.
+    Half-open: a single trial call is let through; its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_rate_threshold: float, min_calls: int, window_seconds: float, open_seconds: float):
+        self.failure_rate_threshold = failure_rate_threshold
+        self.min_calls = min_calls
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self.state = "closed"
+        self._outcomes: deque[tuple[float, bool]] = deque()
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        """Return True if a call may be made now, reserving the trial slot when half-open."""
+        if self.state == "open":
+            if time.monotonic() - self._opened_at < self.open_seconds:
+                return False
+            self.state = "half_open"
+            self._trial_in_flight = False
+        if self.state == "half_open":
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+        return True
+
+    def record_success(self):
+        if self.state == "half_open":
+            self.state = "closed"
+            self._outcomes.clear()
+        self._trial_in_flight = False
+        self._record(True)
+
+    def record_failure(self):
+        if self.state == "half_open":
+            self._open()
+            return
+        self._record(False)
+        if len(self._outcomes) >= self.min_calls and self.failure_rate() >= self.failure_rate_threshold:
+            self._open()
+
+    def release(self):
+        """Give back a half-open trial slot without recording an outcome (cancelled or bad-input calls)."""
+        self._trial_in_flight = False
+
+    def failure_rate(self) -> float:
+        self._prune()
+        if not self._outcomes:
+            return 0.0
+        return sum(1 for _, ok in self._outcomes if not ok) / len(self._outcomes)
+
+    def _record(self, ok: bool):
+        self._outcomes.append((time.monotonic(), ok))
+        self._prune()
+
+    def _prune(self):
+        cutoff = time.monotonic() - self.window_seconds
+        while self._outcomes and self._outcomes[0][0] < cutoff:
+            self._outcomes.popleft()
+
+    def _open(self):
+        self.state = "open"
+        self._opened_at = time.monotonic()
+        self._trial_in_flight = False
+        self._outcomes.clear()
+
+
+class ModelHealth:
+    """Breaker, latency histogram and outcome counters for one model."""
+
+    def __init__(self, model: str):
+        self.model = model
+        self.breaker = CircuitBreaker(
+            failure_rate_threshold=settings.BREAKER_FAILURE_RATE,
+            min_calls=settings.BREAKER_MIN_CALLS,
+            window_seconds=settings.BREAKER_WINDOW_SECONDS,
+            open_seconds=settings.BREAKER_OPEN_SECONDS,
+        )
+        self.latency = LatencyHistogram(LATENCY_BUCKETS)
+        self.successes = 0
+        self.failures = 0
+        self.rejected = 0  # Calls skipped because the circuit was open
+        self.hedges = 0  # Calls started as a hedge for a slow earlier model
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.breaker.state,
+            "failure_rate": self.breaker.failure_rate(),
+            "successes": self.successes,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "hedges": self.hedges,
+            "latency_seconds": self.latency.snapshot(),
+        }
+
+
+class ModelHealthRegistry:
+    def __init__(self):
+        self._models: dict[str, ModelHealth] = {}
+
+    def get(self, model: str) -> ModelHealth:
+        health = self._models.get(model)
+        if health is None:
+            health = self._models[model] = ModelHealth(model)
+        return health
+
+    def acquire(self, model: str) -> Optional[ModelHealth]:
+        """Return the model's health record if its breaker allows a call, else None."""
+        health = self.get(model)
+        if health.breaker.allow():
+            return health
+        health.rejected += 1
+        return None
+
+    def snapshot(self) -> dict:
+        return {model: health.snapshot() for model, health in self._models.items()}
+
+
+model_health = ModelHealthRegistry()
@@ -1,52 +1,95 @@
+import asyncio
 import json
-from typing import Optional
-from openai import OpenAI
+import time
+from typing import AsyncIterator, Optional
+import httpx
+import openai
+from fastapi import HTTPException, status
+from openai import AsyncOpenAI
 from app.core.config import settings
+from app.services.json_stream import JSONObjectStreamParser
+from app.services.model_health import model_health
+from app.core.metrics import OPENAI_FALLBACKS, OPENAI_SECONDS, OPENAI_TOKENS, STAGE_ERRORS, track_stage
+from app.services.text_preprocessing import preprocess_resume_text
 
+# Analysis fields streamed as text deltas rather than sent once complete
+STREAMED_FIELDS = ("improved_content",)
 
-def get_openai_client():
-    """Get OpenAI client instance."""
-    return OpenAI(api_key=settings.OPENAI_API_KEY)
+# Shared client and concurrency limit, created once per worker process
+_client: Optional[AsyncOpenAI] = None
+_semaphore: Optional[asyncio.Semaphore] = None
 
 
-async def analyze_resume(resume_text: str, target_role: Optional[str] = None) -> dict:
-    """
-    Analyze resume using OpenAI GPT-4.
-    Returns structured analysis with score, feedback, and improvements.
-    """
-    system_prompt = """You are an expert resume reviewer with years of experience in HR and recruitment. 
+def init_openai_client() -> AsyncOpenAI:
+    """Create the long-lived, connection-pooled OpenAI client."""
+    global _client, _semaphore
+    if _client is None:
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.OPENAI_MAX_CONNECTIONS,
+            ),
+            timeout=settings.OPENAI_TIMEOUT,
+        )
+        _client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL,
+            timeout=settings.OPENAI_TIMEOUT,
+            max_retries=settings.OPENAI_MAX_RETRIES,
+            http_client=http_client,
+        )
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(settings.OPENAI_MAX_CONCURRENCY)
+    return _client
+
+
+async def close_openai_client():
+    """Close the shared OpenAI client and its connection pool."""
+    global _client, _semaphore
+    if _client is not None:
+        await _client.close()
+    _client = None
+    _semaphore = None
+
+
+def get_openai_client() -> AsyncOpenAI:
+    """Get the shared OpenAI client instance, creating it on first use."""
+    return _client if _client is not None else init_openai_client()
+
+
+async def _create_chat_completion(client: AsyncOpenAI, **kwargs):
+    """Run one chat completion under the global concurrency limit and per-call timeout."""
+    if _semaphore is None:
+        init_openai_client()
+    async with _semaphore:
+        return await client.chat.completions.create(timeout=settings.OPENAI_TIMEOUT, **kwargs)
+
+
+def parse_analysis_content(content: str) -> dict:
+    """Parse the model's JSON answer, tolerating markdown code fences."""
+    # Clean the content in case there's markdown formatting
+    content = content.strip()
+    if content.startswith("```json"):
+        content = content[7:]
+    if content.startswith("```"):
+        content = content[3:]
+    if content.endswith("```"):
+        content = content[:-3]
+    content = content.strip()
+    
+    return json.loads(content)
+
+
+SYSTEM_PROMPT = """You are an expert resume reviewer with years of experience in HR and recruitment. 
     Analyze resumes objectively and provide actionable, constructive feedback. Focus on:
     1. Structure and formatting clarity
     2. Keyword optimization for ATS systems
     3. Content quality and impact
     4. Tailoring for specific roles
     Be specific, professional, and encouraging."""
-    
-    user_prompt = f"""Please analyze the following resume and provide detailed feedback. 
-    
-    Resume content:
-    {resume_text}
-    """
-    
-    if target_role:
-        user_prompt += f"\n\nTarget role: {target_role}"
-    
-    user_prompt += """
-    
-    Provide your analysis in the following JSON format:
-    {
-        "score": <integer 0-100>,
-        "structure_feedback": "<detailed feedback on resume structure, formatting, sections, and length>",
-        "keyword_analysis": "<analysis of keywords, industry terms, and ATS optimization suggestions>",
-        "improvements": ["<improvement 1>", "<improvement 2>", "<improvement 3>"],
-        "improved_content": "<complete improved version of the resume as plain text, maintaining professional format with sections, headings, and bullet points>"
-    }
-    
-    CRITICAL: Ensure consistency between your "improvements" list and "improved_content":
-    - If you mention adding a professional summary in "improvements", you MUST actually include it in "improved_content" with proper formatting
-    - If you mention any other additions or changes in "improvements", they MUST be reflected in "improved_content"
-    - The "improved_content" should be a complete, ready-to-use resume that incorporates all suggested improvements
-    
+
+# Layout contract for improved_content, relied on by pdf_service when rendering
+IMPROVED_CONTENT_FORMAT = """
     CRITICAL: Format the improved_content as follows for proper PDF generation:
     1. First line: Full name only (no contact info)
     2. Second line: Contact information separated by " | " (e.g., "email@example.com | (555) 123-4567 | City, State | linkedin.com/in/name")
@@ -82,67 +125,332 @@ async def analyze_resume(resume_text: str, target_role: Optional[str] = None) ->
     
     Use consistent formatting throughout and ensure proper spacing between sections.
     """
+
+SCORING_JSON_FORMAT = """
+    Provide your analysis in the following JSON format:
+    {
+        "score": <integer 0-100>,
+        "structure_feedback": "<detailed feedback on resume structure, formatting, sections, and length>",
+        "keyword_analysis": "<analysis of keywords, industry terms, and ATS optimization suggestions>",
+        "improvements": ["<improvement 1>", "<improvement 2>", "<improvement 3>"]
+    }
+    """
+
+
+def _resume_prompt_intro(resume_text: str, target_role: Optional[str], request: str, trim: bool = False) -> str:
+    # Only scoring may drop low-priority sections; prompts that produce improved_content need the whole resume
+    if settings.RESUME_PREPROCESSING_ENABLED:
+        resume_text = preprocess_resume_text(resume_text, trim=trim)
+    
+    user_prompt = f"""{request} 
+    
+    Resume content:
+    {resume_text}
+    """
+    
+    if target_role:
+        user_prompt += f"\n\nTarget role: {target_role}"
+    
+    return user_prompt
+
+
+def build_analysis_prompts(resume_text: str, target_role: Optional[str] = None) -> tuple[str, str]:
+    """Build the system and user prompts for a full resume analysis."""
+    user_prompt = _resume_prompt_intro(
+        resume_text, target_role, "Please analyze the following resume and provide detailed feedback."
+    )
+    
+    user_prompt += """
+    
+    Provide your analysis in the following JSON format:
+    {
+        "score": <integer 0-100>,
+        "structure_feedback": "<detailed feedback on resume structure, formatting, sections, and length>",
+        "keyword_analysis": "<analysis of keywords, industry terms, and ATS optimization suggestions>",
+        "improvements": ["<improvement 1>", "<improvement 2>", "<improvement 3>"],
+        "improved_content": "<complete improved version of the resume as plain text, maintaining professional format with sections, headings, and bullet points>"
+    }
     
+    CRITICAL: Ensure consistency between your "improvements" list and "improved_content":
+    - If you mention adding a professional summary in "improvements", you MUST actually include it in "improved_content" with proper formatting
+    - If you mention any other additions or changes in "improvements", they MUST be reflected in "improved_content"
+    - The "improved_content" should be a complete, ready-to-use resume that incorporates all suggested improvements
+    """ + IMPROVED_CONTENT_FORMAT
+    
+    return SYSTEM_PROMPT, user_prompt
+
+
+def build_scoring_prompts(resume_text: str, target_role: Optional[str] = None) -> tuple[str, str]:
+    """Build prompts for the fast scoring call, which leaves out improved_content and trims to RESUME_TOKEN_BUDGET."""
+    user_prompt = _resume_prompt_intro(
+        resume_text, target_role, "Please analyze the following resume and provide detailed feedback.", trim=True
+    )
+    user_prompt += SCORING_JSON_FORMAT
+    return SYSTEM_PROMPT, user_prompt
+
+
+def build_rewrite_prompts(resume_text: str, target_role: Optional[str], scoring: dict) -> tuple[str, str]:
+    """Build prompts for the improved_content rewrite, grounded in an earlier scoring result."""
+    user_prompt = _resume_prompt_intro(
+        resume_text, target_role, "Please rewrite the following resume to apply the review below."
+    )
+    improvements = "\n".join(f"    - {improvement}" for improvement in scoring.get("improvements", []))
+    user_prompt += f"""
+    
+    Review of this resume:
+    Structure feedback: {scoring.get("structure_feedback", "")}
+    Keyword analysis: {scoring.get("keyword_analysis", "")}
+    Improvements:
+{improvements}
+    
+    Provide the rewrite in the following JSON format:
+    {{
+        "improved_content": "<complete improved version of the resume as plain text, maintaining professional format with sections, headings, and bullet points>"
+    }}
+    
+    CRITICAL: The "improved_content" MUST apply every improvement listed above:
+    - If an improvement mentions adding a professional summary, you MUST actually include it with proper formatting
+    - The "improved_content" should be a complete, ready-to-use resume that incorporates all suggested improvements
+    """ + IMPROVED_CONTENT_FORMAT
+    
+    return SYSTEM_PROMPT, user_prompt
+
+
+def _is_retryable(error: Exception) -> bool:
+    """
+    Errors worth trying the next model for: timeouts, connection problems,
+    rate limits, server errors, unknown models and unparseable output.
+    Anything else (bad input, auth) would fail the same way on every model.
+    """
+    return isinstance(error, (
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+        openai.RateLimitError,
+        openai.InternalServerError,
+        openai.NotFoundError,
+        json.JSONDecodeError,
+    ))
+
+
+def _record_usage(model: str, usage):
+    if usage is not None:
+        OPENAI_TOKENS.inc(model, "prompt", amount=usage.prompt_tokens)
+        OPENAI_TOKENS.inc(model, "completion", amount=usage.completion_tokens)
+
+
+async def _complete_json_with_model(model: str, system_prompt: str, user_prompt: str, temperature: float) -> dict:
+    """Run one JSON completion on `model`, recording the outcome on its circuit breaker."""
+    health = model_health.get(model)
+    kwargs = {}
+    if model in settings.OPENAI_NO_JSON_MODE_MODELS:
+        # No JSON mode on this model, so ask for JSON in the prompt and parse it manually
+        system_prompt += " You must respond with valid JSON only."
+        user_prompt += "\n\nIMPORTANT: Respond ONLY with valid JSON, no other text before or after."
+    else:
+        kwargs["response_format"] = {"type": "json_object"}
+    
+    started = time.perf_counter()
     try:
-        client = get_openai_client()
-        content = None
-        # Use gpt-4o or gpt-4-turbo which support JSON mode
-        # Fallback to gpt-4 if those aren't available, but parse JSON manually
+        response = await _create_chat_completion(
+            get_openai_client(),
+            model=model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            temperature=temperature,
+            **kwargs
+        )
+        _record_usage(model, response.usage)
+        content = response.choices[0].message.content
         try:
-            response = client.chat.completions.create(
-                model="gpt-4o",
+            with track_stage("parse"):
+                result = parse_analysis_content(content)
+        except json.JSONDecodeError as e:
+            raise json.JSONDecodeError(f"{e.msg}. Response: {content[:200]}", e.doc, e.pos)
+    except asyncio.CancelledError:
+        health.breaker.release()
+        raise
+    except Exception as e:
+        health.latency.observe(time.perf_counter() - started)
+        OPENAI_SECONDS.observe(time.perf_counter() - started, model)
+        STAGE_ERRORS.inc("openai_call", type(e).__name__)
+        if _is_retryable(e):
+            health.failures += 1
+            health.breaker.record_failure()
+        else:
+            health.breaker.release()
+        raise
+    health.latency.observe(time.perf_counter() - started)
+    OPENAI_SECONDS.observe(time.perf_counter() - started, model)
+    health.successes += 1
+    health.breaker.record_success()
+    return result
+
+
+async def complete_json(system_prompt: str, user_prompt: str, temperature: float = 0.7) -> dict:
+    """
+    Get a JSON answer from the first healthy model in the chain.
+    Models with an open circuit are skipped. Retryable errors move on to the
+    next model; hard errors are raised immediately. If OPENAI_HEDGE_AFTER_SECONDS
+    is set, a slow call is raced against the next model and the first success wins.
+    """
+    with track_stage("openai"):
+        return await _complete_json(system_prompt, user_prompt, temperature)
+
+
+async def _complete_json(system_prompt: str, user_prompt: str, temperature: float) -> dict:
+    models = iter([settings.OPENAI_MODEL, *settings.OPENAI_FALLBACK_MODELS])
+    hedge_after = settings.OPENAI_HEDGE_AFTER_SECONDS
+    pending: dict[asyncio.Task, str] = {}
+    errors = []
+    
+    def start_next(hedge: bool = False) -> bool:
+        for model in models:
+            health = model_health.acquire(model)
+            if health is None:
+                errors.append(f"{model}: circuit open")
+                continue
+            if hedge:
+                health.hedges += 1
+            task = asyncio.create_task(_complete_json_with_model(model, system_prompt, user_prompt, temperature))
+            pending[task] = model
+            return True
+        return False
+    
+    try:
+        start_next()
+        while pending:
+            done, _ = await asyncio.wait(pending, timeout=hedge_after, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                # Slow call: race it against the next model, or keep waiting if there is none
+                if not start_next(hedge=True):
+                    hedge_after = None
+                continue
+            for task in done:
+                model = pending.pop(task)
+                error = task.exception()
+                if error is None:
+                    if model != settings.OPENAI_MODEL:
+                        OPENAI_FALLBACKS.inc(model)
+                    return task.result()
+                if not _is_retryable(error):
+                    if isinstance(error, openai.BadRequestError):
+                        raise HTTPException(
+                            status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"OpenAI rejected the request: {error.message}"
+                        )
+                    raise error
+                errors.append(f"{model}: {str(error)}")
+            if not pending:
+                start_next()
+    finally:
+        for task in pending:
+            task.cancel()
+    
+    raise Exception("All models failed: " + "; ".join(errors))
+
+
+async def analyze_resume(resume_text: str, target_role: Optional[str] = None) -> dict:
+    """
+    Analyze resume using OpenAI GPT-4.
+    Returns structured analysis with score, feedback, and improvements.
+    """
+    system_prompt, user_prompt = build_analysis_prompts(resume_text, target_role)
+    
+    try:
+        return await complete_json(system_prompt, user_prompt)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise Exception(f"OpenAI API error: {str(e)}")
+
+
+async def score_resume(resume_text: str, target_role: Optional[str] = None) -> dict:
+    """
+    Fast analysis without the improved_content rewrite.
+    Returns score, structure_feedback, keyword_analysis and improvements.
+    """
+    system_prompt, user_prompt = build_scoring_prompts(resume_text, target_role)
+    
+    try:
+        result = await complete_json(system_prompt, user_prompt)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise Exception(f"OpenAI API error: {str(e)}")
+    
+    # Some models rewrite anyway; drop it so the rewrite always goes through /analyze/rewrite
+    result.pop("improved_content", None)
+    return result
+
+
+async def rewrite_resume(resume_text: str, target_role: Optional[str], scoring: dict) -> str:
+    """Generate improved_content that applies the improvements from an earlier scoring call."""
+    system_prompt, user_prompt = build_rewrite_prompts(resume_text, target_role, scoring)
+    
+    try:
+        result = await complete_json(system_prompt, user_prompt)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise Exception(f"OpenAI API error: {str(e)}")
+    
+    if not isinstance(result.get("improved_content"), str):
+        raise Exception("OpenAI API error: rewrite response is missing improved_content")
+    return result["improved_content"]
+
+
+async def stream_resume_analysis(resume_text: str, target_role: Optional[str] = None) -> AsyncIterator[tuple[str, tuple]]:
+    """
+    Stream a resume analysis from OpenAI.
+    Yields ("field", (name, value)) as each top-level field completes and
+    ("delta", (name, text)) chunks for the fields in STREAMED_FIELDS.
+    """
+    system_prompt, user_prompt = build_analysis_prompts(resume_text, target_role)
+    client = get_openai_client()
+    parser = JSONObjectStreamParser(stream_keys=STREAMED_FIELDS)
+    
+    health = model_health.acquire(settings.OPENAI_MODEL)
+    if health is None:
+        raise Exception(f"{settings.OPENAI_MODEL}: circuit open")
+    
+    started = time.perf_counter()
+    try:
+        async with _semaphore:
+            stream = await client.chat.completions.create(
+                model=settings.OPENAI_MODEL,
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
                 ],
                 temperature=0.7,
-                response_format={"type": "json_object"}
+                response_format={"type": "json_object"},
+                stream=True,
+                timeout=settings.OPENAI_TIMEOUT
             )
-            content = response.choices[0].message.content
-        except Exception:
-            # Fallback to gpt-4-turbo
-            try:
-                response = client.chat.completions.create(
-                    model="gpt-4-turbo",
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    temperature=0.7,
-                    response_format={"type": "json_object"}
-                )
-                content = response.choices[0].message.content
-            except Exception:
-                # Fallback to regular gpt-4 without JSON mode
-                user_prompt_with_json = user_prompt + "\n\nIMPORTANT: Respond ONLY with valid JSON, no other text before or after."
-                response = client.chat.completions.create(
-                    model="gpt-4",
-                    messages=[
-                        {"role": "system", "content": system_prompt + " You must respond with valid JSON only."},
-                        {"role": "user", "content": user_prompt_with_json}
-                    ],
-                    temperature=0.7
-                )
-                content = response.choices[0].message.content
+            async for chunk in stream:
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+                for event in parser.feed(chunk.choices[0].delta.content):
+                    yield event
         
-        # Clean the content in case there's markdown formatting
-        content = content.strip()
-        if content.startswith("```json"):
-            content = content[7:]
-        if content.startswith("```"):
-            content = content[3:]
-        if content.endswith("```"):
-            content = content[:-3]
-        content = content.strip()
-        
-        analysis = json.loads(content)
-        
-        return analysis
-    
-    except json.JSONDecodeError as e:
-        error_msg = f"Failed to parse OpenAI response as JSON: {str(e)}"
-        if content:
-            error_msg += f". Response: {content[:200]}"
-        raise Exception(error_msg)
+        if not parser.done:
+            raise ValueError("OpenAI stream ended before the analysis was complete")
+    except (asyncio.CancelledError, GeneratorExit):
+        health.breaker.release()
+        raise
     except Exception as e:
-        raise Exception(f"OpenAI API error: {str(e)}")
+        health.latency.observe(time.perf_counter() - started)
+        OPENAI_SECONDS.observe(time.perf_counter() - started, settings.OPENAI_MODEL)
+        # ValueError covers malformed or truncated streamed JSON
+        if _is_retryable(e) or isinstance(e, ValueError):
+            health.failures += 1
+            health.breaker.record_failure()
+        else:
+            health.breaker.release()
+        raise
+    health.latency.observe(time.perf_counter() - started)
+    OPENAI_SECONDS.observe(time.perf_counter() - started, settings.OPENAI_MODEL)
+    health.successes += 1
+    health.breaker.record_success()
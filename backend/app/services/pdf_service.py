@@ -1,444 +1,545 @@
-from io import BytesIO
+import asyncio
+import logging
 import re
+from io import BytesIO
+from typing import Optional
+from fastapi import HTTPException, status
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, HRFlowable, Table, TableStyle
 from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT
-from reportlab.lib.colors import black, HexColor
+from reportlab.lib.colors import black
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen.canvas import Canvas
+from app.core.config import settings
+from app.core.metrics import PDF_BYTES, PDF_PAGES, track_stage
+from app.services.cache_service import make_pdf_cache_key
+from app.services.process_pool import BoundedProcessPool
+from app.services.resume_parser import (
+    ResumeDocument, ResumeEntry, ResumeLine, parse_resume,
+    BLANK, NAME, CONTACT, BULLET, SUMMARY, CATEGORY
+)
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = letter
+PAGE_MARGIN = 0.5 * inch
+CONTENT_WIDTH = PAGE_SIZE[0] - 2 * PAGE_MARGIN
+
+# Styles are immutable once built, so they are created once at import and shared by every render
+_base_style = getSampleStyleSheet()['Normal']
+
+name_style = ParagraphStyle(
+    'NameStyle',
+    parent=_base_style,
+    fontSize=22,
+    fontName='Helvetica-Bold',
+    textColor=black,
+    alignment=TA_CENTER,
+    spaceAfter=6,
+    leading=26
+)
+
+contact_style = ParagraphStyle(
+    'ContactStyle',
+    parent=_base_style,
+    fontSize=10,
+    fontName='Helvetica',
+    textColor=black,
+    alignment=TA_CENTER,
+    spaceAfter=12,
+    leading=12
+)
+
+section_header_style = ParagraphStyle(
+    'SectionHeaderStyle',
+    parent=_base_style,
+    fontSize=12,
+    fontName='Helvetica-Bold',
+    textColor=black,
+    alignment=TA_LEFT,
+    spaceBefore=14,
+    spaceAfter=4,
+    leading=14
+)
+
+company_institution_style = ParagraphStyle(
+    'CompanyInstitutionStyle',
+    parent=_base_style,
+    fontSize=11,
+    fontName='Helvetica-Bold',
+    textColor=black,
+    alignment=TA_LEFT,
+    spaceAfter=2,
+    leading=13,
+    leftIndent=6
+)
+
+job_title_style = ParagraphStyle(
+    'JobTitleStyle',
+    parent=_base_style,
+    fontSize=10,
+    fontName='Helvetica',
+    textColor=black,
+    alignment=TA_LEFT,
+    spaceAfter=4,
+    leading=12
+)
+
+date_location_style = ParagraphStyle(
+    'DateLocationStyle',
+    parent=_base_style,
+    fontSize=10,
+    fontName='Helvetica',
+    textColor=black,
+    alignment=TA_RIGHT,
+    spaceAfter=2,
+    leading=12
+)
+
+company_date_style = ParagraphStyle(
+    'CompanyDateStyle',
+    parent=_base_style,
+    fontSize=10,
+    fontName='Helvetica',
+    textColor=black,
+    alignment=TA_LEFT,
+    spaceAfter=4,
+    leading=12
+)
+
+bullet_style = ParagraphStyle(
+    'BulletStyle',
+    parent=_base_style,
+    fontSize=10,
+    fontName='Helvetica',
+    textColor=black,
+    alignment=TA_LEFT,
+    leftIndent=0,
+    spaceAfter=3,
+    leading=12,
+    bulletIndent=9
+)
+
+body_style = ParagraphStyle(
+    'BodyStyle',
+    parent=_base_style,
+    fontSize=10,
+    fontName='Helvetica',
+    textColor=black,
+    alignment=TA_LEFT,
+    spaceAfter=6,
+    leading=12
+)
+
+summary_style = ParagraphStyle(
+    'SummaryStyle',
+    parent=_base_style,
+    fontSize=10,
+    fontName='Helvetica',
+    textColor=black,
+    alignment=TA_LEFT,
+    spaceAfter=12,
+    leading=12
+)
+
+# Side-by-side "Company | Location | Dates" rows
+entry_table_style = TableStyle([
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('LEFTPADDING', (0, 0), (0, 0), 0),
+    ('RIGHTPADDING', (1, 0), (1, 0), 0),
+    ('RIGHTPADDING', (0, 0), (0, 0), 0),
+    ('TOPPADDING', (0, 0), (-1, -1), 0),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 0),
+])
+ENTRY_COLUMN_WIDTHS = [CONTENT_WIDTH * 0.6, CONTENT_WIDTH * 0.4]
+
+# "platypus" lays out flowables with SimpleDocTemplate; "canvas" draws the same layout directly and is faster
+PDF_ENGINES = ("platypus", "canvas")
+
+# Everything besides the text that affects the rendered bytes; bump the layout version when styles change
+RENDER_LAYOUT_VERSION = 1
+RENDER_SETTINGS = (RENDER_LAYOUT_VERSION, PAGE_SIZE, PAGE_MARGIN)
+
+
+def _resolve_engine(engine: Optional[str]) -> str:
+    engine = engine or settings.PDF_RENDER_ENGINE
+    if engine not in PDF_ENGINES:
+        raise ValueError(f"Unknown PDF render engine: {engine}")
+    return engine
+
+
+def pdf_cache_key(content: str, engine: Optional[str] = None) -> str:
+    """Key (and ETag) of the PDF that `content` renders to with `engine`."""
+    return make_pdf_cache_key(content, (*RENDER_SETTINGS, _resolve_engine(engine)))
+
+
+def _escape(text: str) -> str:
+    """Escape HTML special characters for ReportLab."""
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def _render_line(line: ResumeLine, story: list):
+    if line.kind == BLANK:
+        # Minimal spacing, only once there is content
+        if story:
+            story.append(Spacer(1, 0.05 * inch))
+    elif line.kind == NAME:
+        story.append(Paragraph(line.text, name_style))
+        story.append(Spacer(1, 0.1 * inch))
+    elif line.kind == CONTACT:
+        story.append(Paragraph(line.text.replace('|', ' | '), contact_style))
+        story.append(Spacer(1, 0.15 * inch))
+    elif line.kind == BULLET:
+        story.append(Paragraph(f"• {_escape(line.text)}", bullet_style))
+    elif line.kind == SUMMARY:
+        story.append(Paragraph(_escape(line.text), summary_style))
+    elif line.kind == CATEGORY:
+        # Bold category followed by content on the same line
+        label, text = line.label.replace('&', '&amp;'), line.text.replace('&', '&amp;')
+        story.append(Paragraph(f'<b>{label}:</b> {text}', body_style))
+    else:
+        # SKILLS and BODY lines
+        story.append(Paragraph(_escape(line.text), body_style))
+
+
+def _render_entry(entry: ResumeEntry, story: list):
+    if entry.stacked:
+        story.append(Paragraph(entry.heading, job_title_style))
+        story.append(Paragraph(entry.detail, company_date_style))
+        return
+    table = Table(
+        [[Paragraph(entry.heading, company_institution_style), Paragraph(entry.detail, date_location_style)]],
+        colWidths=ENTRY_COLUMN_WIDTHS
+    )
+    table.setStyle(entry_table_style)
+    story.append(table)
+    if entry.subtitle is not None:
+        story.append(Paragraph(entry.subtitle, job_title_style))
+
+
+def _render_items(items: list, story: list):
+    for item in items:
+        if isinstance(item, ResumeEntry):
+            _render_entry(item, story)
+        else:
+            _render_line(item, story)
+
+
+def build_story(document: ResumeDocument) -> list:
+    """Turn a parsed resume into ReportLab flowables."""
+    story = []
+    _render_items(document.header, story)
+    for section in document.sections:
+        # Horizontal line before each section header
+        if story and not isinstance(story[-1], Spacer):
+            story.append(Spacer(1, 0.1 * inch))
+        story.append(HRFlowable(width="100%", thickness=0.5, lineCap='round', color=black))
+        story.append(Spacer(1, 0.04 * inch))
+        story.append(Paragraph(section.title, section_header_style))
+        story.append(Spacer(1, 0.04 * inch))
+        _render_items(section.items, story)
+    return story
+
+
+# Frame geometry of SimpleDocTemplate: the page margins plus the frame's default 6pt padding
+_FRAME_PADDING = 6
+_FRAME_LEFT = PAGE_MARGIN + _FRAME_PADDING
+_FRAME_WIDTH = CONTENT_WIDTH - 2 * _FRAME_PADDING
+_FRAME_TOP = PAGE_SIZE[1] - PAGE_MARGIN - _FRAME_PADDING
+_FRAME_BOTTOM = PAGE_MARGIN + _FRAME_PADDING
+# Entry rows are wider than the frame and centred on it, like the platypus Table
+_ENTRY_LEFT = _FRAME_LEFT + (_FRAME_WIDTH - CONTENT_WIDTH) / 2
+_ENTRY_DETAIL_PADDING = 6  # Default left padding of the date/location cell
+_FUZZ = 1e-6
+
+# Word widths at 1pt per font, filled as words are seen; string widths are linear in font size
+_word_widths: dict[str, dict[str, float]] = {
+    font_name: {' ': stringWidth(' ', font_name, 1)} for font_name in ('Helvetica', 'Helvetica-Bold')
+}
+_WORD_WIDTH_CACHE_LIMIT = 50000
+
+
+def _word_width(word: str, font_name: str) -> float:
+    widths = _word_widths.setdefault(font_name, {' ': stringWidth(' ', font_name, 1)})
+    width = widths.get(word)
+    if width is None:
+        if len(widths) > _WORD_WIDTH_CACHE_LIMIT:
+            widths.clear()
+            widths[' '] = stringWidth(' ', font_name, 1)
+        width = widths[word] = stringWidth(word, font_name, 1)
+    return width
+
+
+def _wrap(runs: list[tuple[str, str]], style: ParagraphStyle, width: float) -> list[tuple[list[tuple[str, str]], float]]:
+    """
+    Break (text, font_name) runs into lines of about `width` points, collapsing
+    whitespace and shrinking spaces as Paragraph does. Returns (words, line_width) per line.
+    """
+    size = style.fontSize
+    space = _word_width(' ', style.fontName) * size
+    # Paragraph lets each space shrink a little before breaking a line
+    space_shrink = style.spaceShrinkage * space
+    lines = []
+    words: list[tuple[str, str]] = []
+    line_width = 0.0
+    for text, font_name in runs:
+        for word in text.split():
+            word_width = _word_width(word, font_name) * size
+            if words and line_width + space + word_width > width + space_shrink * len(words) + _FUZZ:
+                lines.append((words, line_width))
+                words, line_width = [], 0.0
+            line_width += word_width + (space if words else 0.0)
+            words.append((word, font_name))
+    if words:
+        lines.append((words, line_width))
+    return lines
+
+
+class _CanvasFrame:
+    """
+    Places blocks top to bottom on a canvas the way a platypus Frame does:
+    space before a block overlaps the space after the previous one, nothing
+    is added above the first block of a page, and blocks that do not fit go
+    to the next page (paragraphs split between lines).
+    """
+
+    def __init__(self, canvas: Canvas):
+        self.canvas = canvas
+        self.y = _FRAME_TOP
+        self.at_top = True
+        self.space_after = 0.0
+        self.drawn = False  # Anything placed yet, like a non-empty story
+        self.last_was_spacer = False
+
+    def _space_before(self, space_before: float) -> float:
+        return 0.0 if self.at_top else max(space_before - self.space_after, 0.0)
+
+    def _new_page(self):
+        self.canvas.showPage()
+        self.y = _FRAME_TOP
+        self.at_top = True
+        self.space_after = 0.0
+
+    def _place(self, height: float, space_before: float = 0.0, space_after: float = 0.0) -> float:
+        """Reserve `height` points, starting a page if needed; returns the top of the block."""
+        skip = self._space_before(space_before)
+        if self.y - skip - height < _FRAME_BOTTOM - _FUZZ and not self.at_top:
+            self._new_page()
+            skip = 0.0
+        top = self.y - skip
+        self.y = top - height - space_after
+        self.space_after = space_after
+        if self.y != top + skip:
+            self.at_top = False
+        self.drawn = True
+        return top
+
+    def spacer(self, height: float):
+        self._place(height)
+        self.last_was_spacer = True
+
+    def rule(self, thickness: float = 0.5):
+        bottom = self._place(thickness, 1.0, 1.0) - thickness
+        self.canvas.setLineWidth(thickness)
+        self.canvas.setLineCap(1)
+        self.canvas.line(_FRAME_LEFT, bottom, _FRAME_LEFT + _FRAME_WIDTH, bottom)
+        self.last_was_spacer = False
+
+    def paragraph(self, runs: list[tuple[str, str]], style: ParagraphStyle):
+        width = _FRAME_WIDTH - style.leftIndent - style.rightIndent
+        lines = _wrap(runs, style, width)
+        space_before = style.spaceBefore
+        while True:
+            skip = self._space_before(space_before)
+            room = self.y - skip - _FRAME_BOTTOM + _FUZZ
+            fits = int(room // style.leading)
+            if len(lines) * style.leading <= room:
+                fits = len(lines)
+            elif self.at_top:
+                # Taller than a whole page: fill this one and carry on with the rest
+                fits = max(fits, 1)
+            elif fits < 2 or fits >= len(lines):
+                # Not even two lines fit (orphans are not allowed); move the paragraph
+                self._new_page()
+                continue
+            top = self._place(fits * style.leading, space_before, style.spaceAfter if fits == len(lines) else 0.0)
+            self._draw_lines(lines[:fits], style, _FRAME_LEFT, _FRAME_WIDTH, top)
+            lines = lines[fits:]
+            if not lines:
+                break
+            self._new_page()
+            space_before = 0.0
+        self.last_was_spacer = False
+
+    def entry_row(self, heading: str, detail: str):
+        heading_width, detail_width = ENTRY_COLUMN_WIDTHS
+        detail_width -= _ENTRY_DETAIL_PADDING
+        heading_lines = _wrap([(heading, company_institution_style.fontName)], company_institution_style,
+                              heading_width - company_institution_style.leftIndent)
+        detail_lines = _wrap([(detail, date_location_style.fontName)], date_location_style, detail_width)
+        height = max(len(heading_lines) * company_institution_style.leading,
+                     len(detail_lines) * date_location_style.leading)
+        top = self._place(height)
+        self._draw_lines(heading_lines, company_institution_style, _ENTRY_LEFT, heading_width, top)
+        self._draw_lines(detail_lines, date_location_style,
+                         _ENTRY_LEFT + heading_width + _ENTRY_DETAIL_PADDING, detail_width, top)
+        self.last_was_spacer = False
+
+    def _draw_lines(self, lines: list, style: ParagraphStyle, left: float, width: float, top: float):
+        canvas = self.canvas
+        size = style.fontSize
+        space = _word_width(' ', style.fontName) * size
+        available = width - style.leftIndent - style.rightIndent
+        baseline = top - size
+        for words, line_width in lines:
+            x = left + style.leftIndent
+            if style.alignment == TA_CENTER:
+                x += (available - line_width) / 2
+            elif style.alignment == TA_RIGHT:
+                x += available - line_width
+            # Draw runs of words that share a font
+            start = 0
+            while start < len(words):
+                font_name = words[start][1]
+                end = start
+                while end < len(words) and words[end][1] == font_name:
+                    end += 1
+                text = ' '.join(word for word, _ in words[start:end])
+                canvas.setFont(font_name, size)
+                canvas.drawString(x, baseline, text)
+                x += _word_width(text, font_name) * size + space
+                start = end
+            baseline -= style.leading
+
 
+def _draw_line(line: ResumeLine, frame: _CanvasFrame):
+    if line.kind == BLANK:
+        if frame.drawn:
+            frame.spacer(0.05 * inch)
+    elif line.kind == NAME:
+        frame.paragraph([(line.text, name_style.fontName)], name_style)
+        frame.spacer(0.1 * inch)
+    elif line.kind == CONTACT:
+        frame.paragraph([(line.text.replace('|', ' | '), contact_style.fontName)], contact_style)
+        frame.spacer(0.15 * inch)
+    elif line.kind == BULLET:
+        frame.paragraph([(f"• {line.text}", bullet_style.fontName)], bullet_style)
+    elif line.kind == SUMMARY:
+        frame.paragraph([(line.text, summary_style.fontName)], summary_style)
+    elif line.kind == CATEGORY:
+        frame.paragraph([(f"{line.label}:", 'Helvetica-Bold'), (line.text, body_style.fontName)], body_style)
+    else:
+        frame.paragraph([(line.text, body_style.fontName)], body_style)
 
-def generate_pdf_from_text(content: str, filename: str = "improved_resume.pdf") -> BytesIO:
+
+def _draw_items(items: list, frame: _CanvasFrame):
+    for item in items:
+        if not isinstance(item, ResumeEntry):
+            _draw_line(item, frame)
+        elif item.stacked:
+            frame.paragraph([(item.heading, job_title_style.fontName)], job_title_style)
+            frame.paragraph([(item.detail, company_date_style.fontName)], company_date_style)
+        else:
+            frame.entry_row(item.heading, item.detail)
+            if item.subtitle is not None:
+                frame.paragraph([(item.subtitle, job_title_style.fontName)], job_title_style)
+
+
+def draw_document(document: ResumeDocument, canvas: Canvas):
+    """Draw a parsed resume straight onto a canvas with the same layout as build_story."""
+    frame = _CanvasFrame(canvas)
+    _draw_items(document.header, frame)
+    for section in document.sections:
+        if frame.drawn and not frame.last_was_spacer:
+            frame.spacer(0.1 * inch)
+        frame.rule()
+        frame.spacer(0.04 * inch)
+        frame.paragraph([(section.title, section_header_style.fontName)], section_header_style)
+        frame.spacer(0.04 * inch)
+        _draw_items(section.items, frame)
+
+
+def generate_pdf_from_text(content: str, filename: str = "improved_resume.pdf", engine: Optional[str] = None) -> BytesIO:
     """
     Generate a professional, ATS-friendly PDF from resume text content.
-    Intelligently parses resume structure and applies professional formatting.
+    The text is parsed into a ResumeDocument first, then rendered with
+    `engine` (PDF_RENDER_ENGINE by default).
     """
     buffer = BytesIO()
+    document = parse_resume(content)
+    
+    if _resolve_engine(engine) == "canvas":
+        canvas = Canvas(buffer, pagesize=PAGE_SIZE, invariant=True)
+        draw_document(document, canvas)
+        canvas.showPage()
+        canvas.save()
+        buffer.seek(0)
+        return buffer
     
-    # Set margins for professional appearance
+    # Set margins for professional appearance; invariant output makes the same text render to the same bytes
     doc = SimpleDocTemplate(
         buffer,
-        pagesize=letter,
-        leftMargin=0.5 * inch,
-        rightMargin=0.5 * inch,
-        topMargin=0.5 * inch,
-        bottomMargin=0.5 * inch
+        pagesize=PAGE_SIZE,
+        leftMargin=PAGE_MARGIN,
+        rightMargin=PAGE_MARGIN,
+        topMargin=PAGE_MARGIN,
+        bottomMargin=PAGE_MARGIN,
+        invariant=True
     )
     
-    story = []
-    styles = getSampleStyleSheet()
-    
-    # Define professional styles
-    name_style = ParagraphStyle(
-        'NameStyle',
-        parent=styles['Normal'],
-        fontSize=22,
-        fontName='Helvetica-Bold',
-        textColor=black,
-        alignment=TA_CENTER,
-        spaceAfter=6,
-        leading=26
-    )
-    
-    contact_style = ParagraphStyle(
-        'ContactStyle',
-        parent=styles['Normal'],
-        fontSize=10,
-        fontName='Helvetica',
-        textColor=black,
-        alignment=TA_CENTER,
-        spaceAfter=12,
-        leading=12
-    )
-    
-    section_header_style = ParagraphStyle(
-        'SectionHeaderStyle',
-        parent=styles['Normal'],
-        fontSize=12,
-        fontName='Helvetica-Bold',
-        textColor=black,
-        alignment=TA_LEFT,
-        spaceBefore=14,
-        spaceAfter=4,
-        leading=14
-    )
-    
-    company_institution_style = ParagraphStyle(
-        'CompanyInstitutionStyle',
-        parent=styles['Normal'],
-        fontSize=11,
-        fontName='Helvetica-Bold',
-        textColor=black,
-        alignment=TA_LEFT,
-        spaceAfter=2,
-        leading=13,
-        leftIndent=6
-    )
-    
-    job_title_style = ParagraphStyle(
-        'JobTitleStyle',
-        parent=styles['Normal'],
-        fontSize=10,
-        fontName='Helvetica',
-        textColor=black,
-        alignment=TA_LEFT,
-        spaceAfter=4,
-        leading=12
-    )
-    
-    date_location_style = ParagraphStyle(
-        'DateLocationStyle',
-        parent=styles['Normal'],
-        fontSize=10,
-        fontName='Helvetica',
-        textColor=black,
-        alignment=TA_RIGHT,
-        spaceAfter=2,
-        leading=12
-    )
-    
-    company_date_style = ParagraphStyle(
-        'CompanyDateStyle',
-        parent=styles['Normal'],
-        fontSize=10,
-        fontName='Helvetica',
-        textColor=black,
-        alignment=TA_LEFT,
-        spaceAfter=4,
-        leading=12
-    )
-    
-    bullet_style = ParagraphStyle(
-        'BulletStyle',
-        parent=styles['Normal'],
-        fontSize=10,
-        fontName='Helvetica',
-        textColor=black,
-        alignment=TA_LEFT,
-        leftIndent=0,
-        spaceAfter=3,
-        leading=12,
-        bulletIndent=9
-    )
-    
-    body_style = ParagraphStyle(
-        'BodyStyle',
-        parent=styles['Normal'],
-        fontSize=10,
-        fontName='Helvetica',
-        textColor=black,
-        alignment=TA_LEFT,
-        spaceAfter=6,
-        leading=12
-    )
-    
-    summary_style = ParagraphStyle(
-        'SummaryStyle',
-        parent=styles['Normal'],
-        fontSize=10,
-        fontName='Helvetica',
-        textColor=black,
-        alignment=TA_LEFT,
-        spaceAfter=12,
-        leading=12
-    )
-    
-    # Regex patterns for detection
-    email_pattern = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', re.IGNORECASE)
-    phone_pattern = re.compile(r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
-    date_pattern = re.compile(r'\b\d{4}\s*[-–]\s*\d{4}\b|\b\d{4}\s*[-–]\s*(Present|Current)\b', re.IGNORECASE)
-    
-    # Common section headers
-    section_keywords = {
-        'EXPERIENCE', 'WORK EXPERIENCE', 'EMPLOYMENT', 'PROFESSIONAL EXPERIENCE',
-        'EDUCATION', 'ACADEMIC BACKGROUND',
-        'SKILLS', 'TECHNICAL SKILLS', 'COMPETENCIES',
-        'PROJECTS', 'PROJECT EXPERIENCE',
-        'SUMMARY', 'PROFESSIONAL SUMMARY', 'OBJECTIVE', 'PROFILE',
-        'CERTIFICATIONS', 'CERTIFICATES', 'LICENSES',
-        'AWARDS', 'ACHIEVEMENTS', 'HONORS',
-        'PUBLICATIONS', 'PUBLICATIONS & RESEARCH',
-        'LANGUAGES', 'LANGUAGE SKILLS', 'COMMUNITY INVOLVEMENT'
-    }
-    
-    # Parse content
-    lines = content.split('\n')
-    
-    # Track state
-    line_index = 0
-    is_first_line = True
-    is_contact_line = False
-    current_section = None
-    
-    while line_index < len(lines):
-        line = lines[line_index].strip()
-        
-        # Skip empty lines (but add minimal spacing)
-        if not line:
-            if story:  # Only add spacer if we have content
-                story.append(Spacer(1, 0.05 * inch))
-            line_index += 1
-            continue
-        
-        # Detect name (first non-empty line, typically no special characters except hyphens/apostrophes)
-        if is_first_line and not re.search(r'[|•\-\*@]', line):
-            # Check if it's likely a name (2-4 words, proper case, no numbers typically)
-            words = line.split()
-            if 2 <= len(words) <= 4 and not re.search(r'\d', line):
-                story.append(Paragraph(line, name_style))
-                story.append(Spacer(1, 0.1 * inch))
-                is_first_line = False
-                line_index += 1
-                continue
-        
-        # Detect contact information (contains email, phone, or common contact patterns)
-        if (email_pattern.search(line) or phone_pattern.search(line) or 
-            'linkedin.com' in line.lower() or 'github.com' in line.lower() or
-            '|' in line and (email_pattern.search(line) or phone_pattern.search(line))):
-            # Format contact line
-            story.append(Paragraph(line.replace('|', ' | '), contact_style))
-            story.append(Spacer(1, 0.15 * inch))
-            is_first_line = False
-            line_index += 1
-            continue
-        
-        # Detect bullet points FIRST (before section headers to avoid false positives)
-        if line.startswith('•') or line.startswith('-') or line.startswith('*') or line.startswith('·'):
-            bullet_text = re.sub(r'^[•\-\*\·]\s*', '', line)
-            # Escape HTML special characters for ReportLab
-            bullet_text = bullet_text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-            story.append(Paragraph(f"• {bullet_text}", bullet_style))
-            line_index += 1
-            continue
-        
-        # Skills section (often comma-separated or bullet points)
-        # Check BEFORE section header detection to avoid misclassifying skills content as headers
-        # But first check if this line is actually a new section header - if so, let it be processed below
-        if current_section and 'SKILLS' in current_section:
-            # Check if this line is a section header - be STRICT to avoid false positives
-            # Only skip if it's EXACTLY a section keyword (not just contains one) and clearly a standalone header
-            line_upper_check = line.upper().strip()
-            # Exact match only - don't use "contains" to avoid matching skills content that mentions keywords
-            # Skills content often has commas, bullets, or multiple words - section headers don't
-            is_new_section_header = (
-                line_upper_check in section_keywords and
-                # Must be clearly a standalone header: short, no separators/bullets/commas
-                len(line) < 30 and 
-                not '|' in line and 
-                not ',' in line and  # Skills often have commas
-                not line.strip().startswith(('•', '-', '*', '·'))  # Skills might be bulleted
-            )
-            # If it's a new section header, skip processing here and let section header detection handle it
-            if not is_new_section_header:
-                # If comma-separated, keep as single line
-                safe_line = line.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-                story.append(Paragraph(safe_line, body_style))
-                line_index += 1
-                continue
-        
-        # Summary/Objective/Profile section
-        # Check BEFORE section header detection to avoid misclassifying summary content as headers
-        # But first check if this line is actually a new section header - if so, let it be processed below
-        if current_section and ('SUMMARY' in current_section or 'OBJECTIVE' in current_section or 'PROFILE' in current_section):
-            # Check if this line is a section header - be STRICT to avoid false positives
-            # Only skip if it's EXACTLY a section keyword (not just contains one) and clearly a standalone header
-            line_upper_check = line.upper().strip()
-            # Exact match only - don't use "contains" to avoid matching summary content that mentions keywords
-            # Summary content can be multi-line paragraphs - section headers are short and standalone
-            is_new_section_header = (
-                line_upper_check in section_keywords and
-                # Must be clearly a standalone header: short, no separators/bullets/commas
-                len(line) < 30 and 
-                not '|' in line and 
-                not ',' in line and  # Summary might have commas
-                not line.strip().startswith(('•', '-', '*', '·'))  # Summary might be bulleted
-            )
-            # If it's a new section header, skip processing here and let section header detection handle it
-            if not is_new_section_header:
-                # Escape HTML special characters
-                safe_line = line.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-                story.append(Paragraph(safe_line, summary_style))
-                line_index += 1
-                continue
-        
-        # Detect section headers (ALL CAPS, or common section keywords)
-        # Exclude lines that start with bullet characters (already handled above)
-        line_upper = line.upper().strip()
-        is_section_header = (
-            (line_upper in section_keywords or 
-             any(keyword in line_upper for keyword in section_keywords) or
-             (line.isupper() and len(line) < 50 and not '|' in line and not line.strip().startswith(('•', '-', '*', '·'))))
-        )
-        
-        if is_section_header:
-            current_section = line_upper
-            # Add horizontal line before section header
-            if story and not isinstance(story[-1], Spacer):
-                story.append(Spacer(1, 0.1 * inch))
-            story.append(HRFlowable(width="100%", thickness=0.5, lineCap='round', color=black))
-            story.append(Spacer(1, 0.04 * inch))
-            story.append(Paragraph(line.upper(), section_header_style))
-            story.append(Spacer(1, 0.04 * inch))
-            line_index += 1
-            continue
-        
-        # Detect job entries (contains "|" separator and possibly dates)
-        if '|' in line and (date_pattern.search(line) or current_section and 'EXPERIENCE' in current_section):
-            parts = [p.strip() for p in line.split('|')]
-            if len(parts) >= 2:
-                # Parse: Company Name | Location | Dates
-                # or: Job Title | Company | Location | Dates
-                # Try to detect if first part is company or job title based on context
-                if len(parts) >= 3:
-                    # Likely format: Company | Location | Dates
-                    company_name = parts[0]
-                    location_date = ' | '.join(parts[1:])
-                    # Create table for side-by-side layout
-                    table_data = [
-                        [Paragraph(company_name, company_institution_style), 
-                         Paragraph(location_date, date_location_style)]
-                    ]
-                    table = Table(table_data, colWidths=[doc.width * 0.6, doc.width * 0.4])
-                    table.setStyle(TableStyle([
-                        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                        ('LEFTPADDING', (0, 0), (0, 0), 0),
-                        ('RIGHTPADDING', (1, 0), (1, 0), 0),
-                        ('RIGHTPADDING', (0, 0), (0, 0), 0),
-                        ('TOPPADDING', (0, 0), (-1, -1), 0),
-                        ('BOTTOMPADDING', (0, 0), (-1, -1), 0),
-                    ]))
-                    story.append(table)
-                    # Next line should be job title
-                    if line_index + 1 < len(lines):
-                        next_line = lines[line_index + 1].strip()
-                        if next_line and not next_line.startswith(('•', '-', '*', '·')) and '|' not in next_line:
-                            story.append(Paragraph(next_line, job_title_style))
-                            line_index += 1
-                else:
-                    # Fallback: First part is job title, rest is company/date
-                    job_title = parts[0]
-                    company_and_date = ' | '.join(parts[1:])
-                    story.append(Paragraph(job_title, job_title_style))
-                    story.append(Paragraph(company_and_date, company_date_style))
-                line_index += 1
-                continue
-        
-        # Detect education entries (format: Institution | Location | Dates)
-        if '|' in line and current_section and 'EDUCATION' in current_section:
-            parts = [p.strip() for p in line.split('|')]
-            if len(parts) >= 2:
-                # Format: Institution Name | Location | Dates
-                if len(parts) >= 3:
-                    institution_name = parts[0]
-                    location_date = ' | '.join(parts[1:])
-                    # Create table for side-by-side layout
-                    table_data = [
-                        [Paragraph(institution_name, company_institution_style), 
-                         Paragraph(location_date, date_location_style)]
-                    ]
-                    table = Table(table_data, colWidths=[doc.width * 0.6, doc.width * 0.4])
-                    table.setStyle(TableStyle([
-                        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                        ('LEFTPADDING', (0, 0), (0, 0), 0),
-                        ('RIGHTPADDING', (1, 0), (1, 0), 0),
-                        ('RIGHTPADDING', (0, 0), (0, 0), 0),
-                        ('TOPPADDING', (0, 0), (-1, -1), 0),
-                        ('BOTTOMPADDING', (0, 0), (-1, -1), 0),
-                    ]))
-                    story.append(table)
-                    # Next line should be degree/program
-                    if line_index + 1 < len(lines):
-                        next_line = lines[line_index + 1].strip()
-                        if next_line and not next_line.startswith(('•', '-', '*', '·')) and '|' not in next_line:
-                            story.append(Paragraph(next_line, job_title_style))
-                            line_index += 1
-                else:
-                    # Fallback: First part is degree, rest is institution/date
-                    degree = parts[0]
-                    rest = ' | '.join(parts[1:])
-                    story.append(Paragraph(degree, job_title_style))
-                    story.append(Paragraph(rest, company_date_style))
-                line_index += 1
-                continue
-        
-        # Projects section - similar to work experience
-        if current_section and ('PROJECT' in current_section or 'PROJECTS' in current_section):
-            if '|' in line:
-                parts = [p.strip() for p in line.split('|')]
-                if len(parts) >= 2:
-                    project_name = parts[0]
-                    date = ' | '.join(parts[1:]) if len(parts) > 1 else parts[1]
-                    # Create table for side-by-side layout
-                    table_data = [
-                        [Paragraph(project_name, company_institution_style), 
-                         Paragraph(date, date_location_style)]
-                    ]
-                    table = Table(table_data, colWidths=[doc.width * 0.6, doc.width * 0.4])
-                    table.setStyle(TableStyle([
-                        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                        ('LEFTPADDING', (0, 0), (0, 0), 0),
-                        ('RIGHTPADDING', (1, 0), (1, 0), 0),
-                        ('RIGHTPADDING', (0, 0), (0, 0), 0),
-                        ('TOPPADDING', (0, 0), (-1, -1), 0),
-                        ('BOTTOMPADDING', (0, 0), (-1, -1), 0),
-                    ]))
-                    story.append(table)
-                    line_index += 1
-                    continue
-        
-        # Activities section - similar to work experience
-        if current_section and 'ACTIVIT' in current_section:
-            if '|' in line:
-                parts = [p.strip() for p in line.split('|')]
-                if len(parts) >= 3:
-                    organization_name = parts[0]
-                    location_date = ' | '.join(parts[1:])
-                    # Create table for side-by-side layout
-                    table_data = [
-                        [Paragraph(organization_name, company_institution_style), 
-                         Paragraph(location_date, date_location_style)]
-                    ]
-                    table = Table(table_data, colWidths=[doc.width * 0.6, doc.width * 0.4])
-                    table.setStyle(TableStyle([
-                        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                        ('LEFTPADDING', (0, 0), (0, 0), 0),
-                        ('RIGHTPADDING', (1, 0), (1, 0), 0),
-                        ('RIGHTPADDING', (0, 0), (0, 0), 0),
-                        ('TOPPADDING', (0, 0), (-1, -1), 0),
-                        ('BOTTOMPADDING', (0, 0), (-1, -1), 0),
-                    ]))
-                    story.append(table)
-                    # Next line should be role
-                    if line_index + 1 < len(lines):
-                        next_line = lines[line_index + 1].strip()
-                        if next_line and not next_line.startswith(('•', '-', '*', '·')) and '|' not in next_line:
-                            story.append(Paragraph(next_line, job_title_style))
-                            line_index += 1
-                    line_index += 1
-                    continue
-        
-        # Additional section - format with inline category headers
-        if current_section and 'ADDITIONAL' in current_section:
-            # Look for pattern like "Category: content"
-            if ':' in line and not line.strip().startswith(('•', '-', '*', '·')):
-                parts = line.split(':', 1)
-                if len(parts) == 2:
-                    category = parts[0].strip().replace('&', '&amp;')
-                    content = parts[1].strip().replace('&', '&amp;')
-                    # Format as bold category followed by content on same line
-                    formatted_line = f'<b>{category}:</b> {content}'
-                    story.append(Paragraph(formatted_line, body_style))
-                    line_index += 1
-                    continue
-        
-        # Default: regular body text
-        is_first_line = False
-        # Escape HTML special characters
-        safe_line = line.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-        story.append(Paragraph(safe_line, body_style))
-        line_index += 1
-    
-    # Build PDF
-    doc.build(story)
+    doc.build(build_story(document))
     buffer.seek(0)
     return buffer
+
+
+_render_pool = BoundedProcessPool(settings.PDF_RENDER_WORKERS, max_queue=settings.PDF_RENDER_MAX_QUEUE)
+
+
+def shutdown_render_pool(kill: bool = False):
+    """Shut down the rendering pool, terminating its workers if `kill` is set."""
+    _render_pool.shutdown(kill)
+
+
+# Page objects, not the /Pages tree node; ReportLab never puts them in compressed object streams
+_page_object_pattern = re.compile(rb'/Type /Page\b')
+
+
+def count_pdf_pages(pdf_bytes: bytes) -> int:
+    """Count the pages of a PDF rendered by this module without parsing it."""
+    return len(_page_object_pattern.findall(pdf_bytes))
+
+
+def _render_pdf_bytes(content: str, engine: Optional[str]) -> bytes:
+    """Worker: render resume text to PDF bytes."""
+    return generate_pdf_from_text(content, engine=engine).getvalue()
+
+
+async def render_pdf(content: str, engine: Optional[str] = None) -> bytes:
+    """
+    Render resume text to PDF bytes in the rendering process pool, off the event loop.
+    Rejects the export with 503 when more than PDF_RENDER_MAX_QUEUE renders are waiting.
+    """
+    if _render_pool.saturated:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many PDF exports in progress. Please try again shortly.",
+            headers={"Retry-After": "1"}
+        )
+    loop = asyncio.get_running_loop()
+    try:
+        with track_stage("render"):
+            pdf_bytes = await _render_pool.run(
+                lambda executor: loop.run_in_executor(executor, _render_pdf_bytes, content, engine),
+                settings.PDF_RENDER_TIMEOUT
+            )
+    except asyncio.TimeoutError:
+        logger.warning(f"PDF rendering exceeded {settings.PDF_RENDER_TIMEOUT}s deadline")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error generating PDF: rendering took too long"
+        )
+    PDF_PAGES.observe(count_pdf_pages(pdf_bytes), "export")
+    PDF_BYTES.observe(len(pdf_bytes), "export")
+    return pdf_bytes
@@ -0,0 +1,85 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class BoundedProcessPool:
+    """
+    A lazily created process pool for CPU-bound work with a deadline per call.
+
+    A call that misses its deadline kills the workers, since a running task
+    cannot be cancelled and the executor does not say which worker runs it, and
+    the next call starts a fresh pool. That also kills the other calls running
+    on the pool: they see BrokenProcessPool and are retried once on the fresh
+    one, with their deadline starting over. With `max_queue`, `saturated`
+    reports when more than that many calls are waiting for a worker so callers
+    can shed load.
+    """
+
+    def __init__(self, workers: int, max_queue: Optional[int] = None):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.pending = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def saturated(self) -> bool:
+        return self.max_queue is not None and self.pending >= self.workers + self.max_queue
+
+    def executor(self) -> ProcessPoolExecutor:
+        """Get the pool, creating it on first use."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def shutdown(self, kill: bool = False):
+        """Shut down the pool, terminating its workers if `kill` is set, else waiting for running calls."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            self._stop(executor, kill=kill, wait=not kill)
+
+    @staticmethod
+    def _stop(executor: ProcessPoolExecutor, kill: bool, wait: bool):
+        if kill:
+            terminate_workers = getattr(executor, "terminate_workers", None)
+            if terminate_workers is not None:
+                terminate_workers()
+            else:
+                # Before Python 3.14 the executor has no public way to stop running workers
+                for process in list((executor._processes or {}).values()):
+                    process.terminate()
+        executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _discard(self, executor: ProcessPoolExecutor, kill: bool = False):
+        """
+        Stop `executor` without waiting, and stop handing it out if it is still
+        the current pool; a pool another call already replaced is left alone.
+        """
+        if self._executor is not executor:
+            return
+        self._executor = None
+        self._stop(executor, kill=kill, wait=False)
+
+    async def run(self, submit: Callable[[ProcessPoolExecutor], Awaitable[T]], timeout: float) -> T:
+        """
+        Await `submit(executor)` within `timeout` seconds. On a timeout the pool
+        is killed and asyncio.TimeoutError raised; `submit` may be called twice.
+        """
+        self.pending += 1
+        executor = self.executor()
+        try:
+            try:
+                return await asyncio.wait_for(submit(executor), timeout=timeout)
+            except BrokenProcessPool:
+                # Another call's timeout killed the pool under us; retry once on a fresh pool
+                self._discard(executor)
+                executor = self.executor()
+                return await asyncio.wait_for(submit(executor), timeout=timeout)
+        except asyncio.TimeoutError:
+            self._discard(executor, kill=True)
+            raise
+        finally:
+            self.pending -= 1
@@ -0,0 +1,223 @@
+import re
+from dataclasses import dataclass, field
+from typing import Optional
+from app.services.resume_parser import (
+    BODY,
+    BULLET,
+    DATE_RANGE_PATTERN,
+    EMAIL_PATTERN,
+    PHONE_PATTERN,
+    ResumeDocument,
+    ResumeLine,
+    ResumeSection,
+    parse_resume,
+)
+
+# Points available per component; they add up to 100
+COMPONENT_POINTS = {
+    "structure": 20,
+    "sections": 20,
+    "bullets": 15,
+    "quantified": 20,
+    "length": 10,
+    "ats": 15,
+}
+
+# Core sections: title keywords that identify them and their share of the section points
+CORE_SECTIONS = (
+    ("Experience", ("EXPERIENCE", "EMPLOYMENT"), 7),
+    ("Education", ("EDUCATION", "ACADEMIC"), 5),
+    ("Skills", ("SKILLS", "COMPETENCIES"), 5),
+    ("Summary", ("SUMMARY", "OBJECTIVE", "PROFILE"), 3),
+)
+
+MIN_READABLE_WORDS = 50  # Less text than this usually means a scanned or image-only PDF
+IDEAL_WORDS = (350, 900)
+IDEAL_BULLETS_PER_ROLE = (3, 6)
+TARGET_QUANTIFIED_RATIO = 0.5  # Share of bullets with a number that earns full points
+STATEMENT_MIN_WORDS = 5  # Unmarked lines this long under a section count as bullet points
+LONG_LINE_CHARS = 300  # Extracted lines longer than this usually come from tables or columns
+
+_metric_pattern = re.compile(r'\d|%|\$')
+_first_person_pattern = re.compile(r'\b(?:I|me|my)\b')
+# Replacement characters and private-use glyphs from icon fonts, which ATS parsers drop
+_unreadable_char_pattern = re.compile('[\ufffd\ue000-\uf8ff]')
+_role_term_pattern = re.compile(r'[A-Za-z][A-Za-z+#.]{2,}')
+
+
+@dataclass
+class QuickScore:
+    """Heuristic resume analysis, shaped like the LLM analysis plus per-component points."""
+    score: int
+    structure_feedback: str
+    keyword_analysis: str
+    improvements: list[str] = field(default_factory=list)
+    breakdown: dict[str, int] = field(default_factory=dict)  # Points earned per COMPONENT_POINTS entry
+    red_flags: list[str] = field(default_factory=list)  # ATS parsing problems found
+    unreadable: bool = False  # Too little text or structure for a full analysis to be useful
+
+
+def _scale(value: float, low: float, high: float) -> float:
+    """0 at or below `low`, 1 at or above `high`, linear in between."""
+    if value <= low:
+        return 0.0
+    if value >= high:
+        return 1.0
+    return (value - low) / (high - low)
+
+
+def _titled(section: ResumeSection, keywords: tuple[str, ...]) -> bool:
+    return any(keyword in section.title for keyword in keywords)
+
+
+def _has_section(document: ResumeDocument, keywords: tuple[str, ...]) -> bool:
+    return any(_titled(section, keywords) for section in document.sections)
+
+
+def _statements(section: ResumeSection) -> list[str]:
+    """Bullet points, plus sentence-like lines since text extracted from PDFs often loses the bullet glyphs."""
+    return [
+        item.text for item in section.items
+        if isinstance(item, ResumeLine)
+        and (item.kind == BULLET or (item.kind == BODY and len(item.text.split()) >= STATEMENT_MIN_WORDS))
+    ]
+
+
+def _skill_items(document: ResumeDocument) -> list[str]:
+    items = []
+    for section in document.sections:
+        if _titled(section, ("SKILLS", "COMPETENCIES")):
+            for item in section.items:
+                text = getattr(item, "text", "") or getattr(item, "heading", "")
+                items += [part.strip() for part in re.split(r'[,;|•]', text.split(':', 1)[-1]) if part.strip()]
+    return items
+
+
+def quick_score(text: str, target_role: Optional[str] = None) -> QuickScore:
+    """
+    Score resume text without a model call: structure, section completeness,
+    bullet density, quantified achievements, length and ATS red flags. Uses
+    the same line classification as PDF export, so it agrees with how the
+    resume will be laid out.
+    """
+    document = parse_resume(text)
+    words = len(text.split())
+    entries = [entry for section in document.sections for entry in section.entries]
+    bullets = [statement for section in document.sections for statement in _statements(section)]
+    experience = [section for section in document.sections if _titled(section, ("EXPERIENCE", "EMPLOYMENT"))]
+    improvements: list[str] = []
+    points: dict[str, float] = {}
+
+    # Structure: name, contact line, several sections, dated roles and degrees
+    timeline = [
+        entry for section in document.sections
+        if _titled(section, ("EXPERIENCE", "EMPLOYMENT", "EDUCATION"))
+        for entry in section.entries
+    ]
+    dated = sum(1 for entry in timeline if DATE_RANGE_PATTERN.search(f"{entry.heading} | {entry.detail}"))
+    points["structure"] = (
+        4 * bool(document.name)
+        + 4 * bool(document.contact)
+        + 6 * min(len(document.sections), 3) / 3
+        + (6 * dated / len(timeline) if timeline else 0)
+    )
+    if not document.name:
+        improvements.append("Put your full name alone on the first line")
+    if not document.contact:
+        improvements.append("Add a contact line with email, phone and LinkedIn under your name")
+    if timeline and dated < len(timeline):
+        improvements.append("Give every role and degree a date range, e.g. \"2019 - Present\"")
+
+    # Section completeness
+    missing = [name for name, keywords, _ in CORE_SECTIONS if not _has_section(document, keywords)]
+    points["sections"] = sum(share for name, _, share in CORE_SECTIONS if name not in missing)
+    if missing:
+        improvements.append(f"Add the missing {', '.join(missing)} section{'s' if len(missing) > 1 else ''}")
+
+    # Bullet density in experience sections
+    roles = sum(len(section.entries) for section in experience)
+    role_bullets = sum(len(_statements(section)) for section in experience)
+    per_role = role_bullets / roles if roles else float(role_bullets)
+    low, high = IDEAL_BULLETS_PER_ROLE
+    points["bullets"] = 15 * min(per_role / low, 1.0) - (5 if per_role > 2 * high else 0)
+    if per_role < low:
+        improvements.append(f"Describe each role with {low}-{high} bullet points")
+    elif per_role > 2 * high:
+        improvements.append(f"Trim roles to their {high} strongest bullet points")
+
+    # Quantified achievements
+    quantified = sum(1 for bullet in bullets if _metric_pattern.search(bullet))
+    ratio = quantified / len(bullets) if bullets else 0.0
+    points["quantified"] = 20 * min(ratio / TARGET_QUANTIFIED_RATIO, 1.0)
+    if ratio < TARGET_QUANTIFIED_RATIO:
+        improvements.append(
+            f"Quantify more achievements: {quantified} of {len(bullets)} bullets include a number, percentage or amount"
+        )
+
+    # Length
+    low, high = IDEAL_WORDS
+    if words <= high:
+        points["length"] = 10 * _scale(words, 150, low)
+    else:
+        points["length"] = 10 - 5 * _scale(words, high, 1500) - (2 if words > 1500 else 0)
+    if words < low:
+        improvements.append(f"Expand the resume; {words} words is thin for most roles (aim for {low}-{high})")
+    elif words > high:
+        improvements.append(f"Tighten the resume to about {high} words; it has {words}")
+
+    # ATS red flags
+    red_flags = []
+    penalties = 0
+    if words < MIN_READABLE_WORDS:
+        red_flags.append("Very little text could be extracted; the PDF may be scanned or image-only")
+        penalties += 15
+    if not document.sections:
+        red_flags.append("No section headings were recognized")
+        penalties += 5
+    if not EMAIL_PATTERN.search(text):
+        red_flags.append("No email address found")
+        penalties += 4
+    if not PHONE_PATTERN.search(text):
+        red_flags.append("No phone number found")
+        penalties += 2
+    if _unreadable_char_pattern.search(text):
+        red_flags.append("Contains symbols or icon-font glyphs that ATS parsers cannot read")
+        penalties += 3
+    if any(len(line) > LONG_LINE_CHARS for line in text.split('\n')):
+        red_flags.append("Very long lines suggest tables or a multi-column layout")
+        penalties += 3
+    if len(_first_person_pattern.findall(text)) >= 3:
+        red_flags.append("Written in the first person; drop \"I\" and \"my\"")
+        penalties += 2
+    points["ats"] = max(15 - penalties, 0)
+    improvements += red_flags
+
+    breakdown = {name: round(max(points[name], 0.0)) for name in COMPONENT_POINTS}
+
+    structure_feedback = (
+        f"Found {len(document.sections)} sections, {len(entries)} entries "
+        f"and {len(bullets)} bullet points in {words} words."
+    )
+    if missing:
+        structure_feedback += f" Missing: {', '.join(missing)}."
+
+    skills = _skill_items(document)
+    keyword_analysis = f"Skills section lists {len(skills)} items." if skills else "No skills section found; ATS keyword matching relies on one."
+    if target_role:
+        terms = {term.lower() for term in _role_term_pattern.findall(target_role)}
+        lowered = text.lower()
+        found = sorted(term for term in terms if term in lowered)
+        absent = sorted(terms - set(found))
+        keyword_analysis += f" Target role terms present: {', '.join(found) or 'none'}."
+        if absent:
+            keyword_analysis += f" Missing: {', '.join(absent)}."
+
+    return QuickScore(
+        score=min(sum(breakdown.values()), 100),
+        structure_feedback=structure_feedback,
+        keyword_analysis=keyword_analysis,
+        improvements=improvements,
+        breakdown=breakdown,
+        red_flags=red_flags,
+        unreadable=words < MIN_READABLE_WORDS or not (document.sections or document.contact),
+    )
@@ -0,0 +1,240 @@
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Optional
+from fastapi import HTTPException, status
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import ADMISSION_REJECTIONS, ADMISSION_WAIT_SECONDS, ADMISSION_WAITING, LatencyHistogram
+from app.models.rate_limit_bucket import RateLimitBucket
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_BUCKET = "global"
+# Upper bounds in seconds for admission wait buckets; the last bucket is open-ended
+WAIT_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+@dataclass(frozen=True)
+class BucketLimit:
+    key: str
+    rate: float  # Tokens added per second
+    capacity: float  # Burst size; a full bucket holds this many tokens
+
+
+def _refill(tokens: float, updated_at: float, limit: BucketLimit, now: float) -> float:
+    return min(limit.capacity, tokens + max(now - updated_at, 0.0) * limit.rate)
+
+
+def _take(levels: list[float], limits: list[BucketLimit], costs: list[float]) -> tuple[float, Optional[str]]:
+    """
+    Given the refilled level of each bucket, return (0, None) if every bucket
+    holds its cost in tokens, else the seconds until they all will and the key
+    of the bucket that takes longest to get there.
+    """
+    retry_after, blocking = 0.0, None
+    for level, limit, cost in zip(levels, limits, costs):
+        if level < cost:
+            wait = (cost - level) / limit.rate if limit.rate > 0 else math.inf
+            if wait > retry_after:
+                retry_after, blocking = wait, limit.key
+    return retry_after, blocking
+
+
+def _global_limit() -> BucketLimit:
+    return BucketLimit(GLOBAL_BUCKET, settings.RATE_LIMIT_GLOBAL_RATE, settings.RATE_LIMIT_GLOBAL_BURST)
+
+
+class InMemoryBucketBackend:
+    """Token buckets for a single app process."""
+
+    def __init__(self):
+        self._buckets: dict[str, tuple[float, float, BucketLimit]] = {}
+        self._prune_above = 1024
+
+    async def acquire(self, limits: list[BucketLimit], costs: list[float]) -> tuple[float, Optional[str]]:
+        """Take costs[i] tokens from each bucket limits[i], or from none of them; see _take for the result."""
+        now = time.monotonic()
+        levels = []
+        for limit in limits:
+            tokens, updated_at, _ = self._buckets.get(limit.key, (limit.capacity, now, limit))
+            levels.append(_refill(tokens, updated_at, limit, now))
+        retry_after, blocking = _take(levels, limits, costs)
+        if blocking is None:
+            for level, limit, cost in zip(levels, limits, costs):
+                self._buckets[limit.key] = (level - cost, now, limit)
+            if len(self._buckets) > self._prune_above:
+                self._prune(now)
+        return retry_after, blocking
+
+    def _prune(self, now: float):
+        # A bucket that has refilled completely is the same as one never used
+        self._buckets = {
+            key: (tokens, updated_at, limit)
+            for key, (tokens, updated_at, limit) in self._buckets.items()
+            if _refill(tokens, updated_at, limit, now) < limit.capacity
+        }
+        self._prune_above = max(1024, 2 * len(self._buckets))
+
+
+class PostgresBucketBackend:
+    """
+    Token buckets shared by several app replicas. The buckets of a request are
+    locked with SELECT ... FOR UPDATE (in key order, so concurrent requests
+    cannot deadlock) and updated in one transaction. Refills use each replica's
+    wall clock, which NTP keeps close enough for second-scale rates.
+    """
+
+    async def acquire(self, limits: list[BucketLimit], costs: list[float]) -> tuple[float, Optional[str]]:
+        pairs = sorted(zip(limits, costs), key=lambda pair: pair[0].key)
+        ordered, costs = [limit for limit, _ in pairs], [cost for _, cost in pairs]
+        async with AsyncSessionLocal() as db:
+            async with db.begin():
+                now = time.time()
+                insert = postgresql_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+                await db.execute(
+                    insert(RateLimitBucket)
+                    .values([{"key": limit.key, "tokens": limit.capacity, "updated_at": now} for limit in ordered])
+                    .on_conflict_do_nothing(index_elements=["key"])
+                )
+                result = await db.execute(
+                    select(RateLimitBucket.key, RateLimitBucket.tokens, RateLimitBucket.updated_at)
+                    .where(RateLimitBucket.key.in_([limit.key for limit in ordered]))
+                    .order_by(RateLimitBucket.key)
+                    .with_for_update()
+                )
+                rows = {row.key: row for row in result}
+                levels = [_refill(rows[limit.key].tokens, rows[limit.key].updated_at, limit, now) for limit in ordered]
+                retry_after, blocking = _take(levels, ordered, costs)
+                if blocking is None:
+                    for level, limit, cost in zip(levels, ordered, costs):
+                        await db.execute(
+                            update(RateLimitBucket)
+                            .where(RateLimitBucket.key == limit.key)
+                            .values(tokens=level - cost, updated_at=now)
+                        )
+        return retry_after, blocking
+
+
+class AdmissionController:
+    """
+    Admission control for analysis requests: each request takes a token from
+    its user's bucket and from a global bucket. A request that can't be
+    admitted right away waits, while at most RATE_LIMIT_MAX_QUEUE others
+    wait, for up to RATE_LIMIT_MAX_WAIT seconds; otherwise it gets a 429
+    with Retry-After. A batch is admitted once, before any of its resumes
+    start, against the user's batch bucket sized by its resume count; each
+    of its resumes then takes a global token when it reaches its model call.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.waiting = 0
+        self.max_waiting = 0
+        self.admitted = 0
+        self.rejected = {"user": 0, "batch": 0, "global": 0, "queue_full": 0}
+        self.errors = 0  # Backend failures; those requests are admitted
+        self.wait = LatencyHistogram(WAIT_BUCKETS)
+
+    @staticmethod
+    def _limits(user_id: int) -> list[BucketLimit]:
+        return [
+            BucketLimit(f"user:{user_id}", settings.RATE_LIMIT_USER_RATE, settings.RATE_LIMIT_USER_BURST),
+            _global_limit(),
+        ]
+
+    async def _acquire(self, limits: list[BucketLimit], costs: list[float]) -> tuple[float, Optional[str]]:
+        try:
+            return await self.backend.acquire(limits, costs)
+        except Exception as e:
+            # Fail open: an unavailable bucket store should not take analysis down with it
+            self.errors += 1
+            logger.warning(f"Rate limit check failed, admitting request: {str(e)}")
+            return 0.0, None
+
+    def _reject(self, reason: str, retry_after: float):
+        self.rejected[reason] += 1
+        ADMISSION_REJECTIONS.inc(reason)
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many analysis requests. Please try again later.",
+            headers={"Retry-After": str(max(1, math.ceil(min(retry_after, 3600))))}
+        )
+
+    async def admit(self, user_id: int):
+        """Return once the request is admitted, or raise a 429."""
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        await self._admit(self._limits(user_id), [1.0, 1.0])
+
+    async def admit_batch(self, user_id: int, items: int):
+        """
+        Admit a batch of `items` resumes as a whole: it takes one token per
+        resume from the user's batch bucket (a batch larger than the burst
+        empties it). Call before taking the batch limiter; each resume then
+        goes through admit_global before its model call.
+        """
+        if not settings.RATE_LIMIT_ENABLED or items <= 0:
+            return
+        limit = BucketLimit(f"batch:{user_id}", settings.RATE_LIMIT_BATCH_RATE, settings.RATE_LIMIT_BATCH_BURST)
+        await self._admit([limit], [float(min(items, settings.RATE_LIMIT_BATCH_BURST))])
+
+    async def admit_global(self):
+        """Take one token from the global bucket for a model call already admitted per user, or raise a 429."""
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        await self._admit([_global_limit()], [1.0])
+
+    async def _admit(self, limits: list[BucketLimit], costs: list[float]):
+        started = time.monotonic()
+        retry_after, blocking = await self._acquire(limits, costs)
+        if blocking is None:
+            self.admitted += 1
+            return
+        if self.waiting >= settings.RATE_LIMIT_MAX_QUEUE:
+            self._reject("queue_full", retry_after)
+
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        ADMISSION_WAITING.set(self.waiting)
+        try:
+            while blocking is not None:
+                reason = blocking.split(":", 1)[0]
+                if time.monotonic() - started + retry_after > settings.RATE_LIMIT_MAX_WAIT:
+                    self._reject(reason, retry_after)
+                await asyncio.sleep(retry_after)
+                retry_after, blocking = await self._acquire(limits, costs)
+        finally:
+            self.waiting -= 1
+            ADMISSION_WAITING.set(self.waiting)
+
+        waited = time.monotonic() - started
+        self.wait.observe(waited)
+        ADMISSION_WAIT_SECONDS.observe(waited)
+        self.admitted += 1
+
+    def stats(self) -> dict:
+        return {
+            "enabled": settings.RATE_LIMIT_ENABLED,
+            "backend": type(self.backend).__name__,
+            "waiting": self.waiting,
+            "max_waiting": self.max_waiting,
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "errors": self.errors,
+            "wait_seconds": self.wait.snapshot(),
+        }
+
+
+def _create_backend():
+    if settings.RATE_LIMIT_BACKEND == "postgres":
+        return PostgresBucketBackend()
+    return InMemoryBucketBackend()
+
+
+admission_controller = AdmissionController(_create_backend())
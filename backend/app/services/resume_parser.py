@@ -0,0 +1,208 @@
+import re
+from dataclasses import dataclass, field
+from typing import Optional, Union
+
+# Common section headers
+SECTION_KEYWORDS = frozenset({
+    'EXPERIENCE', 'WORK EXPERIENCE', 'EMPLOYMENT', 'PROFESSIONAL EXPERIENCE',
+    'EDUCATION', 'ACADEMIC BACKGROUND',
+    'SKILLS', 'TECHNICAL SKILLS', 'COMPETENCIES',
+    'PROJECTS', 'PROJECT EXPERIENCE',
+    'SUMMARY', 'PROFESSIONAL SUMMARY', 'OBJECTIVE', 'PROFILE',
+    'CERTIFICATIONS', 'CERTIFICATES', 'LICENSES',
+    'AWARDS', 'ACHIEVEMENTS', 'HONORS',
+    'PUBLICATIONS', 'PUBLICATIONS & RESEARCH',
+    'LANGUAGES', 'LANGUAGE SKILLS', 'COMMUNITY INVOLVEMENT'
+})
+
+BULLET_CHARS = ('•', '-', '*', '·')
+
+# Keywords in a section title that change how the lines under it are read
+_SECTION_TRAITS = ('SKILLS', 'SUMMARY', 'OBJECTIVE', 'PROFILE', 'EXPERIENCE', 'EDUCATION', 'PROJECT', 'ACTIVIT', 'ADDITIONAL')
+
+# Built once at import; a single alternation replaces scanning every keyword per line
+_section_keyword_pattern = re.compile('|'.join(re.escape(keyword) for keyword in sorted(SECTION_KEYWORDS, key=len, reverse=True)))
+EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+PHONE_PATTERN = re.compile(r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
+_contact_pattern = re.compile(
+    rf'{EMAIL_PATTERN.pattern}|{PHONE_PATTERN.pattern}|linkedin\.com|github\.com',
+    re.IGNORECASE
+)
+DATE_RANGE_PATTERN = re.compile(r'\b\d{4}\s*[-–]\s*\d{4}\b|\b\d{4}\s*[-–]\s*(Present|Current)\b', re.IGNORECASE)
+_not_name_pattern = re.compile(r'[|•\-\*@\d]')
+_bullet_marker_pattern = re.compile(r'^[•\-\*\·]\s*')
+
+# Line kinds produced by the classifier
+BLANK = 'blank'
+NAME = 'name'
+CONTACT = 'contact'
+BULLET = 'bullet'
+SECTION = 'section'
+SKILLS = 'skills'  # Skills content, kept as written
+SUMMARY = 'summary'
+ENTRY = 'entry'  # Experience/education line: "Company | Location | Dates"
+PROJECT = 'project'
+ACTIVITY = 'activity'
+CATEGORY = 'category'  # "Category: content" in an additional section
+BODY = 'body'
+
+
+@dataclass
+class ResumeLine:
+    """A single line of resume content; `kind` is one of the line kinds above."""
+    kind: str
+    text: str = ''
+    label: Optional[str] = None  # Category name of a CATEGORY line
+
+
+@dataclass
+class ResumeEntry:
+    """An employer, institution, project or organization row."""
+    heading: str
+    detail: str
+    subtitle: Optional[str] = None  # Job title, degree or role from the following line
+    stacked: bool = False  # Two-part "Title | Company" lines render on two lines instead of side by side
+
+
+ResumeItem = Union[ResumeLine, ResumeEntry]
+
+
+@dataclass
+class ResumeSection:
+    title: str
+    items: list[ResumeItem] = field(default_factory=list)
+
+    @property
+    def entries(self) -> list[ResumeEntry]:
+        return [item for item in self.items if isinstance(item, ResumeEntry)]
+
+    @property
+    def bullets(self) -> list[str]:
+        return [item.text for item in self.items if isinstance(item, ResumeLine) and item.kind == BULLET]
+
+
+@dataclass
+class ResumeDocument:
+    """Parsed resume: lines before the first section header, then the sections in order."""
+    header: list[ResumeItem] = field(default_factory=list)
+    sections: list[ResumeSection] = field(default_factory=list)
+
+    def _lines(self, kind: str) -> list[str]:
+        items = self.header + [item for section in self.sections for item in section.items]
+        return [item.text for item in items if isinstance(item, ResumeLine) and item.kind == kind]
+
+    @property
+    def name(self) -> Optional[str]:
+        names = self._lines(NAME)
+        return names[0] if names else None
+
+    @property
+    def contact(self) -> list[str]:
+        return self._lines(CONTACT)
+
+
+def _section_traits(title: str) -> frozenset[str]:
+    return frozenset(trait for trait in _SECTION_TRAITS if trait in title)
+
+
+def _is_standalone_section_keyword(line: str, line_upper: str) -> bool:
+    # Strict check used inside skills/summary sections, whose content often mentions keywords
+    return line_upper in SECTION_KEYWORDS and len(line) < 30 and '|' not in line and ',' not in line
+
+
+def classify_line(line: str, is_first_line: bool, traits: frozenset[str]) -> str:
+    """
+    Classify one stripped line given the parse state: whether a name may still
+    appear and the traits of the current section. Checks run in priority order.
+    """
+    if not line:
+        return BLANK
+
+    # Name: first line, 2-4 words, no separators or digits
+    if is_first_line and not _not_name_pattern.search(line) and 2 <= len(line.split()) <= 4:
+        return NAME
+
+    if _contact_pattern.search(line):
+        return CONTACT
+
+    # Bullets before section headers to avoid false positives
+    if line.startswith(BULLET_CHARS):
+        return BULLET
+
+    line_upper = line.upper()
+    if traits and ('SKILLS' in traits or 'SUMMARY' in traits or 'OBJECTIVE' in traits or 'PROFILE' in traits):
+        if not _is_standalone_section_keyword(line, line_upper):
+            return SKILLS if 'SKILLS' in traits else SUMMARY
+
+    if (_section_keyword_pattern.search(line_upper)
+            or (line.isupper() and len(line) < 50 and '|' not in line)):
+        return SECTION
+
+    if '|' in line:
+        if 'EXPERIENCE' in traits or 'EDUCATION' in traits or DATE_RANGE_PATTERN.search(line):
+            return ENTRY
+        if 'PROJECT' in traits:
+            return PROJECT
+        if 'ACTIVIT' in traits and line.count('|') >= 2:
+            return ACTIVITY
+
+    if 'ADDITIONAL' in traits and ':' in line:
+        return CATEGORY
+
+    return BODY
+
+
+def _subtitle(lines: list[str], index: int) -> Optional[str]:
+    """Return the line at `index` if it can be the job title/degree under an entry."""
+    if index < len(lines):
+        line = lines[index].strip()
+        if line and not line.startswith(BULLET_CHARS) and '|' not in line:
+            return line
+    return None
+
+
+def parse_resume(content: str) -> ResumeDocument:
+    """
+    Parse resume text (the layout the analysis prompt asks for) into a
+    ResumeDocument. Each line is classified once; entries may take the
+    following line as their subtitle.
+    """
+    document = ResumeDocument()
+    items = document.header
+    traits: frozenset[str] = frozenset()
+    is_first_line = True
+
+    lines = content.split('\n')
+    index = 0
+    while index < len(lines):
+        line = lines[index].strip()
+        index += 1
+        kind = classify_line(line, is_first_line, traits)
+
+        if kind == SECTION:
+            section = ResumeSection(title=line.upper())
+            document.sections.append(section)
+            items = section.items
+            traits = _section_traits(section.title)
+        elif kind in (ENTRY, PROJECT, ACTIVITY):
+            parts = [part.strip() for part in line.split('|')]
+            entry = ResumeEntry(heading=parts[0], detail=' | '.join(parts[1:]))
+            if kind == ENTRY and len(parts) == 2:
+                entry.stacked = True
+            elif kind != PROJECT:
+                entry.subtitle = _subtitle(lines, index)
+                if entry.subtitle is not None:
+                    index += 1
+            items.append(entry)
+        elif kind == BULLET:
+            items.append(ResumeLine(BULLET, _bullet_marker_pattern.sub('', line)))
+        elif kind == CATEGORY:
+            label, text = line.split(':', 1)
+            items.append(ResumeLine(CATEGORY, text.strip(), label=label.strip()))
+        else:
+            items.append(ResumeLine(kind, line))
+
+        if kind in (NAME, CONTACT, BODY):
+            is_first_line = False
+
+    return document
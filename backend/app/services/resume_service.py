@@ -1,37 +1,258 @@
+import asyncio
 import io
+import logging
+import mmap
+import os
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Optional, Union
 from PyPDF2 import PdfReader
 from fastapi import UploadFile, HTTPException, status
+from fastapi.responses import JSONResponse
 from app.core.config import settings
+from app.core.metrics import PDF_BYTES, PDF_PAGES, track_stage
+from app.services.process_pool import BoundedProcessPool
 
+logger = logging.getLogger(__name__)
 
-async def extract_text_from_pdf(file: UploadFile) -> str:
+PDF_MAGIC = b'%PDF-'
+ZIP_MAGIC = b'PK\x03\x04'
+UPLOAD_CHUNK_SIZE = 64 * 1024
+MULTIPART_OVERHEAD = 64 * 1024  # Allowance for multipart boundaries, part headers and form fields
+PAGE_BREAK = '\f'  # Marks page boundaries in extracted text
+
+_extraction_pool = BoundedProcessPool(settings.PDF_EXTRACT_WORKERS)
+
+
+def shutdown_extraction_pool(kill: bool = False):
+    """Shut down the extraction pool, terminating its workers if `kill` is set."""
+    _extraction_pool.shutdown(kill)
+
+
+@contextmanager
+def _open_pdf(source: Union[bytes, str]):
+    """Open a PDF from raw bytes or, without copying it into memory, from a file path via mmap."""
+    if isinstance(source, bytes):
+        yield PdfReader(io.BytesIO(source))
+        return
+    with open(source, 'rb') as pdf_file, mmap.mmap(pdf_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        yield PdfReader(mapped)
+
+
+def _count_pages(source: Union[bytes, str]) -> int:
+    """Worker: return the number of pages in the PDF."""
+    with _open_pdf(source) as pdf_reader:
+        return len(pdf_reader.pages)
+
+
+def _extract_pages(source: Union[bytes, str], start: int, stop: int, max_chars: int) -> list[tuple[int, str, float]]:
     """
-    Extract text content from uploaded PDF file.
+    Worker: extract text from pages [start, stop).
+    Returns (page_number, text, seconds) per page and stops once max_chars is reached.
+    """
+    results = []
+    collected = 0
+    with _open_pdf(source) as pdf_reader:
+        for page_number in range(start, stop):
+            started = time.perf_counter()
+            text = pdf_reader.pages[page_number].extract_text() or ""
+            results.append((page_number, text, time.perf_counter() - started))
+            collected += len(text)
+            if collected >= max_chars:
+                break
+    return results
+
+
+def _page_ranges(page_count: int, workers: int) -> list[tuple[int, int]]:
+    """Split pages into contiguous ranges, one per worker for long documents."""
+    if page_count <= settings.PDF_PARALLEL_PAGE_THRESHOLD or workers <= 1:
+        return [(0, page_count)]
+    chunk = -(-page_count // workers)
+    return [(start, min(start + chunk, page_count)) for start in range(0, page_count, chunk)]
+
+
+async def _run_extraction(executor: ProcessPoolExecutor, source: Union[bytes, str]) -> tuple[int, list[tuple[int, str, float]]]:
+    """Count pages, then extract text with the pages split across the pool's workers."""
+    loop = asyncio.get_running_loop()
+    page_count = await loop.run_in_executor(executor, _count_pages, source)
+    pages_to_read = min(page_count, settings.PDF_MAX_PAGES)
+    chunks = await asyncio.gather(*(
+        loop.run_in_executor(executor, _extract_pages, source, start, stop, settings.PDF_MAX_CHARS)
+        for start, stop in _page_ranges(pages_to_read, settings.PDF_EXTRACT_WORKERS)
+    ))
+    return page_count, [page for chunk in chunks for page in chunk]
+
+
+async def extract_text_from_content(source: Union[bytes, str], filename: str = "resume.pdf") -> str:
+    """
+    Extract text from raw PDF bytes or a PDF file path in the extraction process pool.
+    Enforces the page, character and deadline budgets from settings.
+    """
+    started = time.perf_counter()
+    with track_stage("extract"):
+        try:
+            page_count, pages = await _extraction_pool.run(
+                lambda executor: _run_extraction(executor, source), settings.PDF_EXTRACT_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"PDF extraction for {filename} exceeded {settings.PDF_EXTRACT_TIMEOUT}s deadline")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="PDF took too long to process. Please upload a simpler file."
+            )
+    PDF_PAGES.observe(page_count, "upload")
+    PDF_BYTES.observe(len(source) if isinstance(source, bytes) else os.path.getsize(source), "upload")
+
+    text_content = f"\n{PAGE_BREAK}\n".join(text for _, text, _ in pages)[:settings.PDF_MAX_CHARS]
+
+    slowest = sorted(pages, key=lambda page: page[2], reverse=True)[:3]
+    logger.info(
+        f"Extracted {len(pages)}/{page_count} pages from {filename} in "
+        f"{time.perf_counter() - started:.3f}s; slowest pages: "
+        + ", ".join(f"p{page_number + 1}={seconds * 1000:.1f}ms" for page_number, _, seconds in slowest)
+    )
+    return text_content
+
+
+def _upload_too_large(max_size: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File size exceeds maximum allowed size of {max_size / 1024 / 1024}MB"
+    )
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Reject multipart requests whose body exceeds the limit for their path before
+    Starlette parses and spools it: a larger Content-Length gets a 413 without
+    reading the body, and a body streamed without one (chunked) is cut off
+    with a 413 as soon as it crosses the limit.
+    """
+
+    def __init__(self, app, default_limit: int, path_limits: Optional[dict[str, int]] = None):
+        self.app = app
+        self.default_limit = default_limit
+        self.path_limits = path_limits or {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        if not headers.get(b"content-type", b"").startswith(b"multipart/form-data"):
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.path_limits.get(scope["path"].rstrip("/"), self.default_limit)
+        try:
+            content_length = int(headers.get(b"content-length", b""))
+        except ValueError:
+            content_length = None
+        if content_length is not None and content_length > limit + MULTIPART_OVERHEAD:
+            response = JSONResponse(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                content={"detail": _upload_too_large(limit).detail}
+            )
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit + MULTIPART_OVERHEAD:
+                    # An HTTPException passes through FastAPI's body parsing and is rendered as the 413
+                    raise _upload_too_large(limit)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+async def spool_upload(
+    file: UploadFile,
+    max_size: Optional[int] = None,
+    magic: bytes = PDF_MAGIC,
+    kind: str = "PDF"
+) -> str:
+    """
+    Copy an upload to a temporary file in fixed-size chunks.
+    Rejects content over the size limit or without the expected signature on
+    the first chunk. Starlette has already received and spooled the whole
+    multipart body by now, so the request size itself is bounded earlier by
+    UploadSizeLimitMiddleware; this enforces the limit per file. Returns the
+    temp file path; the caller must remove it.
+    """
+    max_size = max_size or settings.MAX_UPLOAD_SIZE
+    if file.size is not None and file.size > max_size:
+        raise _upload_too_large(max_size)
+
+    spool = tempfile.NamedTemporaryFile(prefix="upload-", suffix=f".{kind.lower()}", delete=False)
+    try:
+        with spool:
+            total = 0
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                if total == 0 and magic not in chunk[:1024]:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"Only {kind} files are supported"
+                    )
+                total += len(chunk)
+                if total > max_size:
+                    raise _upload_too_large(max_size)
+                spool.write(chunk)
+        if total == 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Uploaded file is empty"
+            )
+        return spool.name
+    except BaseException:
+        os.unlink(spool.name)
+        raise
+
+
+def list_zip_pdfs(archive: zipfile.ZipFile) -> list[zipfile.ZipInfo]:
+    """List the PDF entries of a ZIP archive, skipping directories and macOS metadata."""
+    return [
+        info for info in archive.infolist()
+        if not info.is_dir()
+        and info.filename.lower().endswith('.pdf')
+        and not info.filename.startswith('__MACOSX/')
+    ]
+
+
+def read_zip_pdf(archive: zipfile.ZipFile, info: zipfile.ZipInfo) -> bytes:
     """
-    # Check file size
-    content = await file.read()
+    Read one PDF entry from a ZIP archive, enforcing the upload size limit
+    on the decompressed data rather than trusting the declared size.
+    """
+    if info.file_size > settings.MAX_UPLOAD_SIZE:
+        raise _upload_too_large(settings.MAX_UPLOAD_SIZE)
+    with archive.open(info) as entry:
+        content = entry.read(settings.MAX_UPLOAD_SIZE + 1)
     if len(content) > settings.MAX_UPLOAD_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"File size exceeds maximum allowed size of {settings.MAX_UPLOAD_SIZE / 1024 / 1024}MB"
-        )
-    
-    # Check file type
-    if not file.filename.endswith('.pdf'):
+        raise _upload_too_large(settings.MAX_UPLOAD_SIZE)
+    if PDF_MAGIC not in content[:1024]:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Only PDF files are supported"
         )
-    
+    return content
+
+
+async def extract_resume_text(source: Union[bytes, str], filename: str) -> str:
+    """
+    Extract resume text from PDF bytes or a PDF file path.
+    Raises HTTPException if the PDF is unreadable or contains no text.
+    """
     try:
-        # Read PDF
-        pdf_file = io.BytesIO(content)
-        pdf_reader = PdfReader(pdf_file)
-        
-        # Extract text from all pages
-        text_content = ""
-        for page in pdf_reader.pages:
-            text_content += page.extract_text() + "\n"
+        text_content = await extract_text_from_content(source, filename)
         
         if not text_content.strip():
             raise HTTPException(
@@ -48,3 +269,23 @@ async def extract_text_from_pdf(file: UploadFile) -> str:
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Error processing PDF: {str(e)}"
         )
+
+
+async def extract_text_from_pdf(file: UploadFile) -> str:
+    """
+    Extract text content from uploaded PDF file.
+    """
+    # Check file type
+    if not file.filename.endswith('.pdf'):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only PDF files are supported"
+        )
+    
+    # Stream to disk, enforcing the size limit and PDF signature as we go
+    path = await spool_upload(file)
+    
+    try:
+        return await extract_resume_text(path, file.filename)
+    finally:
+        os.unlink(path)
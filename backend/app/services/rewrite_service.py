@@ -0,0 +1,135 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.rewrite_context import RewriteContext
+from app.services.cache_service import analysis_cache
+from app.services.history_service import set_improved_content
+from app.services.openai_service import rewrite_resume
+from app.services.rate_limit_service import admission_controller
+
+logger = logging.getLogger(__name__)
+
+PRUNE_EVERY = 100  # Registrations between sweeps of expired rewrite contexts
+
+
+class RewriteService:
+    """
+    Produces improved_content separately from scoring.
+
+    After a scoring call the resume text and scores are stored in
+    rewrite_contexts under the analysis id, so any replica can serve the
+    rewrite, also after a restart. It is generated on first request (or right
+    away when prefetching), shared by concurrent requests in a process, and
+    written back to the context row, the analysis cache and history so it is
+    only generated once.
+    """
+
+    def __init__(self, max_pending: int):
+        self.max_pending = max_pending
+        self._results: OrderedDict[str, str] = OrderedDict()
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._registrations = 0
+
+    async def register(self, analysis_id: str, resume_text: str, target_role: Optional[str], scoring: dict, prefetch: bool):
+        """
+        Store what a later rewrite of `analysis_id` needs, optionally starting it
+        now. Failures are logged; the rewrite endpoint then answers 404.
+        """
+        try:
+            async with AsyncSessionLocal() as db:
+                insert = postgresql_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+                await db.execute(
+                    insert(RewriteContext)
+                    .values(
+                        analysis_id=analysis_id,
+                        resume_text=resume_text,
+                        target_role=target_role,
+                        scoring=scoring,
+                        created_at=datetime.now(timezone.utc),
+                    )
+                    .on_conflict_do_nothing(index_elements=["analysis_id"])
+                )
+                self._registrations += 1
+                if self._registrations % PRUNE_EVERY == 0:
+                    cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.REWRITE_CONTEXT_TTL_SECONDS)
+                    await db.execute(delete(RewriteContext).where(RewriteContext.created_at < cutoff))
+                await db.commit()
+        except Exception as e:
+            logger.warning(f"Could not store rewrite context for analysis {analysis_id[:12]}: {str(e)}")
+            return
+        if prefetch:
+            self._start(analysis_id)
+
+    async def get(self, analysis_id: str, user_id: Optional[int] = None) -> Optional[str]:
+        """
+        Return improved_content for `analysis_id`, generating it if needed.
+        With `user_id`, a generation is admitted against that user's and the
+        global rate limit before its model call (429 if it can't be).
+        Returns None if the analysis is unknown or its context has expired.
+        """
+        if analysis_id in self._results:
+            return self._results[analysis_id]
+        if settings.ANALYSIS_CACHE_ENABLED:
+            cached = await analysis_cache.get(analysis_id)
+            if cached is not None and cached.get("improved_content"):
+                return cached["improved_content"]
+        # Shield so a client disconnect does not cancel a rewrite others may be waiting on
+        return await asyncio.shield(self._start(analysis_id, user_id))
+
+    def _start(self, analysis_id: str, user_id: Optional[int] = None) -> asyncio.Task:
+        task = self._tasks.get(analysis_id)
+        if task is None:
+            task = self._tasks[analysis_id] = asyncio.create_task(self._generate(analysis_id, user_id))
+            # Mark failures as retrieved; they are logged in _generate and a prefetch may have no waiter
+            task.add_done_callback(lambda done: done.cancelled() or done.exception())
+        return task
+
+    async def _generate(self, analysis_id: str, user_id: Optional[int] = None) -> Optional[str]:
+        try:
+            async with AsyncSessionLocal() as db:
+                context = (await db.execute(
+                    select(RewriteContext).where(RewriteContext.analysis_id == analysis_id)
+                )).scalar_one_or_none()
+            if context is None:
+                return None
+            if context.improved_content:
+                improved_content = context.improved_content
+            else:
+                if user_id is not None:
+                    await admission_controller.admit(user_id)
+                improved_content = await rewrite_resume(context.resume_text, context.target_role, context.scoring)
+                await self._store(analysis_id, context.scoring, improved_content)
+        except Exception as e:
+            logger.warning(f"Rewrite for analysis {analysis_id[:12]} failed: {str(e)}")
+            raise
+        finally:
+            # Drop the task either way; a failed rewrite can be retried by the next request
+            self._tasks.pop(analysis_id, None)
+        self._results[analysis_id] = improved_content
+        while len(self._results) > self.max_pending:
+            self._results.popitem(last=False)
+        return improved_content
+
+    async def _store(self, analysis_id: str, scoring: dict, improved_content: str):
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(RewriteContext)
+                .where(RewriteContext.analysis_id == analysis_id)
+                .values(improved_content=improved_content)
+            )
+            await db.commit()
+        if settings.ANALYSIS_CACHE_ENABLED:
+            await analysis_cache.set(
+                analysis_id, {**scoring, "improved_content": improved_content}, settings.OPENAI_MODEL
+            )
+        await set_improved_content(analysis_id, improved_content)
+
+
+rewrite_service = RewriteService(max_pending=settings.REWRITE_MAX_PENDING)
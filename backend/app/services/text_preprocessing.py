@@ -0,0 +1,200 @@
+import logging
+import re
+from collections import Counter
+from typing import Optional
+from app.core.config import settings
+from app.services.resume_parser import SECTION, SECTION_KEYWORDS, classify_line
+from app.services.resume_service import PAGE_BREAK
+
+logger = logging.getLogger(__name__)
+
+_inline_space_pattern = re.compile(r'[ \t\u00a0\u2000-\u200b\u3000]+')
+_blank_lines_pattern = re.compile(r'\n{3,}')
+_hyphen_break_pattern = re.compile(r'([A-Za-z])-\n([a-z])')
+_digits_pattern = re.compile(r'\d+')
+_token_pattern = re.compile(r'[A-Za-z]+|\d+|[^\sA-Za-z\d]')
+
+# Section priority when trimming to the token budget: lower is kept first
+_SECTION_PRIORITIES = (
+    ('EXPERIENCE', 0), ('EMPLOYMENT', 0),
+    ('SUMMARY', 1), ('OBJECTIVE', 1), ('PROFILE', 1),
+    ('SKILLS', 2), ('COMPETENCIES', 2),
+    ('EDUCATION', 3), ('ACADEMIC', 3),
+    ('PROJECT', 4),
+    ('CERTIFICAT', 5), ('LICENSES', 5), ('AWARDS', 5), ('ACHIEVEMENTS', 5), ('HONORS', 5),
+    ('PUBLICATIONS', 6), ('ACTIVIT', 6), ('LANGUAGES', 6),
+)
+_DEFAULT_SECTION_PRIORITY = 7
+
+# Lines this close to the top or bottom of a page are header/footer candidates
+_PAGE_EDGE_LINES = 2
+
+_BULLET_CHARS = ('•', '-', '*', '·')
+
+
+def count_tokens(text: str) -> int:
+    """
+    Estimate GPT token count locally without a tokenizer download.
+    Words cost one token per six letters, digit runs one per three digits,
+    and each punctuation mark one token, which tracks cl100k closely for
+    resume-style English.
+    """
+    tokens = 0
+    for match in _token_pattern.finditer(text):
+        piece = match.group()
+        if piece[0].isalpha():
+            tokens += 1 + (len(piece) - 1) // 6
+        elif piece[0].isdigit():
+            tokens += 1 + (len(piece) - 1) // 3
+        else:
+            tokens += 1
+    return tokens
+
+
+def normalize_whitespace(text: str) -> str:
+    """Collapse runs of spaces, strip line ends and squeeze blank lines."""
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    lines = [_inline_space_pattern.sub(' ', line).strip() for line in text.split('\n')]
+    return _blank_lines_pattern.sub('\n\n', '\n'.join(lines)).strip()
+
+
+def _page_line_key(line: str) -> str:
+    # Short lines compare without digits so running footers like "Page 2 of 3" match
+    return _digits_pattern.sub('#', line) if len(line) <= 30 else line
+
+
+def remove_repeated_page_lines(pages: list[str]) -> list[str]:
+    """
+    Drop header/footer lines: non-bullet lines near the top or bottom of a page
+    that repeat on at least half the pages. The first occurrence is kept so a
+    name used as a running header is not lost.
+    """
+    if len(pages) < 2:
+        return pages
+
+    def edge_keys(page_lines: list[str]) -> set[str]:
+        edges = page_lines[:_PAGE_EDGE_LINES] + page_lines[-_PAGE_EDGE_LINES:]
+        return {_page_line_key(line) for line in edges if line and not line.startswith(_BULLET_CHARS)}
+
+    split_pages = [page.split('\n') for page in pages]
+    counts = Counter(key for page_lines in split_pages for key in edge_keys(page_lines))
+    threshold = max(2, (len(pages) + 1) // 2)
+    repeated = {key for key, count in counts.items() if count >= threshold}
+    if not repeated:
+        return pages
+
+    seen = set()
+    cleaned = []
+    for page_lines in split_pages:
+        last = len(page_lines) - 1
+        kept = []
+        for index, line in enumerate(page_lines):
+            key = _page_line_key(line)
+            if (index < _PAGE_EDGE_LINES or index > last - _PAGE_EDGE_LINES) and key in repeated:
+                if key in seen:
+                    continue
+                seen.add(key)
+            kept.append(line)
+        cleaned.append('\n'.join(kept))
+    return cleaned
+
+
+def rejoin_hyphenated_words(text: str) -> str:
+    """Re-join words split across lines with a hyphen ("manage-\\nment" -> "management")."""
+    return _hyphen_break_pattern.sub(r'\1\2', text)
+
+
+def _section_priority(header: str) -> int:
+    header = header.upper()
+    for keyword, priority in _SECTION_PRIORITIES:
+        if keyword in header:
+            return priority
+    return _DEFAULT_SECTION_PRIORITY
+
+
+def _is_section_keyword(line: str) -> bool:
+    # "Work Experience", "SKILLS", "Technical Skills:" in any case
+    return line.upper().rstrip(':').strip() in SECTION_KEYWORDS
+
+
+def _split_sections(lines: list[str]) -> list[list[str]]:
+    """
+    Split lines into [lead, section, section, ...]. Headers are lines the
+    resume parser classifies as a section that are a known section keyword,
+    in any case; other all-caps lines only count once such a header has been
+    seen, so an all-caps name or title at the top stays in the lead.
+    """
+    blocks: list[list[str]] = [[]]
+    for index, line in enumerate(lines):
+        if classify_line(line, index == 0, frozenset()) == SECTION:
+            if _is_section_keyword(line) or (len(blocks) > 1 and line.isupper()):
+                blocks.append([])
+        blocks[-1].append(line)
+    return blocks
+
+
+def _truncate_tokens(text: str, budget: int) -> str:
+    """Cut text after the first `budget` tokens, as count_tokens counts them."""
+    tokens = 0
+    for match in _token_pattern.finditer(text):
+        tokens += count_tokens(match.group())
+        if tokens > budget:
+            return text[:match.start()].rstrip()
+    return text
+
+
+def trim_to_token_budget(text: str, budget: int) -> str:
+    """
+    Trim text to at most `budget` tokens. Lower-priority sections are
+    shortened from the end first and section order is preserved; the lead
+    block (name, contact) is kept. If that is not enough, e.g. when no
+    section headers are found, the text is cut off at the budget.
+    """
+    if count_tokens(text) <= budget:
+        return text
+
+    blocks = _split_sections(text.split('\n'))
+
+    costs = [[count_tokens(line) + 1 for line in block] for block in blocks]
+    total = sum(sum(block_costs) for block_costs in costs)
+    trim_order = sorted(
+        range(1, len(blocks)),
+        key=lambda index: _section_priority(blocks[index][0]),
+        reverse=True
+    )
+    for index in trim_order:
+        # Keep the header line of every section so the model still sees the structure
+        while total > budget and len(blocks[index]) > 1:
+            blocks[index].pop()
+            total -= costs[index].pop()
+        if total <= budget:
+            break
+
+    trimmed = '\n'.join(line for block in blocks for line in block)
+    if total > budget:
+        trimmed = _truncate_tokens(trimmed, budget)
+    return trimmed
+
+
+def preprocess_resume_text(text: str, token_budget: Optional[int] = None, trim: bool = True) -> str:
+    """
+    Clean extracted resume text before it goes into a prompt: normalize
+    whitespace, drop repeated page headers/footers, re-join hyphenated
+    words and, with `trim`, trim to the token budget. Logs the tokens saved.
+    """
+    token_budget = token_budget or settings.RESUME_TOKEN_BUDGET
+    tokens_before = count_tokens(text)
+
+    pages = [normalize_whitespace(page) for page in text.split(PAGE_BREAK)]
+    pages = remove_repeated_page_lines(pages)
+    cleaned = normalize_whitespace('\n'.join(page for page in pages if page))
+    cleaned = rejoin_hyphenated_words(cleaned)
+    if trim:
+        cleaned = trim_to_token_budget(cleaned, token_budget)
+
+    tokens_after = count_tokens(cleaned)
+    logger.info(
+        f"Preprocessed resume text: {tokens_before} -> {tokens_after} tokens "
+        f"({tokens_before - tokens_after} saved)"
+    )
+    return cleaned
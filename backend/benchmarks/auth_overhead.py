@@ -0,0 +1,89 @@
+"""
+Auth overhead on authenticated requests, with and without the token cache.
+
+Starts the real app in a background thread, logs in once and then hits
+GET /auth/me (auth plus a trivial response) from a number of concurrent
+clients, first with AUTH_CACHE_ENABLED off (JWT decode and a user query per
+request) and then on. Reports p50/p99 latency and requests/sec per mode.
+
+Usage (from backend/):
+    python -m benchmarks.auth_overhead --clients 16 --seconds 5
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.export_concurrency import _percentile
+from benchmarks.upload_concurrency import _free_port, _serve
+
+
+async def _client(client, headers: dict, stop: asyncio.Event) -> list[float]:
+    latencies = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = await client.get("/auth/me", headers=headers)
+        latencies.append(time.perf_counter() - started)
+        assert response.status_code == 200, response.text
+    return latencies
+
+
+async def _phase(client, headers: dict, clients: int, seconds: float) -> list[float]:
+    stop = asyncio.Event()
+    workers = [asyncio.create_task(_client(client, headers, stop)) for _ in range(clients)]
+    await asyncio.sleep(seconds)
+    stop.set()
+    return [latency for latencies in await asyncio.gather(*workers) for latency in latencies]
+
+
+async def _run(base_url: str, clients: int, seconds: float) -> dict[str, list[float]]:
+    import httpx
+    from app.core.config import settings
+
+    limits = httpx.Limits(max_connections=clients + 2)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        credentials = {"email": "loadtest@example.com", "password": "loadtest-password"}
+        await client.post("/auth/register", json=credentials)
+        login = await client.post(
+            "/auth/login",
+            data={"username": credentials["email"], "password": credentials["password"]},
+        )
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        results = {}
+        for label, enabled in (("uncached", False), ("cached", True)):
+            settings.AUTH_CACHE_ENABLED = enabled
+            await _phase(client, headers, clients, min(seconds, 1.0))  # Warm up
+            results[label] = await _phase(client, headers, clients, seconds)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent clients")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Duration of each phase")
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(), "loadtest.db")
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{db_path}")
+    os.environ.setdefault("SECRET_KEY", "loadtest-secret")
+    os.environ.setdefault("OPENAI_API_KEY", "sk-loadtest")
+
+    from app.main import app
+
+    app_port = _free_port()
+    _serve(app, app_port)
+    results = asyncio.run(_run(f"http://127.0.0.1:{app_port}", args.clients, args.seconds))
+
+    print(f"GET /auth/me, {args.clients} clients, {args.seconds:.0f}s per phase")
+    for label, latencies in results.items():
+        print(
+            f"{label:>8}: p50 {statistics.median(latencies) * 1000:.2f} ms, "
+            f"p99 {_percentile(latencies, 0.99) * 1000:.2f} ms, {len(latencies) / args.seconds:.0f} req/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Deterministic synthetic resume corpus for the extraction and rendering benchmarks.
+
+Every document uses the layout the analysis prompt asks for and exercises each
+section type `resume_parser` distinguishes: summary, skills, experience,
+education, projects, activities and additional information. Regular documents
+are sized to a target page count; pathological ones stress single code paths
+(thousands of bullets, very long lines, hundreds of sections).
+"""
+import random
+from dataclasses import dataclass
+
+FIRST_NAMES = ("Jane", "Omar", "Priya", "Lucas", "Mei", "Sam", "Ana", "Tobias")
+LAST_NAMES = ("Doe", "Haddad", "Raman", "Silva", "Chen", "Okafor", "Novak", "Berg")
+CITIES = ("Boston, MA", "Austin, TX", "Denver, CO", "Seattle, WA", "Chicago, IL")
+TITLES = ("Senior Data Analyst", "Software Engineer", "Product Manager", "Data Scientist", "Analytics Lead")
+SKILLS = ("Python", "SQL", "Tableau", "dbt", "Airflow", "Spark", "Kubernetes", "React", "Go", "Excel")
+VERBS = ("Built", "Led", "Automated", "Designed", "Reduced", "Launched", "Migrated", "Partnered on")
+OBJECTS = (
+    "dashboards used by 40 stakeholders", "the weekly KPI pipeline", "a churn model in production",
+    "quarterly forecasting with finance", "the data warehouse to dbt", "an A/B testing platform",
+)
+RESULTS = ("cutting reporting time by 30%", "saving $120K per year", "& improving accuracy to 94%", "<ahead of schedule>")
+
+
+@dataclass(frozen=True)
+class CorpusCase:
+    name: str
+    content: str
+    pathological: bool = False
+
+
+def _bullet(rng: random.Random) -> str:
+    return f"• {rng.choice(VERBS)} {rng.choice(OBJECTS)}, {rng.choice(RESULTS)}"
+
+
+def _header(rng: random.Random) -> list[str]:
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    return [
+        f"{first} {last}",
+        f"{first.lower()}@example.com | (555) {rng.randint(100, 999)}-{rng.randint(1000, 9999)} | linkedin.com/in/{first.lower()}{last.lower()}",
+        "PROFESSIONAL SUMMARY",
+        "Analyst with years of experience turning data into decisions across product and finance teams.",
+        "TECHNICAL SKILLS",
+        ", ".join(rng.sample(SKILLS, 6)),
+    ]
+
+
+def _job(rng: random.Random, index: int, bullets: int) -> list[str]:
+    start = 2000 + index % 20
+    return [
+        f"Company {index} | {rng.choice(CITIES)} | {start} - {start + rng.randint(1, 4)}",
+        rng.choice(TITLES),
+        *(_bullet(rng) for _ in range(bullets)),
+        "",
+    ]
+
+
+def _tail(rng: random.Random, projects: int, activities: int) -> list[str]:
+    lines = ["EDUCATION", f"State University | {rng.choice(CITIES)} | 1996 - 2000", "B.S. Statistics"]
+    lines.append("PROJECTS")
+    for index in range(projects):
+        lines += [f"Project {index} | {2015 + index % 10}", _bullet(rng)]
+    lines.append("LEADERSHIP & ACTIVITIES")
+    for index in range(activities):
+        lines += [f"Club {index} | Organizer | 2019 - 2021", "Volunteer Coordinator", _bullet(rng)]
+    lines += [
+        "ADDITIONAL INFORMATION",
+        "Tools: Jira & Confluence",
+        "Clearance: Public Trust",
+        "Interests: Cycling, chess",
+    ]
+    return lines
+
+
+def build_document(jobs: int, seed: int = 0, bullets_per_job: int = 4) -> str:
+    """A resume with `jobs` experience entries and every section type; the same arguments give the same text."""
+    rng = random.Random(seed)
+    lines = _header(rng) + ["EXPERIENCE"]
+    for index in range(jobs):
+        lines += _job(rng, index, bullets_per_job)
+    lines += _tail(rng, projects=max(1, jobs // 4), activities=max(1, jobs // 6))
+    return "\n".join(lines)
+
+
+def document_for_pages(pages: int, seed: int = 0) -> str:
+    """
+    Smallest generated resume that renders to at least `pages` pages with the
+    platypus engine. Calibrated by rendering, so it tracks layout changes.
+    """
+    from app.services.pdf_service import count_pdf_pages, generate_pdf_from_text
+
+    def rendered_pages(jobs: int) -> int:
+        return count_pdf_pages(generate_pdf_from_text(build_document(jobs, seed), engine="platypus").getvalue())
+
+    # About four four-bullet jobs fit on a page; step down then up from that estimate
+    jobs = max(1, pages * 4 - 3)
+    while jobs > 1 and rendered_pages(jobs) >= pages:
+        jobs -= 1
+    while rendered_pages(jobs) < pages:
+        jobs += 1
+    return build_document(jobs, seed)
+
+
+def pathological_cases(seed: int = 0) -> list[CorpusCase]:
+    rng = random.Random(seed)
+    many_bullets = "\n".join(_header(rng) + ["EXPERIENCE"] + _job(rng, 0, 5000))
+    long_line = " ".join(f"{rng.choice(VERBS).lower()} {rng.choice(OBJECTS)}" for _ in range(600))
+    long_lines = "\n".join(
+        _header(rng) + ["EXPERIENCE", "Company 0 | Boston, MA | 2015 - 2020", "Engineer"]
+        + [f"• {long_line}" for _ in range(20)]
+        + ["ADDITIONAL INFORMATION", f"Keywords: {long_line}"]
+    )
+    many_sections = "\n".join(
+        _header(rng) + [
+            line
+            for index in range(300)
+            for line in (f"SECTION {index}", _bullet(rng))
+        ]
+    )
+    return [
+        CorpusCase("bullets-5000", many_bullets, pathological=True),
+        CorpusCase("long-lines", long_lines, pathological=True),
+        CorpusCase("sections-300", many_sections, pathological=True),
+    ]
+
+
+def build_corpus(page_counts: tuple[int, ...] = (1, 2, 5, 10, 20), seed: int = 0, pathological: bool = True) -> list[CorpusCase]:
+    cases = [CorpusCase(f"pages-{pages:02d}", document_for_pages(pages, seed)) for pages in page_counts]
+    if pathological:
+        cases += pathological_cases(seed)
+    return cases
@@ -0,0 +1,120 @@
+"""
+Load test: does PDF export load slow down other endpoints?
+
+Starts the real app in a background thread, then polls a cheap endpoint (GET /)
+while a number of clients keep /analyze/improve busy. Reports probe latency
+with and without export load plus export throughput. Pass --inline to render
+on the event loop (the old behaviour) for comparison.
+
+Usage (from backend/):
+    python -m benchmarks.export_concurrency --exporters 8 --seconds 5
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.upload_concurrency import _free_port, _serve
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def _probe(client, stop: asyncio.Event) -> list[float]:
+    latencies = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get("/")
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(0.01)
+    return latencies
+
+
+async def _export(client, headers: dict, content: str, stop: asyncio.Event) -> tuple[int, int]:
+    exported = rejected = 0
+    while not stop.is_set():
+        response = await client.post("/analyze/improve", headers=headers, json={"content": content})
+        if response.status_code == 200:
+            assert int(response.headers["content-length"]) == len(response.content)
+            exported += 1
+        else:
+            rejected += 1
+    return exported, rejected
+
+
+async def _run(base_url: str, content: str, exporters: int, seconds: float):
+    import httpx
+
+    limits = httpx.Limits(max_connections=exporters + 4)
+    async with httpx.AsyncClient(base_url=base_url, timeout=300, limits=limits) as client:
+        credentials = {"email": "loadtest@example.com", "password": "loadtest-password"}
+        await client.post("/auth/register", json=credentials)
+        login = await client.post(
+            "/auth/login",
+            data={"username": credentials["email"], "password": credentials["password"]},
+        )
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        # Warm up the worker pool
+        await client.post("/analyze/improve", headers=headers, json={"content": content})
+
+        stop = asyncio.Event()
+        probe = asyncio.create_task(_probe(client, stop))
+        await asyncio.sleep(seconds)
+        stop.set()
+        idle = await probe
+
+        stop = asyncio.Event()
+        probe = asyncio.create_task(_probe(client, stop))
+        workers = [asyncio.create_task(_export(client, headers, content, stop)) for _ in range(exporters)]
+        await asyncio.sleep(seconds)
+        stop.set()
+        loaded = await probe
+        counts = await asyncio.gather(*workers)
+    return idle, loaded, sum(c[0] for c in counts), sum(c[1] for c in counts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--exporters", type=int, default=8, help="Concurrent export clients")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Duration of each phase")
+    parser.add_argument("--jobs", type=int, default=12, help="Experience entries in the exported resume")
+    parser.add_argument("--inline", action="store_true", help="Render on the event loop instead of the pool")
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(), "loadtest.db")
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{db_path}")
+    os.environ.setdefault("SECRET_KEY", "loadtest-secret")
+    os.environ.setdefault("OPENAI_API_KEY", "sk-loadtest")
+
+    from app.main import app
+    from app.api import analyze
+    from app.services.pdf_service import generate_pdf_from_text
+    from benchmarks.resume_parser import build_resume
+
+    if args.inline:
+        async def render_inline(content: str) -> bytes:
+            return generate_pdf_from_text(content).getvalue()
+        analyze.render_pdf = render_inline
+
+    app_port = _free_port()
+    _serve(app, app_port)
+    idle, loaded, exported, rejected = asyncio.run(
+        _run(f"http://127.0.0.1:{app_port}", build_resume(args.jobs), args.exporters, args.seconds)
+    )
+
+    mode = "inline" if args.inline else "worker pool"
+    print(f"render mode: {mode}, {args.exporters} export clients, {args.seconds:.0f}s per phase")
+    for label, latencies in (("idle", idle), ("under export load", loaded)):
+        print(
+            f"GET / {label}: p50 {statistics.median(latencies) * 1000:.1f} ms, "
+            f"p99 {_percentile(latencies, 0.99) * 1000:.1f} ms, max {max(latencies) * 1000:.1f} ms"
+        )
+    print(f"exports: {exported} ok ({exported / args.seconds:.1f}/s), {rejected} rejected")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""
+Minimal OpenAI-compatible server for local load testing.
+
+Serves /v1/chat/completions with a canned resume analysis, or with answers
+replayed from a cassette recorded against the real API, after a delay drawn
+from a configurable latency distribution. A share of calls can be failed to
+exercise model fallback, and `stream=True` requests are answered as SSE
+chunks spread over the delay. The real app can be exercised without network
+access or API spend; GET /stats reports what was served.
+
+Record a cassette by proxying to the real API (the caller's key is forwarded;
+streamed requests are recorded from a non-streamed upstream call):
+    python -m benchmarks.fake_openai --port 8001 --record cassette.jsonl
+Replay it:
+    python -m benchmarks.fake_openai --port 8001 --replay cassette.jsonl --latency lognormal:1.5,0.4 --error-rate 0.02
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from typing import Callable, Optional, Union
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+SAMPLE_ANALYSIS = {
+    "score": 78,
+    "structure_feedback": "Clear section ordering with consistent headings.",
+    "keyword_analysis": "Add more role-specific keywords such as Python and SQL.",
+    "improvements": [
+        "Quantify achievements in the experience section",
+        "Add a professional summary",
+        "Group skills by category",
+    ],
+    "improved_content": (
+        "Jane Doe\n"
+        "jane@example.com | (555) 123-4567 | Boston, MA\n"
+        "PROFESSIONAL SUMMARY\n"
+        "Data analyst with four years of experience turning data into decisions.\n"
+        "EXPERIENCE\n"
+        "Acme Corp | Boston, MA | 2020 - Present\n"
+        "Data Analyst\n"
+        "• Built dashboards used by 40 stakeholders\n"
+    ),
+}
+SAMPLE_USAGE = {"prompt_tokens": 1200, "completion_tokens": 600, "total_tokens": 1800}
+
+# Error bodies as the real API sends them, by injected status code
+ERROR_TYPES = {429: "rate_limit_exceeded", 500: "server_error", 502: "server_error", 503: "server_error"}
+
+LatencyModel = Callable[[Optional[float]], float]
+
+
+def parse_latency(spec: Union[float, str], seed: Optional[int] = None) -> LatencyModel:
+    """
+    Build a latency model from a spec. The model maps the recorded latency of a
+    replayed answer (None for canned answers) to the delay to apply.
+
+    "1.5" or "fixed:1.5"     always 1.5s
+    "uniform:0.5,2"          uniformly between 0.5s and 2s
+    "normal:1.5,0.3"         mean 1.5s, standard deviation 0.3s, clipped at 0
+    "lognormal:1.5,0.4"      median 1.5s with log-space sigma 0.4 (a long right tail)
+    "replay" or "replay:1.0" the recorded latency, or 1.0s for canned answers
+    """
+    rng = random.Random(seed)
+    if isinstance(spec, (int, float)):
+        return lambda recorded: float(spec)
+    kind, _, params = spec.partition(":")
+    if not params and kind.replace(".", "", 1).isdigit():
+        kind, params = "fixed", kind
+    values = [float(value) for value in params.split(",")] if params else []
+    if kind == "fixed" and len(values) == 1:
+        return lambda recorded: values[0]
+    if kind == "uniform" and len(values) == 2:
+        return lambda recorded: rng.uniform(values[0], values[1])
+    if kind == "normal" and len(values) == 2:
+        return lambda recorded: max(rng.gauss(values[0], values[1]), 0.0)
+    if kind == "lognormal" and len(values) == 2:
+        return lambda recorded: values[0] * math.exp(rng.gauss(0.0, values[1]))
+    if kind == "replay" and len(values) <= 1:
+        default = values[0] if values else 1.0
+        return lambda recorded: recorded if recorded is not None else default
+    raise ValueError(f"Unknown latency spec: {spec!r}")
+
+
+def _digest(value) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def _request_keys(body: dict) -> tuple[str, str]:
+    """Exact key (model and messages) and kind key (system prompt, i.e. scoring vs rewrite vs full analysis)."""
+    messages = body.get("messages", [])
+    system = next((message.get("content") for message in messages if message.get("role") == "system"), "")
+    return _digest([body.get("model"), messages]), _digest(system)
+
+
+class Cassette:
+    """
+    Recorded completions in a JSONL file. Replay prefers an exact match of the
+    request, then any answer recorded for the same system prompt (cycled), then
+    any answer at all.
+    """
+
+    def __init__(self, path: str, record: bool = False):
+        self.path = path
+        self.record = record
+        self.entries: list[dict] = []
+        self._exact: dict[str, dict] = {}
+        self._by_kind: dict[str, list[dict]] = {}
+        self._cursors: dict[str, int] = {}
+        self._lock = threading.Lock()
+        if not record:
+            with open(path) as cassette_file:
+                for line in cassette_file:
+                    if line.strip():
+                        self._index(json.loads(line))
+
+    def _index(self, entry: dict):
+        self.entries.append(entry)
+        self._exact.setdefault(entry["key"], entry)
+        self._by_kind.setdefault(entry["kind"], []).append(entry)
+
+    def _cycle(self, name: str, entries: list[dict]) -> dict:
+        cursor = self._cursors.get(name, 0)
+        self._cursors[name] = cursor + 1
+        return entries[cursor % len(entries)]
+
+    def match(self, body: dict) -> tuple[Optional[dict], str]:
+        """Return the entry to replay for `body` and how it matched ("exact", "kind", "any" or "none")."""
+        key, kind = _request_keys(body)
+        with self._lock:
+            if key in self._exact:
+                return self._exact[key], "exact"
+            if kind in self._by_kind:
+                return self._cycle(kind, self._by_kind[kind]), "kind"
+            if self.entries:
+                return self._cycle("", self.entries), "any"
+        return None, "none"
+
+    def append(self, body: dict, content: str, usage: Optional[dict], latency: float):
+        key, kind = _request_keys(body)
+        entry = {"key": key, "kind": kind, "model": body.get("model"), "content": content, "usage": usage, "latency": latency}
+        with self._lock:
+            self._index(entry)
+            with open(self.path, "a") as cassette_file:
+                cassette_file.write(json.dumps(entry) + "\n")
+
+
+def create_app(
+    latency: Union[float, str] = 1.0,
+    failing_models: tuple[str, ...] = (),
+    error_rate: float = 0.0,
+    error_statuses: tuple[int, ...] = (500,),
+    cassette: Optional[Cassette] = None,
+    upstream: str = "https://api.openai.com/v1",
+    seed: Optional[int] = None,
+) -> FastAPI:
+    """
+    Build a fake OpenAI app. Each chat completion is answered after a delay from
+    `latency` (seconds or a parse_latency spec). Requests for a model in
+    `failing_models`, and a random `error_rate` share of the rest, get an error
+    with a status from `error_statuses` instead. With a recording `cassette`
+    requests are proxied to `upstream` and stored; otherwise the cassette, if
+    any, is replayed.
+    """
+    app = FastAPI()
+    latency_model = parse_latency(latency, seed)
+    rng = random.Random(seed)
+    stats = {"requests": 0, "streamed": 0, "errors": {}, "replayed": {}, "recorded": 0}
+
+    def error_response(status_code: int) -> JSONResponse:
+        stats["errors"][status_code] = stats["errors"].get(status_code, 0) + 1
+        headers = {"Retry-After": "1"} if status_code == 429 else None
+        return JSONResponse(
+            status_code=status_code,
+            content={"error": {"message": "Simulated outage", "type": ERROR_TYPES.get(status_code, "server_error")}},
+            headers=headers
+        )
+
+    async def record(request: Request, body: dict) -> tuple[str, Optional[dict], Optional[JSONResponse]]:
+        import httpx
+
+        started = time.perf_counter()
+        async with httpx.AsyncClient(timeout=300) as client:
+            response = await client.post(
+                f"{upstream}/chat/completions",
+                json={**body, "stream": False},
+                headers={"Authorization": request.headers.get("authorization", "")}
+            )
+        if response.status_code != 200:
+            return "", None, JSONResponse(status_code=response.status_code, content=response.json())
+        answer = response.json()
+        content = answer["choices"][0]["message"]["content"]
+        cassette.append(body, content, answer.get("usage"), time.perf_counter() - started)
+        stats["recorded"] += 1
+        return content, answer.get("usage"), None
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        model = body.get("model", "gpt-4o")
+        stats["requests"] += 1
+
+        if cassette is not None and cassette.record:
+            content, usage, error = await record(request, body)
+            if error is not None:
+                return error
+            delay = 0.0  # The upstream call already took the real time
+        else:
+            entry, matched = cassette.match(body) if cassette is not None else (None, "none")
+            stats["replayed"][matched] = stats["replayed"].get(matched, 0) + 1
+            content = entry["content"] if entry else json.dumps(SAMPLE_ANALYSIS)
+            usage = (entry.get("usage") if entry else None) or SAMPLE_USAGE
+            delay = latency_model(entry.get("latency") if entry else None)
+
+            if model in failing_models or (error_rate and rng.random() < error_rate):
+                await asyncio.sleep(delay)
+                return error_response(rng.choice(error_statuses))
+
+        if body.get("stream"):
+            stats["streamed"] += 1
+            return StreamingResponse(_stream_chunks(content, model, delay), media_type="text/event-stream")
+        await asyncio.sleep(delay)
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": usage,
+        }
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    return app
+
+
+async def _stream_chunks(content: str, model: str, latency: float, chunk_size: int = 16):
+    """Yield `content` as chat.completion.chunk SSE events spread evenly over `latency` seconds."""
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    pieces = [content[i:i + chunk_size] for i in range(0, len(content), chunk_size)]
+    for piece in pieces:
+        await asyncio.sleep(latency / len(pieces))
+        chunk = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+        }
+        yield f"data: {json.dumps(chunk)}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Fake server options, shared with the load driver."""
+    parser.add_argument("--latency", default="1.0", help="Latency spec: 1.5, uniform:a,b, normal:m,sd, lognormal:median,sigma, replay")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of completions answered with an error")
+    parser.add_argument("--error-statuses", default="500", help="Comma-separated statuses for injected errors, e.g. 500,429,503")
+    parser.add_argument("--failing-models", default="", help="Comma-separated models that always fail")
+    parser.add_argument("--replay", help="Cassette JSONL file to replay")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for latency and error draws")
+
+
+def app_from_arguments(args: argparse.Namespace, record: Optional[str] = None, upstream: Optional[str] = None) -> FastAPI:
+    cassette = None
+    if record:
+        cassette = Cassette(record, record=True)
+    elif args.replay:
+        cassette = Cassette(args.replay)
+    return create_app(
+        latency=args.latency,
+        failing_models=tuple(model for model in args.failing_models.split(",") if model),
+        error_rate=args.error_rate,
+        error_statuses=tuple(int(status) for status in args.error_statuses.split(",")),
+        cassette=cassette,
+        upstream=upstream or "https://api.openai.com/v1",
+        seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--record", help="Proxy to --upstream and append completions to this cassette")
+    parser.add_argument("--upstream", default="https://api.openai.com/v1", help="Real API base URL used when recording")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    uvicorn.run(app_from_arguments(args, args.record, args.upstream), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+End-to-end load test of the real app at a target request rate.
+
+Starts the fake OpenAI server (latency distribution, error injection and
+cassette replay as in benchmarks.fake_openai) and the app, either in-process or
+as `uvicorn app.main:app --workers N` with --workers. Then registers and logs
+in --users users and sends /analyze/upload and /analyze/improve requests at
+--rate requests/sec for --duration seconds. Arrivals are open loop, so a slow
+app builds up a backlog instead of slowing the driver down. Reports p50/p95/p99
+latency, throughput and an error breakdown per endpoint.
+
+App settings such as pool sizes are passed with --env (repeatable). Admission
+control is off by default; pass --env RATE_LIMIT_ENABLED=true to include it.
+Multiple workers on SQLite will contend for the database file, so for capacity
+numbers pass a Postgres DATABASE_URL. --app-url targets an app that is already running
+instead; it must be configured to use the fake server itself.
+
+Usage (from backend/):
+    python -m benchmarks.load_driver --rate 10 --duration 30 --latency lognormal:1.5,0.4 --error-rate 0.02
+    python -m benchmarks.load_driver --workers 4 --env PDF_RENDER_WORKERS=2 --rate 40 --mix upload=3,improve=1
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+
+from benchmarks import fake_openai
+from benchmarks.export_concurrency import _percentile
+from benchmarks.upload_concurrency import _free_port, _serve
+
+ENDPOINTS = ("upload", "improve")
+
+
+def _parse_mix(mix: str) -> dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ENDPOINTS:
+            raise SystemExit(f"Unknown endpoint in --mix: {name}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def _documents(count: int, seed: int) -> list[tuple[str, bytes]]:
+    """Distinct resume texts and their PDFs, so uploads are not all served from the analysis cache."""
+    from app.services.pdf_service import generate_pdf_from_text
+    from benchmarks.corpus import build_document
+
+    rng = random.Random(seed)
+    documents = []
+    for index in range(count):
+        text = build_document(rng.randint(2, 6), seed=seed * 100003 + index)
+        documents.append((text, generate_pdf_from_text(text).getvalue()))
+    return documents
+
+
+def _start_workers(workers: int, port: int) -> subprocess.Popen:
+    """Run the app under uvicorn with `workers` processes; they inherit the prepared environment."""
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+
+
+async def _wait_ready(client, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if (await client.get("/")).status_code == 200:
+                return
+        except Exception:
+            if time.monotonic() > deadline:
+                raise
+        await asyncio.sleep(0.2)
+
+
+async def _login_users(client, users: int) -> list[dict]:
+    async def login(index: int) -> dict:
+        credentials = {"email": f"loadtest{index}@example.com", "password": "loadtest-password"}
+        await client.post("/auth/register", json=credentials)
+        response = await client.post(
+            "/auth/login",
+            data={"username": credentials["email"], "password": credentials["password"]},
+        )
+        response.raise_for_status()
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    return await asyncio.gather(*(login(index) for index in range(users)))
+
+
+async def _request(client, endpoint: str, headers: dict, document: tuple[str, bytes]) -> tuple[str, float]:
+    """Send one request; returns its outcome ("ok", "HTTP 503", an exception name) and latency."""
+    text, pdf_bytes = document
+    started = time.perf_counter()
+    try:
+        if endpoint == "upload":
+            response = await client.post(
+                "/analyze/upload", headers=headers,
+                files={"file": ("resume.pdf", pdf_bytes, "application/pdf")},
+            )
+        else:
+            response = await client.post("/analyze/improve", headers=headers, json={"content": text})
+        outcome = "ok" if response.status_code == 200 else f"HTTP {response.status_code}"
+    except Exception as e:
+        outcome = type(e).__name__
+    return outcome, time.perf_counter() - started
+
+
+async def _drive(base_url: str, args, documents: list[tuple[str, bytes]], fake_url: str):
+    import httpx
+
+    rng = random.Random(args.seed)
+    mix = _parse_mix(args.mix)
+    names, weights = list(mix), list(mix.values())
+    limits = httpx.Limits(max_connections=args.max_inflight, max_keepalive_connections=args.max_inflight)
+    results: dict[str, list[tuple[str, float]]] = defaultdict(list)
+    dropped: Counter = Counter()
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        await _wait_ready(client)
+        user_headers = await _login_users(client, args.users)
+
+        async def send(endpoint: str):
+            outcome = await _request(client, endpoint, rng.choice(user_headers), rng.choice(documents))
+            results[endpoint].append(outcome)
+
+        loop = asyncio.get_running_loop()
+        tasks: set[asyncio.Task] = set()
+        started = loop.time()
+        next_at = started
+        while next_at - started < args.duration:
+            await asyncio.sleep(max(next_at - loop.time(), 0))
+            endpoint = rng.choices(names, weights)[0]
+            if len(tasks) >= args.max_inflight:
+                dropped[endpoint] += 1
+            else:
+                task = asyncio.create_task(send(endpoint))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            next_at += rng.expovariate(args.rate) if args.arrivals == "poisson" else 1 / args.rate
+        await asyncio.gather(*tasks)
+        elapsed = loop.time() - started
+
+        fake_stats = None
+        if fake_url:
+            async with httpx.AsyncClient(base_url=fake_url) as fake_client:
+                fake_stats = (await fake_client.get("/stats")).json()
+    return results, dropped, elapsed, fake_stats
+
+
+def _report(args, results, dropped, elapsed: float, fake_stats):
+    print(
+        f"target {args.rate:.1f} req/s ({args.arrivals}) for {args.duration:.0f}s, mix {args.mix}, "
+        f"{args.users} users, workers {args.workers or 'in-process'}"
+        + (f", env {' '.join(args.env)}" if args.env else "")
+    )
+    print(f"fake OpenAI: latency {args.latency}, error rate {args.error_rate:.1%}" + (f", replay {args.replay}" if args.replay else ""))
+    for endpoint in ENDPOINTS:
+        outcomes = results.get(endpoint, [])
+        if not outcomes and not dropped[endpoint]:
+            continue
+        latencies = [latency for outcome, latency in outcomes if outcome == "ok"]
+        errors = Counter(outcome for outcome, _ in outcomes if outcome != "ok")
+        line = f"{endpoint:>8}: sent {len(outcomes)}, ok {len(latencies)} ({len(latencies) / elapsed:.2f}/s)"
+        if latencies:
+            line += (
+                f", p50 {statistics.median(latencies) * 1000:.0f} ms, p95 {_percentile(latencies, 0.95) * 1000:.0f} ms, "
+                f"p99 {_percentile(latencies, 0.99) * 1000:.0f} ms"
+            )
+        print(line)
+        if errors or dropped[endpoint]:
+            breakdown = dict(errors)
+            if dropped[endpoint]:
+                breakdown["dropped (max in-flight)"] = dropped[endpoint]
+            print(f"{'':>10}errors: " + ", ".join(f"{name} x{count}" for name, count in sorted(breakdown.items())))
+    if fake_stats is not None:
+        print(f"fake OpenAI served {fake_stats['requests']} completions, errors {fake_stats['errors']}, replay matches {fake_stats['replayed']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=5.0, help="Target requests per second across endpoints")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of load")
+    parser.add_argument("--arrivals", choices=("poisson", "uniform"), default="poisson")
+    parser.add_argument("--mix", default="upload=1,improve=1", help="Endpoint weights, e.g. upload=3,improve=1")
+    parser.add_argument("--users", type=int, default=10, help="Users registered and logged in before the run")
+    parser.add_argument("--documents", type=int, default=100, help="Distinct generated resumes to send")
+    parser.add_argument("--max-inflight", type=int, default=500, help="Requests beyond this many in flight are dropped by the driver")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Client timeout per request")
+    parser.add_argument("--workers", type=int, default=0, help="Run the app as uvicorn with this many workers (0: in-process)")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="App setting for this run")
+    parser.add_argument("--app-url", help="Target an already running app instead of starting one")
+    fake_openai.add_arguments(parser)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'loadtest.db')}")
+    os.environ.setdefault("SECRET_KEY", "loadtest-secret")
+    os.environ.setdefault("OPENAI_API_KEY", "sk-loadtest")
+    # Measure the pipeline, not admission control, unless --env RATE_LIMIT_ENABLED=true asks for it
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    os.environ.update(pair.split("=", 1) for pair in args.env)
+
+    fake_url = None
+    if not args.app_url:
+        fake_port = _free_port()
+        _serve(fake_openai.app_from_arguments(args), fake_port)
+        fake_url = f"http://127.0.0.1:{fake_port}"
+        os.environ["OPENAI_BASE_URL"] = f"{fake_url}/v1"
+    logging.getLogger().setLevel(logging.WARNING)
+    documents = _documents(args.documents, args.seed or 0)
+
+    process = None
+    base_url = args.app_url
+    if base_url is None:
+        app_port = _free_port()
+        if args.workers:
+            process = _start_workers(args.workers, app_port)
+        else:
+            from app.main import app
+            _serve(app, app_port)
+        base_url = f"http://127.0.0.1:{app_port}"
+
+    try:
+        results, dropped, elapsed, fake_stats = asyncio.run(_drive(base_url, args, documents, fake_url))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+    _report(args, results, dropped, elapsed, fake_stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Load test: does a login storm slow down other endpoints?
+
+Starts the real app in a background thread, then polls a cheap endpoint (GET /)
+while a number of clients log in as fast as they can. Reports probe latency
+with and without login load plus login throughput. Pass --inline to run
+bcrypt on the event loop (the old behaviour) for comparison.
+
+Usage (from backend/):
+    python -m benchmarks.login_storm --clients 16 --seconds 5
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+
+from benchmarks.export_concurrency import _percentile, _probe
+from benchmarks.upload_concurrency import _free_port, _serve
+
+
+async def _login(client, credentials: dict, stop: asyncio.Event) -> tuple[int, int]:
+    succeeded = rejected = 0
+    while not stop.is_set():
+        response = await client.post(
+            "/auth/login",
+            data={"username": credentials["email"], "password": credentials["password"]},
+        )
+        if response.status_code == 200:
+            succeeded += 1
+        else:
+            rejected += 1
+    return succeeded, rejected
+
+
+async def _run(base_url: str, clients: int, seconds: float):
+    import httpx
+
+    limits = httpx.Limits(max_connections=clients + 4)
+    async with httpx.AsyncClient(base_url=base_url, timeout=300, limits=limits) as client:
+        credentials = {"email": "loadtest@example.com", "password": "loadtest-password"}
+        await client.post("/auth/register", json=credentials)
+
+        stop = asyncio.Event()
+        probe = asyncio.create_task(_probe(client, stop))
+        await asyncio.sleep(seconds)
+        stop.set()
+        idle = await probe
+
+        stop = asyncio.Event()
+        probe = asyncio.create_task(_probe(client, stop))
+        workers = [asyncio.create_task(_login(client, credentials, stop)) for _ in range(clients)]
+        await asyncio.sleep(seconds)
+        stop.set()
+        loaded = await probe
+        counts = await asyncio.gather(*workers)
+    return idle, loaded, sum(c[0] for c in counts), sum(c[1] for c in counts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent login clients")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Duration of each phase")
+    parser.add_argument("--inline", action="store_true", help="Run bcrypt on the event loop instead of the pool")
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(), "loadtest.db")
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{db_path}")
+    os.environ.setdefault("SECRET_KEY", "loadtest-secret")
+    os.environ.setdefault("OPENAI_API_KEY", "sk-loadtest")
+
+    from app.main import app
+    from app.core import security
+    from app.core.config import settings
+
+    if args.inline:
+        async def hash_inline(fn, *hash_args):
+            return fn(*hash_args)
+        security._run_hash = hash_inline
+
+    app_port = _free_port()
+    _serve(app, app_port)
+    idle, loaded, succeeded, rejected = asyncio.run(
+        _run(f"http://127.0.0.1:{app_port}", args.clients, args.seconds)
+    )
+
+    mode = "inline" if args.inline else f"hashing pool ({settings.PASSWORD_HASH_WORKERS} threads)"
+    print(f"bcrypt: {mode}, {settings.BCRYPT_ROUNDS} rounds, {args.clients} login clients, {args.seconds:.0f}s per phase")
+    for label, latencies in (("idle", idle), ("during login storm", loaded)):
+        print(
+            f"GET / {label}: p50 {statistics.median(latencies) * 1000:.1f} ms, "
+            f"p99 {_percentile(latencies, 0.99) * 1000:.1f} ms, max {max(latencies) * 1000:.1f} ms"
+        )
+    print(f"logins: {succeeded} ok ({succeeded / args.seconds:.1f}/s), {rejected} rejected")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Job description matching over a synthetic resume corpus.
+
+Builds a MatchIndex over --documents generated resumes (each with a few
+random skills drawn from a larger pool, so vocabularies and scores differ)
+and times indexing throughput, the first ranking (which builds the weighted
+matrices), steady-state rankings with each method, and a ranking right after
+--incremental new resumes arrive. Everything runs in this process on one
+thread, the way MatchService runs a ranking.
+
+Usage (from backend/):
+    python -m benchmarks.match_ranking --documents 5000
+    python -m benchmarks.match_ranking --documents 20000 --repeat 50 --incremental 100
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+
+from benchmarks.export_concurrency import _percentile
+
+JOB_DESCRIPTION = """Senior Backend Engineer
+
+We are hiring a backend engineer to build and scale our data platform. You will
+design REST APIs in Python with FastAPI and PostgreSQL, run services on AWS with
+Docker and Kubernetes, and own CI/CD pipelines. Experience with Kafka, Redis,
+Terraform and observability (Prometheus, Grafana) is a plus. You mentor engineers,
+improve reliability and reduce latency for millions of users."""
+
+SKILL_POOL = (
+    "python java go rust typescript javascript c++ c# ruby scala kotlin swift sql fastapi django flask "
+    "spring react angular vue node.js postgresql mysql mongodb redis kafka rabbitmq elasticsearch aws gcp "
+    "azure docker kubernetes terraform ansible jenkins ci/cd prometheus grafana spark hadoop airflow "
+    "pandas numpy pytorch tensorflow graphql grpc microservices linux nginx snowflake dbt tableau figma"
+).split()
+
+
+def _corpus(count: int, seed: int) -> list[str]:
+    from benchmarks.corpus import build_document
+
+    rng = random.Random(seed)
+    texts = []
+    for index in range(count):
+        text = build_document(rng.randint(2, 6), seed=seed * 100003 + index)
+        texts.append(text + "\nTOOLS\n" + ", ".join(rng.sample(SKILL_POOL, rng.randint(4, 14))))
+    return texts
+
+
+def _time_rankings(index, method: str, repeat: int, limit: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        index.rank(JOB_DESCRIPTION, limit, method)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def _report(name: str, timings: list[float]):
+    print(
+        f"{name:<24} p50 {statistics.median(timings) * 1000:8.2f} ms  p95 {_percentile(timings, 0.95) * 1000:8.2f} ms  "
+        f"max {max(timings) * 1000:8.2f} ms",
+        flush=True
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=5000, help="Resumes in the index")
+    parser.add_argument("--repeat", type=int, default=20, help="Rankings timed per method")
+    parser.add_argument("--limit", type=int, default=50, help="Candidates returned per ranking")
+    parser.add_argument("--incremental", type=int, default=50, help="Resumes added before the incremental ranking")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    from app.services.match_service import MATCH_METHODS, MatchIndex
+
+    texts = _corpus(args.documents + args.incremental, args.seed)
+    index = MatchIndex()
+    started = time.perf_counter()
+    for document_id, text in enumerate(texts[:args.documents], start=1):
+        index.add(document_id, f"resume-{document_id}.pdf", text)
+    elapsed = time.perf_counter() - started
+    stats = index.stats()
+    print(
+        f"indexed {stats['documents']} resumes in {elapsed:.2f}s ({stats['documents'] / elapsed:.0f}/s), "
+        f"vocabulary {stats['vocabulary']}, {stats['non_zeros']} non-zeros"
+    )
+
+    _report("first rank (with build)", _time_rankings(index, "bm25", 1, args.limit))
+    for method in MATCH_METHODS:
+        _report(f"rank {method}", _time_rankings(index, method, args.repeat, args.limit))
+
+    started = time.perf_counter()
+    for document_id, text in enumerate(texts[args.documents:], start=args.documents + 1):
+        index.add(document_id, f"resume-{document_id}.pdf", text)
+    adding = time.perf_counter() - started
+    timings = _time_rankings(index, "bm25", 1, args.limit)
+    _report(f"add {args.incremental} + rank", [adding + timings[0]])
+
+    keywords, results = index.rank(JOB_DESCRIPTION, 3, "bm25")
+    print(f"keywords: {', '.join(keywords)}")
+    for result in results:
+        print(
+            f"  {result.filename}: score {result.score}, coverage {result.keyword_coverage:.0%}, "
+            f"missing {', '.join(result.missing_keywords[:8])}"
+        )
+
+
+if __name__ == "__main__":
+    main()
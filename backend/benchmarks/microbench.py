@@ -0,0 +1,159 @@
+"""
+Extraction and rendering microbenchmarks over the synthetic resume corpus.
+
+For every corpus document (1-20 pages plus pathological cases) this times
+`generate_pdf_from_text` with each render engine, and PDF text extraction
+(page counting plus `_extract_pages`, the work `extract_text_from_pdf` hands
+to its process pool) on the platypus rendering of that document. Reports
+latency percentiles, pages/sec and peak traced memory per path and document.
+
+Results can be saved as a baseline and later runs compared against it; any
+p50 latency or peak memory more than --threshold above the baseline is
+flagged and the run exits with status 1.
+
+Usage (from backend/):
+    python -m benchmarks.microbench --repeat 5 --save
+    python -m benchmarks.microbench --repeat 5 --threshold 0.15
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "microbench.json")
+# Metrics compared against the baseline; higher is worse for all of them
+COMPARED_METRICS = ("p50_ms", "peak_mib")
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def _measure(fn, repeat: int, pages: int) -> dict:
+    fn()  # Warm up caches (fonts, word widths) so the first sample is not an outlier
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    # Memory is traced in a separate run since tracemalloc slows allocation-heavy code
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "pages": pages,
+        "p50_ms": _percentile(timings, 0.5) * 1000,
+        "p95_ms": _percentile(timings, 0.95) * 1000,
+        "p99_ms": _percentile(timings, 0.99) * 1000,
+        "pages_per_sec": pages * repeat / sum(timings),
+        "peak_mib": peak / (1024 * 1024),
+    }
+
+
+def run(cases, repeat: int) -> dict[str, dict]:
+    from app.core.config import settings
+    from app.services.pdf_service import PDF_ENGINES, count_pdf_pages, generate_pdf_from_text
+    from app.services.resume_service import _count_pages, _extract_pages
+
+    results = {}
+    for case in cases:
+        for engine in PDF_ENGINES:
+            pages = count_pdf_pages(generate_pdf_from_text(case.content, engine=engine).getvalue())
+            results[f"render-{engine}/{case.name}"] = _measure(
+                lambda: generate_pdf_from_text(case.content, engine=engine), repeat, pages
+            )
+            _report(f"render-{engine}/{case.name}", results[f"render-{engine}/{case.name}"])
+
+        pdf_bytes = generate_pdf_from_text(case.content, engine="platypus").getvalue()
+        pages = min(count_pdf_pages(pdf_bytes), settings.PDF_MAX_PAGES)
+
+        def extract():
+            _extract_pages(pdf_bytes, 0, min(_count_pages(pdf_bytes), settings.PDF_MAX_PAGES), settings.PDF_MAX_CHARS)
+
+        results[f"extract/{case.name}"] = _measure(extract, repeat, pages)
+        _report(f"extract/{case.name}", results[f"extract/{case.name}"])
+    return results
+
+
+def _report(name: str, result: dict):
+    print(
+        f"{name:<32} {result['pages']:>4} pages  p50 {result['p50_ms']:9.2f} ms  p95 {result['p95_ms']:9.2f} ms  "
+        f"p99 {result['p99_ms']:9.2f} ms  {result['pages_per_sec']:8.1f} pages/s  peak {result['peak_mib']:7.2f} MiB",
+        flush=True
+    )
+
+
+def compare(results: dict[str, dict], baseline: dict[str, dict], threshold: float) -> list[str]:
+    """Return a description of every metric more than `threshold` (a fraction) worse than the baseline."""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        for metric in COMPARED_METRICS:
+            before, after = reference[metric], result[metric]
+            if before > 0 and (after - before) / before > threshold:
+                regressions.append(f"{name} {metric}: {before:.2f} -> {after:.2f} (+{(after - before) / before:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per path and document")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 2, 5, 10, 20], help="Page counts of the regular documents")
+    parser.add_argument("--no-pathological", action="store_true", help="Skip the pathological documents")
+    parser.add_argument("--only", help="Run only cases whose name contains this text")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus seed; baselines are only comparable with the same seed")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--save", action="store_true", help="Write this run's results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Relative slowdown or memory growth flagged as a regression")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+    from benchmarks.corpus import build_corpus
+
+    cases = build_corpus(tuple(args.pages), seed=args.seed, pathological=not args.no_pathological)
+    if args.only:
+        cases = [case for case in cases if args.only in case.name]
+    results = run(cases, args.repeat)
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as baseline_file:
+            json.dump({
+                "seed": args.seed,
+                "repeat": args.repeat,
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "results": results,
+            }, baseline_file, indent=2, sort_keys=True)
+        print(f"saved baseline to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}; run with --save to create one")
+        return
+    with open(args.baseline) as baseline_file:
+        baseline = json.load(baseline_file)
+    if baseline.get("seed") != args.seed:
+        print(f"baseline was recorded with seed {baseline.get('seed')}; not comparing")
+        return
+    regressions = compare(results, baseline["results"], args.threshold)
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print(f"no regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Pages per second of the two PDF render engines.
+
+Renders the same generated resumes with the platypus engine and the direct
+canvas engine (parsing included, as in an export) and reports pages/sec and
+time per document for each.
+
+Usage (from backend/):
+    python -m benchmarks.render_engines --jobs 12 --documents 50
+"""
+import argparse
+import os
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=12, help="Experience entries per generated resume")
+    parser.add_argument("--documents", type=int, default=50, help="Documents rendered per engine")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+    from PyPDF2 import PdfReader
+    from app.services.pdf_service import PDF_ENGINES, generate_pdf_from_text
+    from benchmarks.resume_parser import build_resume
+
+    content = build_resume(args.jobs)
+    results = {}
+    for engine in PDF_ENGINES:
+        pages = len(PdfReader(generate_pdf_from_text(content, engine=engine)).pages)
+        started = time.perf_counter()
+        for _ in range(args.documents):
+            generate_pdf_from_text(content, engine=engine)
+        elapsed = time.perf_counter() - started
+        results[engine] = args.documents * pages / elapsed
+        print(
+            f"{engine:>8}: {pages} pages/doc, {elapsed / args.documents * 1000:.1f} ms/doc, "
+            f"{results[engine]:.1f} pages/sec"
+        )
+    print(f"canvas speedup: {results['canvas'] / results['platypus']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Resume parser vs. PDF layout time.
+
+Times `parse_resume` on its own (reported per input line) and the ReportLab
+side (`build_story` plus `doc.build`) separately, so parser regressions are
+visible apart from layout cost.
+
+Usage (from backend/):
+    python -m benchmarks.resume_parser --jobs 40 --repeat 20
+"""
+import argparse
+import os
+import statistics
+import time
+from io import BytesIO
+
+RESUME_HEADER = """Jane Doe
+jane@example.com | (555) 123-4567 | linkedin.com/in/janedoe
+PROFESSIONAL SUMMARY
+Data analyst with four years of experience turning data into decisions.
+TECHNICAL SKILLS
+Python, SQL, Tableau, dbt, Airflow, Spark
+EXPERIENCE"""
+
+JOB = """Company {index} | Boston, MA | 2015 - 2020
+Senior Data Analyst
+• Built dashboards used by 40 stakeholders & cut reporting time by 30%
+• Automated weekly KPI extracts with Python and Airflow
+• Partnered with finance on <quarterly> forecasting models"""
+
+RESUME_FOOTER = """EDUCATION
+Boston University | Boston, MA | 2011 - 2015
+B.S. Statistics
+PROJECTS
+Churn model | 2021
+• Gradient-boosted churn model deployed to production
+ADDITIONAL INFORMATION
+Languages: English & Spanish
+Certifications: AWS Certified Data Analytics"""
+
+
+def build_resume(jobs: int) -> str:
+    body = "\n\n".join(JOB.format(index=index) for index in range(jobs))
+    return f"{RESUME_HEADER}\n{body}\n{RESUME_FOOTER}"
+
+
+def _time(fn, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=40, help="Experience entries in the generated resume")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+    from reportlab.platypus import SimpleDocTemplate
+    from app.services.pdf_service import PAGE_MARGIN, PAGE_SIZE, build_story
+    from app.services.resume_parser import parse_resume
+
+    content = build_resume(args.jobs)
+    lines = content.count("\n") + 1
+    document = parse_resume(content)
+
+    def render():
+        doc = SimpleDocTemplate(
+            BytesIO(), pagesize=PAGE_SIZE,
+            leftMargin=PAGE_MARGIN, rightMargin=PAGE_MARGIN, topMargin=PAGE_MARGIN, bottomMargin=PAGE_MARGIN
+        )
+        doc.build(build_story(document))
+
+    parse_times = _time(lambda: parse_resume(content), args.repeat)
+    render_times = _time(render, args.repeat)
+
+    parse_median = statistics.median(parse_times)
+    render_median = statistics.median(render_times)
+    print(f"{lines} lines, {len(document.sections)} sections, {sum(len(s.entries) for s in document.sections)} entries")
+    print(f"parse:  median {parse_median * 1000:.2f} ms ({parse_median / lines * 1e6:.2f} us/line)")
+    print(f"layout: median {render_median * 1000:.2f} ms")
+    print(f"parse share of total: {parse_median / (parse_median + render_median):.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Load test: concurrent /analyze/upload calls against a fake OpenAI server.
+
+Starts the fake OpenAI server and the real app in background threads, then fires
+N uploads at once. With a non-blocking client the wall time stays close to one
+fake-model latency; with a blocking client it grows to N times that latency.
+Admission control is off unless RATE_LIMIT_ENABLED is set in the environment.
+
+Usage (from backend/):
+    python -m benchmarks.upload_concurrency --requests 20 --latency 1.0
+"""
+import argparse
+import asyncio
+import logging
+import os
+import socket
+import tempfile
+import threading
+import time
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _serve(app, port: int):
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def _run(base_url: str, pdf_bytes: bytes, requests: int):
+    import httpx
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=300) as client:
+        credentials = {"email": "loadtest@example.com", "password": "loadtest-password"}
+        await client.post("/auth/register", json=credentials)
+        login = await client.post(
+            "/auth/login",
+            data={"username": credentials["email"], "password": credentials["password"]},
+        )
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        async def upload():
+            started = time.perf_counter()
+            response = await client.post(
+                "/analyze/upload",
+                headers=headers,
+                files={"file": ("resume.pdf", pdf_bytes, "application/pdf")},
+            )
+            return response.status_code, started, time.perf_counter()
+
+        wall_start = time.perf_counter()
+        results = await asyncio.gather(*(upload() for _ in range(requests)))
+        wall = time.perf_counter() - wall_start
+    return results, wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=1.0, help="Fake OpenAI latency in seconds")
+    args = parser.parse_args()
+
+    fake_port, app_port = _free_port(), _free_port()
+    db_path = os.path.join(tempfile.mkdtemp(), "loadtest.db")
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{db_path}")
+    os.environ.setdefault("SECRET_KEY", "loadtest-secret")
+    os.environ.setdefault("OPENAI_API_KEY", "sk-loadtest")
+    # Measure the pipeline, not admission control; one user's burst would otherwise cap the run
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{fake_port}/v1"
+
+    # Imported after the environment is prepared so Settings picks it up
+    from benchmarks.fake_openai import SAMPLE_ANALYSIS, create_app
+    from app.main import app
+    from app.services.pdf_service import generate_pdf_from_text
+
+    logging.getLogger().setLevel(logging.WARNING)
+    _serve(create_app(args.latency), fake_port)
+    _serve(app, app_port)
+
+    pdf_bytes = generate_pdf_from_text(SAMPLE_ANALYSIS["improved_content"]).getvalue()
+    results, wall = asyncio.run(_run(f"http://127.0.0.1:{app_port}", pdf_bytes, args.requests))
+
+    ok = sum(1 for code, _, _ in results if code == 200)
+    serial = args.requests * args.latency
+    max_in_flight = max(
+        sum(1 for _, s, e in results if s <= start < e) for _, start, _ in results
+    )
+    print(f"requests={args.requests} ok={ok} fake_latency={args.latency:.2f}s")
+    print(f"wall={wall:.2f}s serial_estimate={serial:.2f}s overlap={serial / wall:.1f}x")
+    print(f"max_in_flight={max_in_flight}")
+
+
+if __name__ == "__main__":
+    main()
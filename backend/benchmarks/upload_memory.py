@@ -0,0 +1,68 @@
+"""
+Peak memory per upload for PDF ingestion.
+
+Feeds a large PDF through `extract_text_from_pdf` as an UploadFile and reports
+the peak Python heap allocation (tracemalloc) and process peak RSS, alongside
+the upload size. Streaming ingestion should keep the heap peak to a small
+multiple of the chunk size rather than the full upload.
+
+Usage (from backend/):
+    python -m benchmarks.upload_memory --bullets 4000
+"""
+import argparse
+import asyncio
+import os
+import resource
+import tempfile
+import tracemalloc
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bullets", type=int, default=4000, help="Bullet lines in the generated resume")
+    parser.add_argument("--uploads", type=int, default=5)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+    from fastapi import UploadFile
+    from app.services.pdf_service import generate_pdf_from_text
+    from app.services.resume_service import extract_text_from_pdf, shutdown_extraction_pool
+
+    text = "Jane Doe\njane@example.com | (555) 123-4567\nEXPERIENCE\n" + "\n".join(
+        f"• Delivered project {i} ahead of schedule, improving throughput by {i % 90 + 10}%"
+        for i in range(args.bullets)
+    )
+    pdf_bytes = generate_pdf_from_text(text).getvalue()
+
+    async def upload_once() -> int:
+        spooled = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+        spooled.write(pdf_bytes)
+        spooled.seek(0)
+        upload = UploadFile(file=spooled, filename="resume.pdf", size=len(pdf_bytes))
+        tracemalloc.reset_peak()
+        await extract_text_from_pdf(upload)
+        _, peak = tracemalloc.get_traced_memory()
+        spooled.close()
+        return peak
+
+    async def run():
+        # Warm up the process pool so worker start-up is not measured
+        await upload_once()
+        return [await upload_once() for _ in range(args.uploads)]
+
+    tracemalloc.start()
+    peaks = asyncio.run(run())
+    tracemalloc.stop()
+    shutdown_extraction_pool()
+
+    max_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"upload_size={len(pdf_bytes) / 1024:.0f}KiB uploads={args.uploads}")
+    print(f"heap_peak_per_upload max={max(peaks) / 1024:.0f}KiB min={min(peaks) / 1024:.0f}KiB")
+    print(f"process_peak_rss={max_rss_kb / 1024:.0f}MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+import os
+
+# Settings requires these; the tests here never reach the database or OpenAI
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
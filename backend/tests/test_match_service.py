@@ -0,0 +1,44 @@
+from app.services.match_service import MatchIndex, job_keywords
+
+JOB_DESCRIPTION = """Backend Engineer (Python)
+
+We are hiring a backend engineer to build and run our Python services. You will
+own Python APIs on AWS with Kubernetes, improve reliability and support millions
+of users. Python and PostgreSQL experience required."""
+
+RESUMES = [
+    "Jane Doe\nSKILLS\nPython, Django, PostgreSQL, AWS\nEXPERIENCE\nBuilt Python APIs serving users",
+    "John Roe\nSKILLS\nPython, Kubernetes, AWS, Terraform\nEXPERIENCE\nBackend engineer running Python services",
+    "Ann Poe\nSKILLS\nPython, Excel\nEXPERIENCE\nAnalyst building Python reports",
+]
+
+
+def _index() -> MatchIndex:
+    index = MatchIndex()
+    for document_id, text in enumerate(RESUMES, start=1):
+        index.add(document_id, f"resume-{document_id}.pdf", text)
+    return index
+
+
+def test_repeated_core_skill_is_a_keyword_even_when_every_resume_has_it():
+    keywords, results = _index().rank(JOB_DESCRIPTION, limit=3)
+
+    assert keywords[0] == "python"
+    assert all("python" in result.matched_keywords for result in results)
+
+
+def test_filler_is_not_reported_as_keywords():
+    keywords = job_keywords(JOB_DESCRIPTION, limit=30)
+
+    for filler in ("build", "run", "own", "improve", "support", "users", "millions", "hiring"):
+        assert filler not in keywords
+    assert {"backend", "engineer", "apis", "aws", "kubernetes", "postgresql"} <= set(keywords)
+
+
+def test_missing_keywords_lists_terms_the_resume_lacks():
+    _, results = _index().rank(JOB_DESCRIPTION, limit=3)
+
+    assert results[0].document_id == 2
+    by_id = {result.document_id: result for result in results}
+    assert "kubernetes" in by_id[1].missing_keywords
+    assert "kubernetes" in by_id[2].matched_keywords
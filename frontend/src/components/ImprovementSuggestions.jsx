@@ -54,9 +54,9 @@ const ImprovementSuggestions = ({ improvedContent }) => {
         </Text>
       </Box>
       <Textarea
-        value={content}
+        value={content || ''}
         onChange={(e) => setContent(e.target.value)}
-        placeholder="Improved resume content will appear here..."
+        placeholder={improvedContent ? '' : 'Generating improved resume content...'}
         minH="400px"
         fontFamily="mono"
         fontSize="sm"
@@ -65,6 +65,7 @@ const ImprovementSuggestions = ({ improvedContent }) => {
         colorScheme="blue"
         onClick={handleExport}
         isLoading={loading}
+        isDisabled={!content}
         loadingText="Generating PDF..."
         size="lg"
       >
@@ -38,6 +38,9 @@ const Dashboard = () => {
         duration: 3000,
         isClosable: true,
       })
+      if (!result.improved_content && result.analysis_id) {
+        loadImprovedContent(result.analysis_id)
+      }
     } catch (error) {
       toast({
         title: 'Error',
@@ -51,6 +54,23 @@ const Dashboard = () => {
     }
   }
 
+  const loadImprovedContent = async (analysisId) => {
+    try {
+      const improvedContent = await resumeService.getImprovedContent(analysisId)
+      setAnalysis((current) =>
+        current?.analysis_id === analysisId ? { ...current, improved_content: improvedContent } : current
+      )
+    } catch (error) {
+      toast({
+        title: 'Error',
+        description: error.response?.data?.detail || 'Failed to generate improved resume',
+        status: 'error',
+        duration: 3000,
+        isClosable: true,
+      })
+    }
+  }
+
   const handleReset = () => {
     setFile(null)
     setAnalysis(null)
@@ -15,6 +15,13 @@ export const resumeService = {
     return response.data
   },
 
+  async getImprovedContent(analysisId) {
+    // The rewrite is generated on first request, so this can take a while
+    const response = await api.get(`/analyze/rewrite/${analysisId}`)
+    
+    return response.data.improved_content
+  },
+
   async exportImprovedResume(content) {
     const response = await api.post(
       '/analyze/improve',